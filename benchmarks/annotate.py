@@ -0,0 +1,96 @@
+"""benchmark the per-request cost of binding request values to a handler
+
+Run with:
+
+    python3 -m benchmarks.annotate
+
+For each handler signature, the time for annotate.call (Binder lookup and
+bind) is shown next to the time for calling the handler directly with the
+same values; the difference is the cost of binding.
+"""
+
+import timeit
+
+from meander import annotate
+from meander import types_
+from meander.document import ServerDocument as Request
+
+NUMBER = 100_000
+
+
+def nothing():
+    """no parameters"""
+
+
+def content(data):
+    """request content"""
+    return data
+
+
+def request_only(request: Request):
+    """the whole request"""
+    return request
+
+
+def url_args(item_id: int, name):
+    """values from the url"""
+    return item_id, name
+
+
+def mixed(
+    item_id: int,
+    cid: types_.ConnectionId,
+    flag: bool = False,
+    limit: int = 10,
+    **kwargs,
+):
+    """url args, content, connection id and extra content"""
+    return item_id, cid, flag, limit, kwargs
+
+
+def make_request(args: list, data: dict | None) -> Request:
+    """build a request with args and content"""
+    request = Request()
+    request.id = 1
+    request.connection_id = 1
+    request.args = args
+    request.content = data
+    return request
+
+
+CASES = (
+    ("nothing", nothing, [], {}, lambda r: nothing()),
+    ("content", content, [], {"a": 1}, lambda r: content(r.content)),
+    ("request", request_only, [], {}, lambda r: request_only(r)),
+    ("url args", url_args, ["123", "abc"], {}, lambda r: url_args(123, "abc")),
+    (
+        "mixed",
+        mixed,
+        ["123"],
+        {"flag": "true", "limit": "5", "other": 1},
+        lambda r: mixed(123, "con=1 req=1", True, 5, other=1),
+    ),
+)
+
+
+def main():
+    """print per-call timings in microseconds"""
+    print(f"{'handler':>10} {'direct':>10} {'bound':>10} {'binding':>10}")
+    for name, func, args, data, direct in CASES:
+
+        def bound(func=func, args=args, data=data):
+            annotate.call(func, make_request(args, dict(data)))
+
+        def unbound(direct=direct, args=args, data=data):
+            direct(make_request(args, dict(data)))
+
+        t_direct = timeit.timeit(unbound, number=NUMBER) / NUMBER * 1e6
+        t_bound = timeit.timeit(bound, number=NUMBER) / NUMBER * 1e6
+        print(
+            f"{name:>10} {t_direct:>9.3f}u {t_bound:>9.3f}u"
+            f" {t_bound - t_direct:>9.3f}u"
+        )
+
+
+if __name__ == "__main__":
+    main()
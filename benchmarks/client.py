@@ -0,0 +1,65 @@
+"""benchmark client call latency, one-shot versus a keep-alive session
+
+Run with:
+
+    python3 -m benchmarks.client
+
+The server is the examples/ping.py server (GET /ping returns "pong"), run
+in its own process. Sequential calls are timed with meander.call, which
+opens and closes a connection for each call, and with a Session, which
+reuses one keep-alive connection. The difference is the cost of connecting
+(and, over a real network, of the round trips it takes; on localhost this
+understates the saving).
+"""
+
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+
+import meander
+from meander import runner
+
+from benchmarks.workers import PORT, wait_for_server
+
+NUMBER = 2000
+URL = f"http://127.0.0.1:{PORT}/ping"
+
+
+def serve() -> None:
+    """run the ping server (in its own process)"""
+    meander.add_server(port=PORT).add_route("/ping", "pong", silent=True)
+    runner.run()
+
+
+async def measure(session: meander.Session | None) -> float:
+    """return the mean latency of a call in microseconds"""
+    start = time.perf_counter()
+    for _ in range(NUMBER):
+        await meander.call(URL, session=session)
+    return (time.perf_counter() - start) / NUMBER * 1e6
+
+
+async def run() -> None:
+    """print the latency of each kind of call"""
+    print(f"{'call':>10} {'latency':>10}")
+    print(f"{'one-shot':>10} {await measure(None):>9.1f}u")
+    async with meander.Session() as session:
+        print(f"{'session':>10} {await measure(session):>9.1f}u")
+
+
+def main():
+    """start the server, and time calls to it"""
+    server = multiprocessing.Process(target=serve)
+    server.start()
+    try:
+        wait_for_server()
+        asyncio.run(run())
+    finally:
+        os.kill(server.pid, signal.SIGTERM)
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""benchmark the per-response cost of formatting a response
+
+Run with:
+
+    python3 -m benchmarks.formatter
+
+For each response, the time to build it (Response(...)) is shown next to
+the time to serialize it as one bytes object (serial, which joins the
+content to the headers) and as a list of buffers (buffers, which is what a
+connection passes to writelines). For the constant ping, build is paid
+once, when the route is added, and buffers is the whole per-request cost.
+"""
+
+import timeit
+
+from meander import ConstantResponse, Response
+
+NUMBER = 100_000
+
+CASES = (
+    ("ping", lambda: Response("pong")),
+    ("constant", lambda: ConstantResponse("pong")),
+    ("json", lambda: Response({"a": 1, "b": [1, 2, 3]})),
+    ("404", lambda: Response(code=404, message="Not Found")),
+    ("1 MB", lambda: Response(b"x" * 1_000_000, charset=None)),
+)
+
+
+def main():
+    """print per-response timings in microseconds"""
+    print(f"{'response':>10} {'build':>10} {'serial':>10} {'buffers':>10}")
+    for name, build in CASES:
+        number = NUMBER if name != "1 MB" else NUMBER // 100
+        response = build()
+        t_build = timeit.timeit(build, number=number) / number * 1e6
+        t_serial = timeit.timeit(response.serial, number=number) / number * 1e6
+        t_buffers = timeit.timeit(response.buffers, number=number) / number * 1e6
+        print(f"{name:>10} {t_build:>9.3f}u {t_serial:>9.3f}u {t_buffers:>9.3f}u")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""benchmark server throughput with each event loop and transport
+
+Run with:
+
+    python3 -m benchmarks.loops
+
+The server is the examples/ping.py server (GET /ping returns "pong"), run
+with meander.run(loop=...) for each available loop ("asyncio", and
+"uvloop" if it is installed), and with each transport ("stream" and
+"protocol", see add_server). It is loaded by one client process per core
+(see benchmarks.workers), each with several keep-alive connections.
+"""
+
+import multiprocessing
+import os
+import signal
+import time
+
+import meander
+from meander import runner
+from meander.server import TRANSPORTS
+
+from benchmarks.workers import DURATION, PORT, load, wait_for_server
+
+
+def serve(loop: str, transport: str) -> None:
+    """run the ping server (in its own process)"""
+    server = meander.add_server(port=PORT, transport=transport)
+    server.add_route("/ping", "pong", silent=True)
+    runner.run(loop=loop)
+
+
+def measure(loop: str, transport: str, clients: int) -> float:
+    """return requests per second for the ping server using loop and transport"""
+    server = multiprocessing.Process(target=serve, args=(loop, transport))
+    server.start()
+    try:
+        wait_for_server()
+        results = multiprocessing.Queue()
+        stop = time.monotonic() + DURATION
+        loaders = [
+            multiprocessing.Process(target=load, args=(stop, results, "/ping"))
+            for _ in range(clients)
+        ]
+        for loader in loaders:
+            loader.start()
+        total = sum(results.get() for _ in loaders)
+        for loader in loaders:
+            loader.join()
+    finally:
+        os.kill(server.pid, signal.SIGTERM)
+        server.join()
+    return total / DURATION
+
+
+def main():
+    """print requests per second for each loop and transport"""
+    loops = ["asyncio"]
+    if runner.uvloop is not None:
+        loops.append("uvloop")
+    else:
+        print("uvloop is not installed (pip install meander[uvloop])")
+    clients = os.cpu_count() or 1
+    print(f"{'loop':>8} " + " ".join(f"{transport:>10}" for transport in TRANSPORTS))
+    for loop in loops:
+        rates = [measure(loop, transport, clients) for transport in TRANSPORTS]
+        print(f"{loop:>8} " + " ".join(f"{rate:>10.0f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
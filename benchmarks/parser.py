@@ -0,0 +1,105 @@
+"""benchmark HTTPReader buffering with large bodies and pipelined requests
+
+Run with:
+
+    python3 -m benchmarks.parser
+
+Three cases are timed:
+    content-length - one request with a 1 MB body
+    chunked - one request with a 1 MB body in 4 KB chunks
+    pipelined - 1,000 GET requests (nine headers each) arriving back-to-back
+
+with each available parser backend (see meander.parser.BACKENDS).
+"""
+
+import asyncio
+import time
+
+from meander.parser import BACKENDS, HTTPReader
+
+BODY_SIZE = 1_000_000
+CHUNK_SIZE = 4096
+PIPELINED = 1000
+REPEAT = 5
+
+
+class StreamReader:  # pylint: disable=too-few-public-methods
+    """serve data in blocks, like asyncio.StreamReader"""
+
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.position = 0
+
+    async def read(self, length: int) -> bytes:
+        """return up to length bytes"""
+        start = self.position
+        self.position = min(start + length, len(self.data))
+        return bytes(self.data[start : self.position])
+
+
+def content_length() -> bytes:
+    """one request with a large body"""
+    head = f"POST /upload HTTP/1.1\r\ncontent-length: {BODY_SIZE}\r\n\r\n"
+    return head.encode() + b"x" * BODY_SIZE
+
+
+def chunked() -> bytes:
+    """one request with a large chunked body"""
+    chunk = f"{CHUNK_SIZE:x}\r\n".encode() + b"x" * CHUNK_SIZE + b"\r\n"
+    count = BODY_SIZE // CHUNK_SIZE
+    head = b"POST /upload HTTP/1.1\r\ntransfer-encoding: chunked\r\n\r\n"
+    return head + chunk * count + b"0\r\n\r\n"
+
+
+def pipelined() -> bytes:
+    """many small requests"""
+    request = (
+        b"GET /ping?a=1 HTTP/1.1\r\n"
+        b"host: localhost\r\n"
+        b"user-agent: Mozilla/5.0 (X11; Linux x86_64; rv:120.0) Firefox/120.0\r\n"
+        b"accept: text/html,application/xhtml+xml,*/*;q=0.8\r\n"
+        b"accept-language: en-US,en;q=0.5\r\n"
+        b"accept-encoding: gzip, deflate\r\n"
+        b"referer: http://localhost/index.html\r\n"
+        b"cookie: session=0123456789abcdef; theme=dark\r\n"
+        b"cache-control: no-cache\r\n"
+        b"x-request-id: 7d9f2c1e-0b6a-4a8e-9f3d-2c1b0a9e8d7f\r\n"
+        b"\r\n"
+    )
+    return request * PIPELINED
+
+
+async def parse_all(data: bytes, max_read_size: int, backend: str) -> int:
+    """parse every document in data, returning the document count"""
+    reader = HTTPReader(
+        StreamReader(data), max_read_size=max_read_size, backend=backend
+    )
+    count = 0
+    while await reader.read_document():
+        count += 1
+    return count
+
+
+def main():
+    """print the best time for each case in milliseconds"""
+    for name, data in (
+        ("content-length", content_length()),
+        ("chunked", chunked()),
+        ("pipelined", pipelined()),
+    ):
+        for max_read_size in (5000, 65536):
+            for backend in BACKENDS:
+                best = None
+                for _ in range(REPEAT):
+                    start = time.perf_counter()
+                    count = asyncio.run(parse_all(data, max_read_size, backend))
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                print(
+                    f"{name:>15} read_size={max_read_size:<6} {backend:<10}"
+                    f" documents={count:<5} {best * 1e3:>9.2f}ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""benchmark route matching as the number of routes grows
+
+Run with:
+
+    python3 -m benchmarks.router
+
+Each route table has a mix of literal and regex routes, and is matched
+using each Router mode (linear, tree and regex). Timings are for a hit on
+the last literal route, a hit on the last regex route, and a miss (404),
+which is the worst case for a linear scan.
+"""
+
+import timeit
+
+from meander import router
+
+SIZES = (10, 100, 1000, 5000)
+NUMBER = 500
+
+
+def build(size: int, mode: str) -> router.Router:
+    """build a router with size routes"""
+    rtr = router.Router(mode)
+    for index in range(size // 2):
+        rtr.add(router.Route("literal", f"/api/v1/item{index}/status", "GET"))
+        rtr.add(router.Route("regex", f"/api/v1/item{index}/(\\d+)", "GET"))
+    return rtr
+
+
+def main():
+    """print per-lookup timings in microseconds"""
+    modes = list(router.MATCHERS)
+    print(f"{'routes':>8} {'lookup':>8}" + "".join(f" {mode:>10}" for mode in modes))
+    for size in SIZES:
+        routers = [build(size, mode) for mode in modes]
+        last = size // 2 - 1
+        cases = (
+            ("literal", f"/api/v1/item{last}/status"),
+            ("regex", f"/api/v1/item{last}/123"),
+            ("miss", "/api/v1/missing/123"),
+        )
+        for name, resource in cases:
+            line = f"{size:>8} {name:>8}"
+            for rtr in routers:
+                assert (rtr(resource, "GET") is None) == (name == "miss")
+                elapsed = timeit.timeit(
+                    lambda rtr=rtr, res=resource: rtr(res, "GET"), number=NUMBER
+                )
+                line += f" {elapsed / NUMBER * 1e6:>9.2f}u"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""benchmark tls handshakes per second from the client
+
+Run with:
+
+    python3 -m benchmarks.tls
+
+A ping server, with a self-signed certificate (made with the openssl
+command), is run in its own process. Each case connects, sends one request,
+reads the response and closes, over and over:
+
+    per-call - a new SSLContext, with certifi's CA bundle, for each connection
+               (what Client.open used to do)
+    shared - the shared client context, without session resumption
+    resumed - the shared client context, resuming the tls session
+"""
+
+import asyncio
+import multiprocessing
+import os
+import signal
+import ssl
+import subprocess
+import tempfile
+import time
+
+import certifi
+
+import meander
+from meander import runner
+from meander import tls
+
+from benchmarks.workers import PORT, wait_for_server
+
+DURATION = 2.0  # seconds for each case
+
+
+def make_cert(directory: str) -> tuple[str, str]:
+    """make a self-signed certificate and key for localhost"""
+    certfile = os.path.join(directory, "cert.pem")
+    keyfile = os.path.join(directory, "key.pem")
+    subprocess.run(
+        [
+            *("openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1"),
+            *("-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost"),
+            *("-keyout", keyfile, "-out", certfile),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return certfile, keyfile
+
+
+def serve(certfile: str, keyfile: str) -> None:
+    """run the ping server (in its own process)"""
+    server = meander.add_server(port=PORT, ssl_certfile=certfile, ssl_keyfile=keyfile)
+    server.add_route("/ping", "pong", silent=True)
+    runner.run()
+
+
+def per_call_context(certfile: str) -> ssl.SSLContext:
+    """a new context, loaded with certifi's CA bundle and certfile"""
+    context = ssl.create_default_context(cafile=certifi.where())
+    context.load_verify_locations(cafile=certfile)
+    return context
+
+
+def shared_context(certfile: str) -> ssl.SSLContext:
+    """the shared context, forgetting its sessions"""
+    context = tls.client_context(certfile)
+    context.sessions.clear()
+    return context
+
+
+async def measure(get_context, certfile: str) -> float:
+    """return connections (handshakes) per second"""
+    count = 0
+    stop = time.monotonic() + DURATION
+    while time.monotonic() < stop:
+        context = get_context(certfile)
+        reader, writer = await asyncio.open_connection("localhost", PORT, ssl=context)
+        writer.write(b"GET /ping HTTP/1.1\r\nConnection: close\r\n\r\n")
+        await reader.read()
+        if isinstance(context, tls.ClientContext):
+            context.save_session("localhost", writer.get_extra_info("ssl_object"))
+        writer.close()
+        await writer.wait_closed()
+        count += 1
+    return count / DURATION
+
+
+async def run(certfile: str) -> None:
+    """print handshakes per second for each case"""
+    print(f"{'context':>10} {'conn/s':>10}")
+    for name, get_context in (
+        ("per-call", per_call_context),
+        ("shared", shared_context),
+        ("resumed", tls.client_context),
+    ):
+        print(f"{name:>10} {await measure(get_context, certfile):>10.0f}")
+
+
+def main():
+    """start the server, and time connections to it"""
+    with tempfile.TemporaryDirectory() as directory:
+        certfile, keyfile = make_cert(directory)
+        server = multiprocessing.Process(target=serve, args=(certfile, keyfile))
+        server.start()
+        try:
+            wait_for_server()
+            asyncio.run(run(certfile))
+        finally:
+            os.kill(server.pid, signal.SIGTERM)
+            server.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""benchmark server throughput as the number of worker processes grows
+
+Run with:
+
+    python3 -m benchmarks.workers
+
+For each worker count (1, 2, 4, ... up to the number of cores), a server
+is started with meander.run(workers=N), and loaded by one client process
+per core, each with several keep-alive connections sending requests back
+to back. The handler does a little cpu work (building a json response),
+so a single process is cpu bound. Throughput should grow with the number
+of workers until the cores (shared with the clients) run out.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+import meander
+from meander import runner
+
+PORT = 18080
+DURATION = 3.0  # seconds of load for each worker count
+CONNECTIONS = 8  # per client process
+
+
+def handler():
+    """a response that takes some cpu to produce"""
+    return {"items": [{"id": index, "name": f"item {index}"} for index in range(100)]}
+
+
+def serve(workers: int) -> None:
+    """run a server (in its own process)"""
+    meander.add_server(port=PORT).add_route("/items", handler, silent=True)
+    runner.run(workers=workers)
+
+
+def wait_for_server() -> None:
+    """wait until the server accepts connections"""
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", PORT)).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("server did not start")
+
+
+async def client(stop: float, resource: str) -> int:
+    """send requests on one connection until stop, returning the count"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", PORT)
+    request = f"GET {resource} HTTP/1.1\r\n\r\n".encode()
+    count = 0
+    while time.monotonic() < stop:
+        writer.write(request)
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = int(head.lower().split(b"content-length: ")[1].split(b"\r\n")[0])
+        await reader.readexactly(length)
+        count += 1
+    writer.close()
+    return count
+
+
+def load(stop: float, results: multiprocessing.Queue, resource: str) -> None:
+    """run CONNECTIONS clients (in their own process)"""
+
+    async def _load():
+        clients = (client(stop, resource) for _ in range(CONNECTIONS))
+        return sum(await asyncio.gather(*clients))
+
+    results.put(asyncio.run(_load()))
+
+
+def measure(workers: int, clients: int) -> float:
+    """return requests per second for a server with workers"""
+    server = multiprocessing.Process(target=serve, args=(workers,))
+    server.start()
+    try:
+        wait_for_server()
+        results = multiprocessing.Queue()
+        stop = time.monotonic() + DURATION
+        loaders = [
+            multiprocessing.Process(target=load, args=(stop, results, "/items"))
+            for _ in range(clients)
+        ]
+        for loader in loaders:
+            loader.start()
+        total = sum(results.get() for _ in loaders)
+        for loader in loaders:
+            loader.join()
+    finally:
+        os.kill(server.pid, signal.SIGTERM)
+        server.join()
+    return total / DURATION
+
+
+def main():
+    """print requests per second for each worker count"""
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    print(f"cores={cores}")
+    print(f"{'workers':>8} {'req/s':>10}")
+    for workers in counts:
+        print(f"{workers:>8} {measure(workers, cores):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,10 @@
 from .call import call
 from .document import ServerDocument as Request
 from .exception import HTTPException, HTTPBadRequest
-from .response import Response, HTMLResponse, HTMLRefreshResponse
+from .response import Response, ConstantResponse, FileResponse
+from .response import HTMLResponse, HTMLRefreshResponse
 from .runner import run, add_task
 from .server import add_server
+from .session import Session
+from .static import StaticFiles
 from .types_ import ConnectionId, Ignore
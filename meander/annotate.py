@@ -9,9 +9,9 @@ from typing import Any
 from meander import exception
 from meander.document import ServerDocument as Request
 from meander import types_
+from meander.parser import BodyStream
 
 
-@functools.cache
 def get_params(func: Callable) -> list:
     """return list of Param instances for each arg/kwarg of 'func'"""
 
@@ -27,6 +27,7 @@ def get_params(func: Callable) -> list:
         is_connection_id: bool
         is_required: bool
         is_extra_kwarg: bool
+        is_positional: bool
 
     def get_type() -> Callable:
         """return the type converter for the current parameter"""
@@ -59,87 +60,167 @@ def get_params(func: Callable) -> list:
                 param_type == types_.ConnectionId,
                 par.default == par.empty,
                 par.kind == par.VAR_KEYWORD,
+                par.kind == par.POSITIONAL_OR_KEYWORD,
             )
         )
 
     return params
 
 
-def call(func: Callable, request: Request) -> Any:
-    """call 'func' with args/kwargs from request"""
-    # pylint: disable=too-many-branches
-
-    params = get_params(func)
-
-    args = []
-    kwargs = {}
-    content = request.content
-    if len(params) == 0:
-        pass
-    elif len(params) == 1 and (params[0].no_annotation):
-        args.append(content)
-    elif len(params) == 1 and (params[0].is_request):
-        args.append(request)
-    else:
+class Binder:
+    """call a function with args/kwargs from a request using a compiled plan
+
+    The function's parameters are inspected once, and turned into a flat list
+    of steps (the plan) that is executed for each request. These common
+    signatures skip the plan:
+
+        no parameters - func()
+        one un-annotated parameter - func(request.content)
+        one Request parameter - func(request)
+        only url args - func(*request.args), when every parameter is a plain
+                        positional parameter, the request has exactly that many
+                        args, and the request has no other content
+    """
+
+    # plan step kinds
+    VALUE = 0
+    REQUEST = 1
+    CONNECTION_ID = 2
+
+    def __init__(self, func: Callable) -> None:
+        self.func = func
+        params = get_params(func)
+
+        self.arg_names = [param.name for param in params]  # url args, in order
+        self.names = frozenset(self.arg_names)
+        self.extra = None  # name of ** parameter, if any
+        self.plan = []  # (kind, name, type, is_required)
+        for param in params:
+            if param.is_extra_kwarg:
+                self.extra = param.name
+            elif param.is_connection_id:
+                self.plan.append(
+                    (self.CONNECTION_ID, param.name, None, param.is_required)
+                )
+            elif param.is_request:
+                self.plan.append((self.REQUEST, param.name, None, param.is_required))
+            else:
+                self.plan.append(
+                    (self.VALUE, param.name, param.type, param.is_required)
+                )
+
+        if len(params) == 0:
+            self.bind = self.bind_nothing
+        elif len(params) == 1 and params[0].no_annotation:
+            self.bind = self.bind_content
+        elif len(params) == 1 and params[0].is_request:
+            self.bind = self.bind_request
+        elif all(
+            param.is_positional and not param.is_request and not param.is_connection_id
+            for param in params
+        ):
+            self.bind = self.bind_args
+        else:
+            self.bind = self.bind_plan
+
+    def __call__(self, request: Request) -> Any:
+        """call func with args/kwargs from request"""
+        return self.bind(request)  # will return coroutine if async
+
+    def bind_nothing(self, request: Request) -> Any:  # pylint: disable=unused-argument
+        """call a function that takes no arguments"""
+        return self.func()
+
+    def bind_content(self, request: Request) -> Any:
+        """call a function that takes the request content"""
+        return self.func(request.content)
+
+    def bind_request(self, request: Request) -> Any:
+        """call a function that takes the request"""
+        return self.func(request)
+
+    def bind_args(self, request: Request) -> Any:
+        """call a function that takes only positional values"""
+        content = request.content
+        if len(request.args) != len(self.plan) or (
+            content is not None and content != {}
+        ):
+            return self.bind_plan(request)
+        args = []
+        for value, (_, name, convert, _) in zip(request.args, self.plan, strict=True):
+            if content is not None:
+                content[name] = value
+            try:
+                args.append(convert(value))
+            except (AttributeError, ValueError) as err:
+                raise exception.PayloadValueError(name, err) from None
+        return self.func(*args)
+
+    def bind_plan(self, request: Request) -> Any:
+        """call a function by executing the plan"""
+        content = request.content
         if not isinstance(content, dict):
-            if content is None:
-                content = {}
+            if content is None or isinstance(content, BodyStream):
+                content = {}  # a stream route's body is left to the handler
             else:
                 raise exception.PayloadValueError(
                     "content", "expecting content to be a dictionary"
                 )
-        connection_id = f"con={request.connection_id} req={request.id}"
 
-        if len(request.args) > len(params):
-            valid = len(params)
-            raise exception.ExtraAttributeError(request.args[valid:])
+        if len(request.args) > len(self.arg_names):
+            raise exception.ExtraAttributeError(request.args[len(self.arg_names) :])
 
-        for value, param in zip(request.args, params, strict=False):
-            if param.name in content:
-                raise exception.DuplicateAttributeError(param.name)
-            content[param.name] = value
+        for value, name in zip(request.args, self.arg_names, strict=False):
+            if name in content:
+                raise exception.DuplicateAttributeError(name)
+            content[name] = value
 
-        param_names = [param.name for param in params]
-        if extra := [param for param in params if param.is_extra_kwarg]:
+        args = []
+        kwargs = {}
+        if self.extra is not None:
             # scoop up extra (unmatched) k/v content into kwargs
-            (extra,) = extra
-            if extra.name in content:
-                raise exception.ExtraAttributeError([extra.name])
-            for key in content.keys():
-                if key not in param_names:
-                    kwargs[key] = content[key]
+            if self.extra in content:
+                raise exception.ExtraAttributeError([self.extra])
+            for key, value in content.items():
+                if key not in self.names:
+                    kwargs[key] = value
         else:
             # no ** parameter: check for extra content
-            for key in content.keys():
-                if key not in param_names:
+            for key in content:
+                if key not in self.names:
                     raise exception.ExtraAttributeError([key])
 
-        def update_arguments(param, value: Any) -> None:
-            """append value to args or kwargs based on param"""
-            if param.is_required:
-                args.append(value)
+        for kind, name, convert, is_required in self.plan:
+            if kind == self.VALUE:
+                if name not in content:
+                    if is_required:
+                        raise exception.RequiredAttributeError(name)
+                    continue
+                try:
+                    value = convert(content[name])
+                except (AttributeError, ValueError) as err:
+                    raise exception.PayloadValueError(name, err) from None
+            elif name in content:
+                raise exception.ExtraAttributeError([name])
+            elif kind == self.REQUEST:
+                value = request
             else:
-                kwargs[param.name] = value
+                value = f"con={request.connection_id} req={request.id}"
 
-        for param in params:
-            if param.is_connection_id:
-                if param.name in content:
-                    raise exception.ExtraAttributeError([param.name])
-                update_arguments(param, connection_id)
-            elif param.is_request:
-                if param.name in content:
-                    raise exception.ExtraAttributeError([param.name])
-                update_arguments(param, request)
-            elif param.is_extra_kwarg:
-                pass
-            elif param.name not in content:
-                if param.is_required:
-                    raise exception.RequiredAttributeError(param.name)
+            if is_required:
+                args.append(value)
             else:
-                try:
-                    value = param.type(content[param.name])
-                    update_arguments(param, value)
-                except (AttributeError, ValueError) as err:
-                    raise exception.PayloadValueError(param.name, err) from None
+                kwargs[name] = value
 
-    return func(*args, **kwargs)  # will return coroutine if async
+        return self.func(*args, **kwargs)
+
+
+@functools.cache
+def get_binder(func: Callable) -> Binder:
+    """return the (cached) Binder for 'func'"""
+    return Binder(func)
+
+
+def call(func: Callable, request: Request) -> Any:
+    """call 'func' with args/kwargs from request"""
+    return get_binder(func)(request)  # will return coroutine if async
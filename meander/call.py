@@ -1,13 +1,17 @@
 """one-shot http client"""
 
 import asyncio
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Awaitable, Callable
+import contextlib
 import logging
 from urllib.parse import urlparse
 
-from meander.client import Client
+from meander.client import Client, ResponseStream
 from meander import document
+from meander.formatter import HTTPFormat
+from meander.limit import Limit
 from meander import retry_policy
+from meander.session import Session
 
 log = logging.getLogger(__name__)
 
@@ -26,21 +30,31 @@ async def call(  # pylint: disable=too-many-arguments, too-many-locals
     method: str = "GET",
     verbose: bool = False,
     retry: bool | retry_policy.RetryPolicy | None = None,
+    session: Session | None = None,
+    stream: bool = False,
 ) -> document.ClientDocument:
     """Make an HTTP call and return the response in a ClientDocument.
 
     The payload sent to the server is saved in the returned ClientDocument as the
     'request' attribute.
+
+    If a session is specified, a keep-alive connection is taken from (and
+    returned to) its pool, instead of opening and closing a connection for
+    the call. If a reused connection turns out to have been closed by the
+    server, the request is sent again on another connection.
+
+    If stream is True, the call returns once the status line and headers
+    have been read, and the response's content is a ResponseStream, an async
+    iterator over the body (see meander.client.ResponseStream). The
+    connection is held until the body has been read, or the stream closed.
     """
 
     parsed_url = _URL(url)
     if retry is True:
         retry = retry_policy.RetryPolicy()
 
-    async def _call() -> document.ClientDocument:
-        client = Client(verbose=verbose)
-        await client.open(parsed_url.host, parsed_url.port, is_ssl=parsed_url.is_ssl)
-        payload = client.write(
+    def _write(client: Client, close: bool) -> HTTPFormat:
+        return client.write(
             method=method,
             path=parsed_url.path,
             query_string=parsed_url.query,
@@ -50,24 +64,67 @@ async def call(  # pylint: disable=too-many-arguments, too-many-locals
             charset=charset,
             compress=compress,
             bearer=bearer,
-            close=True,
+            close=close,
         )
-        result = await client.read(timeout, active_timeout, max_read_size)
+
+    async def _call() -> document.ClientDocument:
+        client = Client(verbose=verbose)
+        await client.open(parsed_url.host, parsed_url.port, is_ssl=parsed_url.is_ssl)
+        payload = _write(client, close=True)
+        result = await client.read(timeout, active_timeout, max_read_size, stream)
         result.request = payload
-        await client.close()
+        if stream:
+            await _stream(result, client, client.close)
+        else:
+            await client.close()
         return result
 
+    async def _session_call() -> document.ClientDocument:
+        while True:
+            is_reused = False
+            stack = contextlib.AsyncExitStack()  # holds the connection
+            try:
+                client = await stack.enter_async_context(
+                    session.connection(
+                        parsed_url.host, parsed_url.port, parsed_url.is_ssl
+                    )
+                )
+                is_reused = client.requests > 0
+                payload = _write(client, close=False)
+                result = await client.read(
+                    timeout, active_timeout, max_read_size, stream
+                )
+                if result is None:
+                    raise ConnectionResetError("connection closed by server")
+            except BaseException as exc:  # the connection is closed
+                await stack.__aexit__(type(exc), exc, exc.__traceback__)
+                if isinstance(exc, ConnectionError) and is_reused:
+                    # stale keep-alive connection: try another one
+                    log.debug("retry on stale connection to %s", parsed_url.host)
+                    continue
+                raise
+            result.request = payload
+            if stream:
+                await _stream(result, client, stack.aclose)
+            else:
+                await stack.aclose()  # the connection goes back to the pool
+            return result
+
     while True:
-        response = await _call()
+        response = await (_call() if session is None else _session_call())
         status_code = response.http_status_code
         headers = response.http_headers
 
         if status_code in (301, 302) and "location" in headers:
+            if stream:
+                await response.content.close()
             new_url = _URL(headers["location"])
             parsed_url.host = new_url.host
             parsed_url.is_ssl = new_url.is_ssl
 
         elif retry and (delay := retry(status_code)):
+            if stream:
+                await response.content.close()
             await asyncio.sleep(delay)
 
         else:
@@ -76,6 +133,17 @@ async def call(  # pylint: disable=too-many-arguments, too-many-locals
     return response
 
 
+async def _stream(
+    response: document.ClientDocument,
+    client: Client,
+    release: Callable[[], Awaitable],
+) -> None:
+    """make the response's content a ResponseStream that releases the client"""
+    response.content = ResponseStream(response.content, client, release)
+    if response.content.body.is_done:  # no body: release the client now
+        await response.content.close()
+
+
 def _method(name: str) -> Callable:
     """create request call bound to a method"""
 
@@ -92,6 +160,87 @@ call.patch = _method("PATCH")
 call.delete = _method("DELETE")
 
 
+async def as_completed(  # pylint: disable=too-many-arguments, too-many-locals
+    requests: list[str | dict],
+    max_concurrency: int = 10,
+    max_per_host: int = 10,
+    timeout: float | None = None,
+    fail_fast: bool = True,
+    session: Session | None = None,
+) -> AsyncIterator[tuple[int, document.ClientDocument | Exception]]:
+    """Make many HTTP calls, yielding (index, response) as each completes.
+
+    Each request is a url, or a dict of call arguments (including "url").
+    At most max_concurrency calls run at once (0 for no limit), sharing the
+    connections in session; if no session is specified, one is created for
+    the batch (with max_per_host), and closed afterwards.
+
+    If timeout is specified, it is a deadline (in seconds) for the whole
+    batch; calls still running at the deadline are cancelled. If fail_fast
+    is True, the first exception (or the deadline) cancels the remaining
+    calls and is raised; otherwise, the exception is yielded in place of a
+    response (a TimeoutError for each call cancelled at the deadline).
+    """
+    is_own_session = session is None
+    if is_own_session:
+        session = Session(max_per_host=max_per_host)
+    limit = Limit(max_concurrency)
+
+    async def _call(spec: str | dict) -> document.ClientDocument:
+        kwargs = {"url": spec} if isinstance(spec, str) else dict(spec)
+        async with limit:
+            return await call(session=session, **kwargs)
+
+    tasks = {
+        asyncio.create_task(_call(spec)): index for index, spec in enumerate(requests)
+    }
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    try:
+        pending = set(tasks)
+        while pending:
+            remaining = None if deadline is None else max(deadline - loop.time(), 0)
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                if fail_fast:
+                    raise TimeoutError(f"{len(pending)} calls timed out")
+                for task in sorted(pending, key=tasks.get):
+                    yield tasks[task], TimeoutError("call timed out")
+                return
+            for task in sorted(done, key=tasks.get):
+                if (exc := task.exception()) is not None:
+                    if fail_fast:
+                        raise exc
+                    yield tasks[task], exc
+                else:
+                    yield tasks[task], task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if is_own_session:
+            await session.close()
+
+
+async def gather(
+    requests: list[str | dict], **kwargs
+) -> list[document.ClientDocument | Exception]:
+    """Make many HTTP calls, returning the responses in request order.
+
+    The arguments are the same as for as_completed.
+    """
+    results = [None] * len(requests)
+    async for index, result in as_completed(requests, **kwargs):
+        results[index] = result
+    return results
+
+
+call.as_completed = as_completed
+call.gather = gather
+
+
 class _URL:  # pylint: disable=too-few-public-methods
     """url parser"""
 
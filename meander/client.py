@@ -1,34 +1,80 @@
 """http client"""
 
 import asyncio
-from dataclasses import dataclass
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+import inspect
 import logging
-import ssl
-
-import certifi
+import os
+from typing import Any
 
 from meander.document import ClientDocument
-from meander.parser import HTTPReader
+from meander.parser import BodyStream, HTTPReader
 from meander.formatter import HTTPFormat
+from meander.resolver import Resolver, default_resolver
+from meander import tls
 
 log = logging.getLogger(__name__)
 
 
 @dataclass
 class Client:
-    """async http client"""
+    """async http client
+
+    https servers are verified with cafile (certifi's CA bundle, by
+    default), using a shared ssl context that resumes tls sessions.
+
+    host names are resolved (and connected) with resolver, which caches
+    lookups; by default, a resolver shared by all clients is used. if
+    resolver is None, asyncio.open_connection resolves the host.
+    """
 
     verbose: bool = False
+    parser_backend: str | None = None
+    cafile: str | None = None
+    resolver: Resolver | None = field(default_factory=default_resolver)
+    requests: int = field(default=0, init=False)  # written on this connection
+    is_keep_alive: bool = field(default=True, init=False)  # nobody asked to close
+    ssl_context: tls.ClientContext | None = field(default=None, init=False)
 
     async def open(self, host: str, port: int, is_ssl: bool = False) -> None:
         """open a connection to host/port"""
         # pylint: disable=attribute-defined-outside-init
         self.host = host
-        ssl_context = (
-            ssl.create_default_context(cafile=certifi.where()) if is_ssl else None
+        self.ssl_context = tls.client_context(self.cafile) if is_ssl else None
+        if self.resolver is None:
+            reader, self.writer = await asyncio.open_connection(
+                host, port, ssl=self.ssl_context
+            )
+        else:
+            sock = await self.resolver.connect(host, port)
+            try:
+                reader, self.writer = await asyncio.open_connection(
+                    sock=sock,
+                    ssl=self.ssl_context,
+                    server_hostname=host if self.ssl_context else None,
+                )
+            except BaseException:
+                sock.close()
+                raise
+        self.reader = HTTPReader(reader, is_server=False, backend=self.parser_backend)
+
+    @property
+    def is_stale(self) -> bool:
+        """True if the connection can't be used for another request
+
+        an idle keep-alive connection is stale if it is closed, if the server
+        has closed its end, or if unexpected data has arrived on it.
+        """
+        stream = self.reader.reader
+        return (
+            not self.is_keep_alive
+            or self.writer.is_closing()
+            or stream.at_eof()
+            or stream.exception() is not None
+            or bool(stream._buffer)  # pylint: disable=protected-access
+            or self.reader.available > 0
         )
-        reader, self.writer = await asyncio.open_connection(host, port, ssl=ssl_context)
-        self.reader = HTTPReader(reader, is_server=False)
 
     def write(  # pylint: disable=too-many-arguments
         self,
@@ -63,6 +109,8 @@ class Client:
             close=close,
         )
         self.writer.write(payload.serial())
+        self.requests += 1
+        self.is_keep_alive = not close
 
         if self.verbose:
             log.debug(payload.serial())
@@ -74,18 +122,33 @@ class Client:
         timeout: int = 60,
         active_timeout: int = 5,
         max_read_size: int = 5000,
-    ) -> ClientDocument:
-        """read response from socket"""
+        stream: bool = False,
+    ) -> ClientDocument | None:
+        """read response from socket (None if the connection closed first)
+
+        if stream is True, only the status line and headers are read, and
+        the result's content is a BodyStream that reads the body as it is
+        iterated. the body must be read before the next response.
+        """
         self.reader.timeout = timeout
         self.reader.active_timeout = active_timeout
         self.reader.max_read_size = max_read_size
 
-        result = await self.reader.read_document()
+        result = await self.reader.read_document(stream)
+        if result is None:
+            self.is_keep_alive = False
+            return None
+        self.is_keep_alive = self.is_keep_alive and result.is_keep_alive
+        if self.requests == 1 and self.ssl_context is not None:
+            self.ssl_context.save_session(
+                self.host, self.writer.get_extra_info("ssl_object")
+            )
 
         if self.verbose:
             log.debug("%s %s", result.http_status_code, result.http_status_message)
             log.debug(result.http_headers)
-            log.debug(result.http_content)
+            if not stream:
+                log.debug(result.http_content)
 
         return result
 
@@ -93,3 +156,75 @@ class Client:
         """close the writer"""
         self.writer.close()
         await self.writer.wait_closed()
+
+
+class ResponseStream:
+    """async iterator over the body of a streamed response (bytes)
+
+    Usage:
+
+        response = await call(url, stream=True)
+        async with response.content as body:
+            async for data in body:
+                ...
+
+    The body is read from the connection as it is iterated, and a gzip
+    content-encoding is decompressed as it arrives. Once the whole body has
+    been read, or close is called, the connection is released (returned to
+    its session, or closed); a connection whose body wasn't read to the end
+    is closed.
+    """
+
+    def __init__(
+        self, body: BodyStream, client: Client, release: Callable[[], Awaitable]
+    ) -> None:
+        self.body = body
+        self.client = client
+        self.release = release
+        self.is_released = False
+
+    def __aiter__(self) -> "ResponseStream":
+        return self
+
+    async def __anext__(self) -> bytes:
+        try:
+            return await anext(self.body)
+        except BaseException:  # including StopAsyncIteration, at the end
+            await self.close()
+            raise
+
+    async def __aenter__(self) -> "ResponseStream":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def read(self) -> bytes:
+        """read the rest of the body"""
+        return b"".join([data async for data in self])
+
+    async def write_to(self, sink: str | os.PathLike | Any) -> int:
+        """write the rest of the body to sink, returning the number of bytes
+
+        sink is the path of a file, or an object with a write method (which
+        may be async), for instance an open file.
+        """
+        if isinstance(sink, str | os.PathLike):
+            with open(sink, "wb") as file:
+                return await self.write_to(file)
+        count = 0
+        async for data in self:
+            result = sink.write(data)
+            if inspect.isawaitable(result):
+                await result
+            count += len(data)
+        return count
+
+    async def close(self) -> None:
+        """release the connection"""
+        if self.is_released:
+            return
+        self.is_released = True
+        if not self.body.is_done:
+            self.client.is_keep_alive = False
+        await self.release()
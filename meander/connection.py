@@ -1,6 +1,9 @@
 """wrap tcp socket with HTTP logic"""
 
 import asyncio
+import collections
+import inspect
+import io
 import itertools
 import logging
 import time
@@ -8,10 +11,12 @@ import time
 from meander import annotate
 from meander import exception
 from meander.document import ServerDocument
-from meander.parser import HTTPReader
-from meander.parser import parse
-from meander.response import Response
-from meander.router import Router
+from meander.exception import HTTPEOF
+from meander.limit import Limit
+from meander.parser import BodyStream, HTTPReader
+from meander.parser import parse_server_body, parse_server_head
+from meander.response import ConstantResponse, FileResponse, Response
+from meander.router import Endpoint, Router
 
 log = logging.getLogger(__package__)
 
@@ -20,24 +25,53 @@ connection_sequence = itertools.count(1)
 request_sequence = itertools.count(1)
 
 
-class Connection:
-    """handle requests arriving on an HTTP connection"""
+class Unrouted:  # pylint: disable=too-few-public-methods
+    """type of UNROUTED, the route of a request that hasn't been looked up"""
 
+
+UNROUTED = Unrouted()
+
+
+class Connection:  # pylint: disable=too-many-instance-attributes
+    """handle requests arriving on an HTTP connection
+
+    Requests are handled one at a time, unless pipeline_limit is greater than
+    one; then, requests that a client has already sent (pipelined) are parsed
+    while earlier requests are being handled, and up to pipeline_limit
+    handlers run concurrently. Responses are always written in request order.
+
+    shutdown closes the connection as soon as it is idle: immediately, if it
+    is waiting for a new request, or else after the response to the current
+    request(s).
+    """
+
+    # pylint: disable-next=too-many-arguments, too-many-positional-arguments
     def __init__(
         self,
         reader: asyncio.StreamReader,
         writer: asyncio.StreamWriter,
         router: Router,
         name: str | None = None,
+        parser_backend: str | None = None,
+        pipeline_limit: int = 0,
+        in_flight: Limit | None = None,
     ) -> None:
         """initialize connection with reader, writer, router, and server name"""
         self.cid = next(connection_sequence)
-        self.reader = HTTPReader(reader)
+        if isinstance(reader, HTTPReader):  # eg, a ProtocolReader
+            self.reader = reader
+        else:
+            self.reader = HTTPReader(reader, backend=parser_backend)
         self.writer = writer
         self.router = router
+        self.pipeline_limit = pipeline_limit
+        self.in_flight = in_flight or Limit()  # running handlers
 
         self.silent = False
         self.message = None
+        self.task = None  # the Task running handle
+        self.is_waiting = False  # waiting for the start of the next request
+        self.is_closing = False
 
         peerhost, peerport = self.writer.get_extra_info("peername")[:2]
         self.open_msg = f"open server={name} " if name else ""
@@ -47,9 +81,19 @@ class Connection:
         """handle new connection"""
 
         t_start = time.perf_counter()
+        self.task = asyncio.current_task()
         try:
-            while await self.next_request():
-                pass
+            if self.pipeline_limit > 1:
+                await self.handle_pipelined()
+            else:
+                while not self.is_closing and await self.next_request():
+                    pass
+        except asyncio.CancelledError:
+            if not self.is_closing:
+                raise
+            # cancelled by Server.shutdown (after shutdown_timeout): finish
+            # normally, since asyncio logs an error for a cancelled callback
+            self.task.uncancel()
         finally:
             if not self.silent:
                 elapsed = f"t={time.perf_counter() - t_start:.6f}"
@@ -66,87 +110,331 @@ class Connection:
         reason_code = 200
         r_start = time.perf_counter()
         try:
-            if request := await parse(self.reader):
+            if request := await self.read_request():
                 r_start = time.perf_counter()
-                return await self.handle_request(request)
-        except (
-            exception.DuplicateAttributeError,
-            exception.ExtraAttributeError,
-            exception.PayloadValueError,
-            exception.RequiredAttributeError,
-        ) as err:
-            reason_code = 400
-            result = Response(str(err), 400, "Bad Request")
-            self.writer.write(result.serial())
+                return await self.handle_request(*request)
         except asyncio.exceptions.TimeoutError:
             log.info("timeout cid=%s", self.cid)
-        except exception.HTTPException as exc:
-            reason_code = exc.code
-            result = self.on_http_exception(exc)
-            self.writer.write(result.serial())
         except ConnectionResetError:
             log.info("connection cid=%s reset by peer", self.cid)
-        except Exception:  # pylint: disable=broad-exception-caught
-            log.exception("exception: cid=%s", self.cid)
-            reason_code = 500
-            result = self.on_exception()
-            self.writer.write(result.serial())
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            reason_code, result = self.on_error(exc)
+            self.writer.writelines(result.buffers())
         finally:
-            if not self.silent:
-                if self.open_msg:
-                    log.info(self.open_msg)
-                if self.message:
-                    self.message += (
-                        f" status={reason_code} t={time.perf_counter() - r_start:f}"
-                    )
-                    log.info(self.message)
+            self.log_request(reason_code, r_start)
 
-    async def handle_request(self, request: ServerDocument) -> bool:
-        """handle a single request"""
+    async def handle_pipelined(self) -> None:
+        """handle pipelined requests concurrently, writing responses in order
+
+        A request is parsed while earlier requests are in flight only if it
+        has already (at least partly) arrived; otherwise, every in flight
+        response is written before waiting for the next request. A STREAM
+        route, a request that closes the connection, or a request that
+        can't be parsed is handled after everything before it is written,
+        and before anything after it is parsed.
+        """
+        in_flight = collections.deque()  # (request, message, r_start, task)
+
+        async def write_ready(wait_all: bool) -> bool:
+            """write responses in order; False if the connection is done"""
+            while in_flight and (
+                wait_all
+                or in_flight[0][3].done()
+                or len(in_flight) >= self.pipeline_limit
+                or not self.reader.available
+            ):
+                if not await self.write_pipelined(*in_flight.popleft()):
+                    return False
+            return True
+
+        try:
+            while await write_ready(wait_all=False):
+                if self.is_closing:
+                    await write_ready(wait_all=True)
+                    break
+                self.message = None
+                r_start = time.perf_counter()
+                try:
+                    if not (item := await self.read_request()):
+                        await write_ready(wait_all=True)
+                        break
+                except asyncio.exceptions.TimeoutError:
+                    log.info("timeout cid=%s", self.cid)
+                    await write_ready(wait_all=True)
+                    break
+                except ConnectionResetError:
+                    log.info("connection cid=%s reset by peer", self.cid)
+                    break
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    task = asyncio.get_running_loop().create_future()
+                    task.set_result((*self.on_error(exc), False))
+                    in_flight.append((None, self.message, r_start, task))
+                    await write_ready(wait_all=True)
+                    break
+
+                request, route = item
+                message = self.start_request(request)
+                task = asyncio.create_task(self.run_pipelined(request, route))
+                in_flight.append((request, message, time.perf_counter(), task))
+                if (route is not None and route.stream) or not request.is_keep_alive:
+                    if not await write_ready(wait_all=True):
+                        break
+        finally:
+            for *_, task in in_flight:
+                task.cancel()
+
+    async def run_pipelined(
+        self, request: ServerDocument, route: Endpoint | None
+    ) -> tuple[int, Response, bool]:
+        """run a handler, returning (reason code, response, is_ok)"""
+        try:
+            return 200, await self.run_handler(request, route), True
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            return *self.on_error(exc), False
+
+    async def write_pipelined(
+        self,
+        request: ServerDocument | None,
+        message: str | None,
+        r_start: float,
+        task: asyncio.Future,
+    ) -> bool:
+        """write the response of a pipelined request when it is ready
+
+        returns True if the connection can handle more requests.
+        """
+        reason_code, result, is_ok = await task
+        self.message = message
+        try:
+            if is_ok:
+                return await self.write_response(request, result)
+            self.writer.writelines(result.buffers())
+            return False
+        except ConnectionResetError:
+            log.info("connection cid=%s reset by peer", self.cid)
+            return False
+        finally:
+            self.log_request(reason_code, r_start)
+
+    def shutdown(self) -> None:
+        """close the connection once it is idle (see class docstring)
+
+        an idle connection's transport is closed, rather than its task
+        cancelled, so the wait for the next request ends with an EOF and the
+        task finishes normally (asyncio logs an error for a cancelled
+        connection callback).
+        """
+        self.is_closing = True
+        if self.is_waiting and not self.reader.available:
+            self.writer.close()
+
+    def log_request(self, reason_code: int, r_start: float) -> None:
+        """log the connection (if not yet logged) and the current request"""
+        if not self.silent:
+            if self.open_msg:
+                log.info(self.open_msg)
+            if self.message:
+                self.message += (
+                    f" status={reason_code} t={time.perf_counter() - r_start:f}"
+                )
+                log.info(self.message)
+
+    async def read_request(self) -> tuple[ServerDocument, Endpoint | None] | None:
+        """read the next request and its route
+
+        the route is looked up before the body is read, so that the body of a
+        stream route can be left on the connection for the handler to read.
+        """
+        request = ServerDocument()
+        try:
+            self.is_waiting = True
+            try:
+                await parse_server_head(self.reader, request)
+            finally:
+                self.is_waiting = False
+            route = self.router(request.http_resource, request.http_method)
+            await parse_server_body(
+                self.reader, request, route is not None and route.stream
+            )
+        except HTTPEOF:
+            return None
+        return request, route
+
+    def start_request(self, request: ServerDocument) -> str:
+        """assign ids to request, and return its log message"""
         rid = next(request_sequence)
         request.id = rid
         request.connection_id = self.cid
-        self.message = (
+        return (
             f"request cid={self.cid}"
             f" rid={rid} method={request.http_method}"
             f" resource={request.http_resource}"
         )
-        if route := self.router(request.http_resource, request.http_method):
-            self.silent = route.silent
-            if self.open_msg:
-                if not self.silent:
-                    log.info(self.open_msg)
-                self.open_msg = None
-            request.args = route.args
-
-            for before in route.before:
-                result = before(request)
-                if asyncio.iscoroutine(result):
-                    await result
-
-            result = annotate.call(route.handler, request)
-            if asyncio.iscoroutine(result):
-                result = await result
-
-            for after in route.after:
-                after_result = after(request, result)
-                if asyncio.iscoroutine(after_result):
-                    after_result = await after_result
-                if after_result is not None:
-                    result = after_result
-
-            if result is None:
-                result = ""
-            if not isinstance(result, Response):
-                result = Response(result)
-            self.writer.write(result.serial())
-            return request.is_keep_alive
-
-        raise exception.HTTPException(404, "Not Found")
+
+    async def handle_request(
+        self, request: ServerDocument, route: Endpoint | Unrouted | None = UNROUTED
+    ) -> bool:
+        """handle a single request"""
+        self.message = self.start_request(request)
+        result = await self.run_handler(request, route)
+        return await self.write_response(request, result)
+
+    async def run_handler(
+        self, request: ServerDocument, route: Endpoint | Unrouted | None = UNROUTED
+    ) -> Response:
+        """route a request, and return the response from its handler
+
+        route is the request's Endpoint (None if no route matched), if
+        read_request has already looked it up.
+        """
+        if route is UNROUTED:
+            route = self.router(request.http_resource, request.http_method)
+        if not route:
+            if allowed := self.router.allowed(request.http_resource):
+                raise exception.HTTPException(
+                    405, "Method Not Allowed", headers={"Allow": ", ".join(allowed)}
+                )
+            raise exception.HTTPException(404, "Not Found")
+
+        self.silent = route.silent
+        if self.open_msg:
+            if not self.silent:
+                log.info(self.open_msg)
+            self.open_msg = None
+        if route.constant is not None:
+            return route.constant  # nothing to run
+        request.args = route.args
+
+        async with self.in_flight:
+            return await self.run_route(request, route)
+
+    async def run_route(self, request: ServerDocument, route: Endpoint) -> Response:
+        """run a route's before hooks, handler and after hooks"""
+        for before in route.before:
+            result = before(request)
+            if inspect.isawaitable(result):
+                await result
+
+        binder = route.binder or annotate.get_binder(route.handler)
+        result = binder(request)
+        if inspect.isawaitable(result):
+            result = await result
+
+        for after in route.after:
+            after_result = after(request, result)
+            if inspect.isawaitable(after_result):
+                after_result = await after_result
+            if after_result is not None:
+                result = after_result
+
+        if result is None:
+            result = ""
+        if not isinstance(result, Response):
+            result = Response(result)
+        return result
+
+    async def write_response(self, request: ServerDocument, result: Response) -> bool:
+        """write a response, returning True if the connection can be reused"""
+        if isinstance(result, ConstantResponse):
+            self.writer.writelines(result.buffers(close=self.is_closing))
+        else:
+            if self.is_closing:
+                result.headers.setdefault("Connection", "close")
+            self.writer.writelines(result.buffers())
+        if isinstance(result, FileResponse):
+            if not await self.write_file(result):
+                return False
+        elif result.is_streaming:
+            if not await self.write_chunks(result):
+                return False
+        else:
+            await self.writer.drain()  # wait if above the high watermark
+        if isinstance(request.content, BodyStream) and not request.content.is_done:
+            return False  # unread body: the connection can't be reused
+        return request.is_keep_alive and not self.is_closing
+
+    async def write_chunks(self, result: Response) -> bool:
+        """write the body of a streaming response as it is produced
+
+        the writer is drained after each chunk, so that a slow client holds
+        back the producer instead of filling memory. the status and headers
+        are already sent, so if the producer fails, the response is cut
+        short, and False is returned (the connection must be closed).
+        """
+        try:
+            async for chunk in result.chunks():
+                self.writer.write(chunk)
+                await self.writer.drain()
+        except ConnectionResetError:
+            log.info("connection cid=%s reset by peer", self.cid)
+            return False
+        except Exception:  # pylint: disable=broad-exception-caught
+            log.exception("exception streaming response: cid=%s", self.cid)
+            return False
+        return True
+
+    async def write_file(self, result: FileResponse) -> bool:
+        """write the body of a file response with loop.sendfile
+
+        where the transport allows, the file is sent by the kernel without
+        being copied into python; otherwise, sendfile falls back to reading
+        and writing the file in pieces. if the whole body can't be sent, False
+        is returned (the connection must be closed).
+        """
+        if not result.count:
+            return True
+        loop = asyncio.get_running_loop()
+        try:
+            with open(result.path, "rb") as file:
+                try:
+                    sent = await loop.sendfile(
+                        self.writer.transport, file, result.offset, result.count
+                    )
+                except NotImplementedError:  # eg, uvloop
+                    sent = await self.copy_file(file, result.offset, result.count)
+        except ConnectionResetError:
+            log.info("connection cid=%s reset by peer", self.cid)
+            return False
+        except OSError:
+            log.exception("exception sending file: cid=%s", self.cid)
+            return False
+        return sent == result.count
+
+    async def copy_file(self, file: io.BufferedReader, offset: int, count: int) -> int:
+        """write count bytes of file, starting at offset, a block at a time"""
+        file.seek(offset)
+        sent = 0
+        while sent < count and (data := file.read(min(count - sent, 65536))):
+            self.writer.write(data)
+            await self.writer.drain()
+            sent += len(data)
+        return sent
+
+    def on_error(self, exc: Exception) -> tuple[int, Response]:
+        """return the reason code and response for an exception"""
+        if isinstance(
+            exc,
+            (
+                exception.DuplicateAttributeError,
+                exception.ExtraAttributeError,
+                exception.PayloadValueError,
+                exception.RequiredAttributeError,
+            ),
+        ):
+            return 400, Response(str(exc), 400, "Bad Request")
+        if isinstance(exc, exception.HTTPException):
+            return exc.code, self.on_http_exception(exc)
+        log.exception("exception: cid=%s", self.cid)
+        return 500, self.on_exception()
 
     def on_http_exception(self, exc: exception.HTTPException) -> Response:
         """handle http exception response"""
-        return Response(code=exc.code, message=exc.reason, content=exc.explanation)
+        return Response(
+            code=exc.code,
+            message=exc.reason,
+            content=exc.explanation,
+            headers=exc.headers,
+        )
 
     def on_exception(self) -> Response:
         """handle general exception response"""
@@ -6,11 +6,18 @@ from typing import Any
 class HTTPException(Exception):
     """add http attributes to base exception"""
 
-    def __init__(self, code: int, reason: str, explanation: str = "") -> None:
+    def __init__(
+        self,
+        code: int,
+        reason: str,
+        explanation: str = "",
+        headers: dict | None = None,
+    ) -> None:
         super(HTTPException).__init__()
         self.code = code
         self.reason = reason
         self.explanation = explanation
+        self.headers = headers
 
 
 class HTTPBadRequest(HTTPException):
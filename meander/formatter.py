@@ -1,16 +1,43 @@
 """formatters for HTTP documents"""
 
+from collections.abc import AsyncIterator, Iterator
 from dataclasses import dataclass, field
+import email.utils
+import functools
 import gzip
 import json
 import time
 from typing import Any
 import urllib.parse as urlparse
+import zlib
+
+_date = (0, "")  # (second, Date header value for that second)
+
+
+def http_date() -> str:
+    """return the current time in HTTP (GMT) format, cached for a second"""
+    global _date  # pylint: disable=global-statement
+    now = int(time.time())
+    if now != _date[0]:
+        _date = (now, email.utils.formatdate(now, usegmt=True))
+    return _date[1]
+
+
+@functools.lru_cache(maxsize=256)
+def status_line(code: int, message: str) -> bytes:
+    """return the encoded status line for a response"""
+    return f"HTTP/1.1 {code} {message}\r\n".encode("ascii")
 
 
 @dataclass
 class HTTPFormat:  # pylint: disable=too-many-instance-attributes
-    """format an http document"""
+    """format an http document
+
+    if content is an iterator (for instance, a generator) or an async
+    iterator, the document is streamed: serial returns only the status line
+    and headers, and chunks produces the body, one piece of content at a
+    time, with chunked transfer-encoding.
+    """
 
     content: Any = ""
 
@@ -77,6 +104,11 @@ class HTTPFormat:  # pylint: disable=too-many-instance-attributes
             self.content_type = None
         self.fmt_headers(header_lower)
 
+    @property
+    def is_streaming(self) -> bool:
+        """True if content is produced by an iterator"""
+        return isinstance(self.content, Iterator | AsyncIterator)
+
     def fmt_content(self, header_lower: dict) -> None:
         """normalize content and content_type
 
@@ -87,6 +119,14 @@ class HTTPFormat:  # pylint: disable=too-many-instance-attributes
         if not self.content_type:
             self.content_type = header_lower.get("content-type", None)
 
+        if self.is_streaming:
+            # pieces of content are encoded as they are produced (see chunks)
+            if not self.content_type:
+                self.content_type = "text/plain"
+            if self.charset:
+                self.content_type += f"; charset={self.charset}"
+            return
+
         if not self.content_type:
             if isinstance(self.content, int):
                 self.content = str(self.content)
@@ -120,11 +160,12 @@ class HTTPFormat:  # pylint: disable=too-many-instance-attributes
             self.headers["Content-Encoding"] = "gzip"
 
         if "date" not in header_lower:
-            self.headers["Date"] = time.strftime(
-                "%a, %d %b %Y %H:%M:%S %Z", time.localtime()
-            )
+            self.headers["Date"] = http_date()
 
-        if "content-length" not in header_lower:
+        if self.is_streaming:
+            if "content-length" not in header_lower:
+                self.headers["Transfer-Encoding"] = "chunked"
+        elif "content-length" not in header_lower:
             self.headers["Content-Length"] = len(self.content)
 
         if self.close:
@@ -133,11 +174,60 @@ class HTTPFormat:  # pylint: disable=too-many-instance-attributes
 
     def serial(self) -> bytes:
         """return formatted response"""
-        headers = "\r\n".join([f"{k}: {v}" for k, v in self.headers.items()])
-        headers = f"{self.status}\r\n{headers}\r\n\r\n"
-        headers = headers.encode("ascii")
+        return b"".join(self.buffers())
 
-        return headers + self.content if self.content else headers
+    def buffers(self) -> list[bytes]:
+        """return formatted response as a list of buffers (for writelines)
+
+        the status line, the headers, and the content (if any) are separate
+        buffers, so the content is never copied to join it to the headers.
+        """
+        if self.is_response:
+            status = status_line(self.code, self.message)
+        else:
+            status = f"{self.status}\r\n".encode("ascii")
+        headers = "".join([f"{k}: {v}\r\n" for k, v in self.headers.items()])
+        buffers = [status, f"{headers}\r\n".encode("ascii")]
+
+        if self.content and not self.is_streaming:
+            buffers.append(self.content)
+        return buffers
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """produce the body of a streaming document, one write at a time
+
+        each piece of content (str or bytes) is encoded and, if compress is
+        set, compressed. unless a content-length header was specified, each
+        piece is framed as a chunk, and the body ends with a last-chunk.
+        """
+        is_chunked = "Transfer-Encoding" in self.headers
+        compressor = zlib.compressobj(wbits=31) if self.compress else None
+
+        def frame(data: bytes) -> bytes:
+            if is_chunked:
+                return f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n"
+            return data
+
+        def encode(piece: str | bytes) -> bytes:
+            if isinstance(piece, str):
+                piece = piece.encode(self.charset or "utf-8")
+            if compressor is not None:
+                piece = compressor.compress(piece)
+            return piece
+
+        if isinstance(self.content, AsyncIterator):
+            async for piece in self.content:
+                if data := encode(piece):
+                    yield frame(data)
+        else:
+            for piece in self.content:
+                if data := encode(piece):
+                    yield frame(data)
+
+        if compressor is not None:
+            yield frame(compressor.flush())
+        if is_chunked:
+            yield b"0\r\n\r\n"
 
 
 def _normalize(dct: dict) -> list[tuple]:
@@ -0,0 +1,35 @@
+"""count concurrent activity, with an optional maximum"""
+
+import asyncio
+
+
+class Limit:
+    """async context manager that counts the code running inside it
+
+    current is the number of entries that haven't exited; peak is the
+    highest value that current has reached. If maximum is non-zero, entry
+    waits until current is less than maximum.
+    """
+
+    def __init__(self, maximum: int = 0) -> None:
+        self.maximum = maximum
+        self.semaphore = asyncio.Semaphore(maximum) if maximum else None
+        self.current = 0
+        self.peak = 0
+
+    @property
+    def is_full(self) -> bool:
+        """True if entry would wait"""
+        return self.semaphore is not None and self.semaphore.locked()
+
+    async def __aenter__(self) -> "Limit":
+        if self.semaphore is not None:
+            await self.semaphore.acquire()
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.current -= 1
+        if self.semaphore is not None:
+            self.semaphore.release()
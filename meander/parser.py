@@ -5,10 +5,21 @@ import gzip
 import json
 import re
 import urllib.parse as urlparse
+import zlib
+
+try:
+    import httptools
+except ImportError:  # pragma: no cover
+    httptools = None
 
 from meander.exception import HTTPException, HTTPEOF
 from meander.document import ClientDocument, ServerDocument
 
+HEADER_BLOCK_END = re.compile(rb"\n\r?\n")
+
+BACKENDS = ("python", "httptools") if httptools else ("python",)
+BACKEND = "python"  # default backend for new HTTPReaders
+
 
 class HTTPReader:  # pylint: disable=too-many-instance-attributes
     """stream reader that supports a max line length and timeout
@@ -26,6 +37,9 @@ class HTTPReader:  # pylint: disable=too-many-instance-attributes
         3. each read will grab no more than "max_read_size" bytes from
            the connection, allowing for equitable use of network resources
            between connections
+        4. "backend" selects how the status line and headers are parsed:
+           "python" (the default), "httptools" (requires the optional
+           httptools package), or "auto" (httptools, if installed)
     """
 
     def __init__(  # pylint: disable=too-many-arguments
@@ -38,7 +52,14 @@ class HTTPReader:  # pylint: disable=too-many-instance-attributes
         active_timeout: int = 5,
         max_read_size: int = 5000,
         is_server: bool = True,
+        backend: str | None = None,
     ) -> None:
+        backend = backend or BACKEND
+        if backend == "auto":
+            backend = BACKENDS[-1]
+        if backend not in BACKENDS:
+            raise ValueError(f"parser backend not available: {backend}")
+        self.backend = backend
         self.reader = reader
         self.max_line_length = max_line_length
         self.max_header_count = max_header_count
@@ -47,15 +68,34 @@ class HTTPReader:  # pylint: disable=too-many-instance-attributes
         self.active_timeout = active_timeout  # time to wait for more data
         self.max_read_size = max_read_size
         self.is_server = is_server
-        self.buffer = b""
+        self.buffer = bytearray()
+        self.offset = 0  # start of unread data in buffer
+        self.scanned = 0  # buffer is known not to contain b"\n" before here
+
+    @property
+    def available(self) -> int:
+        """the number of unread bytes in the buffer"""
+        return len(self.buffer) - self.offset
+
+    def consume(self, end: int) -> bytes:
+        """remove and return unread data up to buffer[end]"""
+        with memoryview(self.buffer) as view:
+            data = bytes(view[self.offset : end])
+        self.offset = end
+        return data
 
     async def read_block(self) -> None:
-        """read a block from the underlying stream"""
+        """read a block from the underlying stream
+
+        data that has already been read is discarded from the front of the
+        buffer before more data is added, so the buffer only holds a partial
+        document (or line) at a time.
+        """
 
         async def _read() -> bytes:
             return await self.reader.read(self.max_read_size)
 
-        if len(self.buffer):
+        if self.available:
             timeout = self.active_timeout
         else:
             timeout = self.timeout
@@ -64,41 +104,130 @@ class HTTPReader:  # pylint: disable=too-many-instance-attributes
         if len(data) == 0:
             raise HTTPEOF()
 
+        if self.offset:
+            del self.buffer[: self.offset]
+            self.scanned = max(self.scanned - self.offset, 0)
+            self.offset = 0
         self.buffer += data
 
     async def read(self, length: int) -> bytes:
         """read length bytes"""
-        while True:
-            if len(self.buffer) >= length:
-                data, self.buffer = self.buffer[:length], self.buffer[length:]
-                return data
+        while self.available < length:
             await self.read_block()
+        return self.consume(self.offset + length)
+
+    async def read_some(self, limit: int) -> bytes:
+        """read between one and limit bytes
+
+        whatever is already buffered is returned without waiting; a block is
+        read from the stream only if the buffer is empty.
+        """
+        if not self.available:
+            await self.read_block()
+        return self.consume(self.offset + min(limit, self.available))
 
     async def readline(self) -> str:
         """read a line (ends in \n or \r\n) as ascii"""
         while True:
-            test = self.buffer.split(b"\n", 1)
-            if len(test) == 2:
-                line, self.buffer = test
-                if line.endswith(b"\r"):
-                    line = line[:-1]
-                if len(line) > self.max_line_length:
+            end = self.buffer.find(b"\n", max(self.scanned, self.offset))
+            if end != -1:
+                stop = end
+                if stop > self.offset and self.buffer[stop - 1] == ord("\r"):
+                    stop -= 1
+                if stop - self.offset > self.max_line_length:
                     raise HTTPException(431, "Request Header Fields Too Large")
-                return line.decode("ascii")
+                line = self.buffer[self.offset : stop].decode("ascii")
+                self.offset = end + 1
+                return line
 
-            if len(self.buffer) > self.max_line_length:
+            if self.available > self.max_line_length:
                 raise HTTPException(
                     431, "Request Header Fields Too Large", "no end of line encountered"
                 )
+            self.scanned = len(self.buffer)
             await self.read_block()
 
-    async def read_document(self) -> ClientDocument | ServerDocument | None:
-        """read the next document from the reader"""
-        return await parse(self)
+    async def read_header_block(self) -> list[str] | None:
+        """read lines up to an empty line (the header block) in one pass
 
+        waits until the whole block, ending in an empty line, is in the
+        buffer and splits it into lines (without line endings). if more than
+        max_line_length bytes arrive without the end of the block, None is
+        returned, and the caller should continue with readline.
+        """
+        searched = 0  # bytes after offset already searched for the end
+        while True:
+            start = self.offset
+            if self.buffer.startswith(b"\n", start):
+                self.offset += 1
+                return []
+            if self.buffer.startswith(b"\r\n", start):
+                self.offset += 2
+                return []
+            if match := HEADER_BLOCK_END.search(
+                self.buffer, start + searched, start + self.max_line_length + 4
+            ):
+                break
+            if self.available > self.max_line_length:
+                return None
+            searched = max(self.available - 2, 0)
+            await self.read_block()
 
-async def parse(reader: HTTPReader) -> ClientDocument | ServerDocument | None:
-    """parse an HTTP document from a stream"""
+        self.offset = match.end()
+        end = match.start()
+        if self.buffer[end - 1] == ord("\r"):
+            end -= 1
+        text = self.buffer[start:end].decode("ascii")
+        lines = text.split("\r\n")
+        if len(lines) <= text.count("\n"):  # some lines end in a bare \n
+            lines = text.replace("\r\n", "\n").split("\n")
+        if max(map(len, lines)) > self.max_line_length:
+            raise HTTPException(431, "Request Header Fields Too Large")
+        return lines
+
+    async def peek_head(self) -> bytes | None:
+        """wait for a complete start line and header block, and return it
+
+        the head is not consumed. None is returned if the head is longer than
+        max_line_length (so no line in a returned head can be too long),
+        starts with an empty line, or if the stream ends with a partial head
+        in the buffer. a timeout is raised, as it is by the python parser,
+        rather than waiting for the rest of the head a second time.
+        """
+        searched = 0  # bytes after offset already searched for the end
+        while True:
+            start = self.offset
+            if self.buffer.startswith((b"\r", b"\n"), start):
+                return None
+            if match := HEADER_BLOCK_END.search(
+                self.buffer, start + searched, start + self.max_line_length
+            ):
+                return bytes(self.buffer[start : match.end()])
+            if self.available >= self.max_line_length:
+                return None
+            searched = max(self.available - 2, 0)
+            try:
+                await self.read_block()
+            except HTTPEOF:
+                if self.available:
+                    return None
+                raise
+
+    async def read_document(
+        self, stream: bool = False
+    ) -> ClientDocument | ServerDocument | None:
+        """read the next document from the reader (see parse)"""
+        return await parse(self, stream)
+
+
+async def parse(
+    reader: HTTPReader, stream: bool = False
+) -> ClientDocument | ServerDocument | None:
+    """parse an HTTP document from a stream
+
+    if stream is True, the body is left unread; document.content is a
+    BodyStream that reads it.
+    """
 
     if not isinstance(reader, HTTPReader):
         reader = HTTPReader(reader)
@@ -106,96 +235,230 @@ async def parse(reader: HTTPReader) -> ClientDocument | ServerDocument | None:
     try:
         if reader.is_server:
             document = ServerDocument()
-            await parse_server(reader, document)
+            await parse_server(reader, document, stream)
         else:
             document = ClientDocument()
-            await parse_client(reader, document)
+            await parse_client(reader, document, stream)
     except HTTPEOF:
         document = None
 
     return document
 
 
-async def parse_server(reader: HTTPReader, document: ServerDocument) -> None:
+async def parse_server(
+    reader: HTTPReader, document: ServerDocument, stream: bool = False
+) -> None:
     """parse a server document from reader"""
+    await parse_server_head(reader, document)
+    await parse_server_body(reader, document, stream)
+
+
+async def parse_server_head(reader: HTTPReader, document: ServerDocument) -> None:
+    """parse the status line and headers of a server document from reader"""
+
+    if not await parse_head(reader, document):
+        # --- status: <method> <resource> HTTP/1.1
+        status = await reader.readline()
+        toks = status.split()
+
+        if len(toks) != 3:
+            raise HTTPException(400, "Bad Request", "malformed status line")
+
+        if toks[2] != "HTTP/1.1":
+            raise HTTPException(
+                400, "Bad Request", f"unsupported HTTP protocol: {toks[2]}"
+            )
+
+        set_resource(document, toks[0], toks[1])
+        await parse_headers(reader, document)
 
-    # --- status: <method> <resource> HTTP/1.1
-    status = await reader.readline()
-    toks = status.split()
 
-    if len(toks) != 3:
-        raise HTTPException(400, "Bad Request", "malformed status line")
+async def parse_server_body(
+    reader: HTTPReader, document: ServerDocument, stream: bool = False
+) -> None:
+    """parse the body of a server document from reader
+
+    if stream is True, the body is not read; instead, document.content is
+    set to a BodyStream which reads the body as it is iterated.
+    """
+    await parse_body(reader, document, stream)
+
+    if stream:
+        document.content = BodyStream(reader, document)
+    elif document.http_method == "GET":
+        document.content = document.http_query
+    elif document.http_method in ("PATCH", "POST", "PUT"):
+        parse_content(document)
+
+
+async def parse_client(
+    reader: HTTPReader, document: ClientDocument, stream: bool = False
+) -> None:
+    """parse a client document from reader
+
+    if stream is True, document.content is set to a BodyStream which reads
+    the body as it is iterated.
+    """
 
-    if toks[2] != "HTTP/1.1":
-        raise HTTPException(400, "Bad Request", f"unsupported HTTP protocol: {toks[2]}")
+    if not await parse_head(reader, document):
+        # --- status: HTTP/1.1 <code> [<message>]
+        status = await reader.readline()
+        toks = status.split()
+
+        if len(toks) == 1:
+            raise HTTPException(400, "Bad Request", "malformed status line")
+
+        if toks[0] not in ("HTTP/1.1", "HTTP/1.0"):
+            raise HTTPException(
+                400, "Bad Request", f"unsupported HTTP protocol: {toks[0]}"
+            )
+
+        try:
+            document.http_status_code = int(toks[1])
+        except ValueError as exc:
+            raise HTTPException(
+                400, "Bad Request", f"invalid status code: {toks[1]}"
+            ) from exc
+
+        if len(toks) == 2:
+            document.http_status_message = ""
+        else:
+            document.http_status_message = " ".join(toks[2:])
 
-    document.http_method = toks[0].upper()
-    res = urlparse.urlparse(toks[1])
+        await parse_headers(reader, document)
+
+    await parse_body(reader, document, stream)
+
+    if stream:
+        document.content = BodyStream(reader, document)
+    else:
+        parse_content(document)
+
+
+def set_resource(document: ServerDocument, method: str, resource: str) -> None:
+    """set method, resource and query on document from the status line"""
+    document.http_method = method.upper()
+    res = urlparse.urlparse(resource)
     document.http_resource = res.path
     if res.query:
         document.http_query_string = res.query
         for key, val in urlparse.parse_qs(res.query).items():
             document.http_query[key] = val[0] if len(val) == 1 else val
 
-    await parse_headers_and_body(reader, document)
 
-    if document.http_method == "GET":
-        document.content = document.http_query
-    elif document.http_method in ("PATCH", "POST", "PUT"):
-        parse_content(document)
+class HeadCollector:
+    """httptools parser callbacks for a start line and headers"""
 
+    def __init__(self):
+        self.url = b""
+        self.status = b""
+        self.headers = []
+        self.is_complete = False
 
-async def parse_client(reader: HTTPReader, document: ClientDocument) -> None:
-    """parse a client document from reader"""
+    def on_url(self, url: bytes) -> None:
+        """collect request url"""
+        self.url += url
 
-    # --- status: HTTP/1.1 <code> [<message>]
-    status = await reader.readline()
-    toks = status.split()
+    def on_status(self, status: bytes) -> None:
+        """collect response status message"""
+        self.status += status
 
-    if len(toks) == 1:
-        raise HTTPException(400, "Bad Request", "malformed status line")
+    def on_header(self, name: bytes, value: bytes) -> None:
+        """collect one header"""
+        self.headers.append((name, value))
 
-    if toks[0] not in ("HTTP/1.1", "HTTP/1.0"):
-        raise HTTPException(400, "Bad Request", f"unsupported HTTP protocol: {toks[0]}")
+    def on_headers_complete(self) -> None:
+        """note the end of the header block"""
+        self.is_complete = True
 
-    try:
-        document.http_status_code = int(toks[1])
-    except ValueError as exc:
-        raise HTTPException(
-            400, "Bad Request", f"invalid status code: {toks[1]}"
-        ) from exc
 
-    if len(toks) == 2:
-        document.http_status_message = ""
+async def parse_head(
+    reader: HTTPReader, document: ClientDocument | ServerDocument
+) -> bool:
+    """parse the start line and headers with the httptools backend
+
+    returns False, having consumed nothing, if the reader's backend isn't
+    httptools, or if httptools doesn't accept the head. the python parser
+    then parses the head, which keeps results (and errors) identical
+    between backends.
+    """
+    if reader.backend != "httptools":
+        return False
+    if (head := await reader.peek_head()) is None:
+        return False
+
+    collector = HeadCollector()
+    if reader.is_server:
+        parser = httptools.HttpRequestParser(collector)
+    else:
+        parser = httptools.HttpResponseParser(collector)
+    try:
+        parser.feed_data(head)
+    except (httptools.HttpParserError, httptools.HttpParserUpgrade):
+        return False
+    if not collector.is_complete:
+        return False
+
+    if reader.is_server:
+        if parser.get_http_version() != "1.1":
+            return False
+        set_resource(
+            document, parser.get_method().decode("ascii"), collector.url.decode("ascii")
+        )
     else:
-        document.http_status_message = " ".join(toks[2:])
+        if parser.get_http_version() not in ("1.1", "1.0"):
+            return False
+        document.http_status_code = parser.get_status_code()
+        document.http_status_message = " ".join(
+            collector.status.decode("ascii").split()
+        )
 
-    await parse_headers_and_body(reader, document)
+    headers = document.http_headers
+    for name, value in collector.headers:
+        if len(headers) == reader.max_header_count:
+            raise HTTPException(400, "Bad Request", "max header count exceeded")
+        headers[name.decode("ascii").lower()] = value.decode("ascii").strip()
 
-    parse_content(document)
+    reader.offset += len(head)
+    return True
 
 
-async def parse_headers_and_body(  # pylint: disable=too-many-branches
+async def parse_headers_and_body(
     reader: HTTPReader, document: ClientDocument | ServerDocument
 ) -> None:
     """parse headers and body from reader into document"""
+    await parse_headers(reader, document)
+    await parse_body(reader, document)
 
-    # --- headers
-    while len(header := await reader.readline()) > 0:
-        if len(document.http_headers) == reader.max_header_count:
-            raise HTTPException(400, "Bad Request", "max header count exceeded")
-        test = header.split(":", 1)
-        if len(test) != 2:
-            raise HTTPException(400, "Bad Request", "header missing colon")
-        name, value = test
-        document.http_headers[name.strip().lower()] = value.strip()
+
+async def parse_headers(
+    reader: HTTPReader, document: ClientDocument | ServerDocument
+) -> None:
+    """parse headers from reader into document"""
+    if (headers := await reader.read_header_block()) is None:
+        # oversized header block: read one line at a time
+        while len(header := await reader.readline()) > 0:
+            add_header(reader, document, header)
+    else:
+        for header in headers:
+            add_header(reader, document, header)
+
+
+async def parse_body(  # pylint: disable=too-many-branches
+    reader: HTTPReader, document: ClientDocument | ServerDocument, stream: bool = False
+) -> None:
+    """parse body from reader into document, based on headers
+
+    if stream is True, the headers are checked, but the content is left
+    unread (see BodyStream).
+    """
 
     # --- keep alive
     keep_alive = document.http_headers.get("connection", "keep-alive")
     document.is_keep_alive = keep_alive == "keep-alive"
 
     # --- http content
-    await parse_http_content(reader, document)
+    await parse_http_content(reader, document, stream)
 
     # --- content type
     if (
@@ -244,12 +507,27 @@ async def parse_headers_and_body(  # pylint: disable=too-many-branches
         document.http_content = data.decode(document.http_charset or "utf-8")
 
 
+def add_header(
+    reader: HTTPReader, document: ClientDocument | ServerDocument, header: str
+) -> None:
+    """add one "name: value" header line to document"""
+    if len(document.http_headers) == reader.max_header_count:
+        raise HTTPException(400, "Bad Request", "max header count exceeded")
+    test = header.split(":", 1)
+    if len(test) != 2:
+        raise HTTPException(400, "Bad Request", "header missing colon")
+    name, value = test
+    document.http_headers[name.strip().lower()] = value.strip()
+
+
 async def parse_http_content(
-    reader: HTTPReader, document: ClientDocument | ServerDocument
+    reader: HTTPReader, document: ClientDocument | ServerDocument, stream: bool = False
 ) -> None:
     """parse the http body from reader"""
 
     if document.http_headers.get("transfer-encoding") == "chunked":
+        if stream:
+            return None
         return await parse_chunked(reader, document)
 
     length = document.http_headers.get("content-length")
@@ -265,15 +543,16 @@ async def parse_http_content(
         if document.http_content_length > reader.max_content_length:
             raise HTTPException(413, "Request Entity Too Large")
 
-    if document.http_content_length:
+    if document.http_content_length and not stream:
         document.http_content = await reader.read(document.http_content_length)
+    return None
 
 
 async def parse_chunked(
     reader: HTTPReader, document: ClientDocument | ServerDocument
 ) -> None:
     """parse chunked data from reader"""
-    document.http_content = b""
+    chunks = []
     while True:
         line = await reader.readline()
         line = line.split(";", 1)[0]  # sometimes there are semicolons
@@ -286,8 +565,93 @@ async def parse_chunked(
         if length == 0:
             await reader.readline()  # consume trailing CRLF after final chunk
             break
-        document.http_content += await reader.read(length)
+        chunks.append(await reader.read(length))
         await reader.readline()  # consume trailing CRLF after chunk data
+    document.http_content = b"".join(chunks)
+
+
+class BodyStream:
+    """async iterator over the body of a document, read as it arrives
+
+    each iteration returns the next piece of the body (bytes) from the
+    reader, so no more than one read from the connection is held in memory
+    at a time. nothing is read from the connection until the next piece is
+    requested, which leaves the socket's flow control to slow down a client
+    that sends faster than the handler consumes.
+
+    max_content_length is enforced for chunked bodies as the chunks arrive;
+    a gzip content-encoding is decompressed piece by piece.
+    """
+
+    def __init__(
+        self, reader: HTTPReader, document: ClientDocument | ServerDocument
+    ) -> None:
+        self.reader = reader
+        self.is_chunked = document.http_headers.get("transfer-encoding") == "chunked"
+        self.remaining = 0 if self.is_chunked else document.http_content_length or 0
+        self.received = 0
+        self.is_done = not self.is_chunked and self.remaining == 0
+        self.decompressor = None
+        if document.http_encoding == "gzip":
+            self.decompressor = zlib.decompressobj(wbits=31)
+
+    def __aiter__(self) -> "BodyStream":
+        return self
+
+    async def __anext__(self) -> bytes:
+        while not self.is_done:
+            data = await self.read_chunk()
+            if self.decompressor is not None:
+                try:
+                    data = self.decompressor.decompress(data)
+                    if self.is_done:
+                        data += self.decompressor.flush()
+                except zlib.error as exc:
+                    raise HTTPException(
+                        400, "Bad Request", "malformed gzip data"
+                    ) from exc
+            if data:
+                return data
+        raise StopAsyncIteration
+
+    async def read_chunk(self) -> bytes:
+        """read the next piece of the (possibly chunked) body"""
+        if self.is_chunked and self.remaining == 0:
+            line = await self.reader.readline()
+            line = line.split(";", 1)[0]  # sometimes there are semicolons
+            try:
+                length = int(line, 16)
+            except ValueError as exc:
+                raise HTTPException(
+                    400, "Bad Request", f"invalid chunk length: {line}"
+                ) from exc
+            if length == 0:
+                await self.reader.readline()  # consume trailing CRLF
+                self.is_done = True
+                return b""
+            max_length = self.reader.max_content_length
+            if max_length and self.received + length > max_length:
+                raise HTTPException(413, "Request Entity Too Large")
+            self.remaining = length
+
+        data = await self.reader.read_some(self.remaining)
+        self.remaining -= len(data)
+        self.received += len(data)
+        if self.remaining == 0:
+            if self.is_chunked:
+                await self.reader.readline()  # consume CRLF after chunk data
+            else:
+                self.is_done = True
+        return data
+
+    async def read(self) -> bytes:
+        """read the rest of the body"""
+        return b"".join([data async for data in self])
+
+    async def drain(self) -> None:
+        """read and discard the rest of the body"""
+        async for _ in self:
+            pass
 
 
 def parse_content(document: ClientDocument | ServerDocument) -> None:
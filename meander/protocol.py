@@ -0,0 +1,183 @@
+"""asyncio.Protocol transport for connections (no StreamReader/StreamWriter)
+
+With asyncio.start_server, received data is buffered by a StreamReader,
+and then copied into the HTTPReader's buffer. With HTTPProtocol, received
+data is appended directly to the HTTPReader's buffer (a ProtocolReader),
+and responses are written directly to the transport (a ProtocolWriter).
+"""
+
+import asyncio
+from collections.abc import Callable, Coroutine
+
+from meander.exception import HTTPEOF
+from meander.parser import HTTPReader
+
+
+class ProtocolReader(HTTPReader):
+    """HTTPReader that is fed by a protocol instead of reading a stream
+
+    if more than limit unread bytes are buffered, the transport stops
+    reading until the parser asks for more data.
+    """
+
+    def __init__(
+        self, transport: asyncio.Transport, limit: int = 65536, **kwargs
+    ) -> None:
+        super().__init__(None, **kwargs)
+        self.transport = transport
+        self.limit = limit
+        self.is_paused = False
+        self.is_eof = False
+        self.exception = None
+        self.waiter = None
+
+    def feed_data(self, data: bytes) -> None:
+        """add data received by the protocol"""
+        self.buffer += data
+        if not self.is_paused and self.available > self.limit:
+            self.is_paused = True
+            self.transport.pause_reading()
+        self.wakeup()
+
+    def feed_eof(self, exception: Exception | None = None) -> None:
+        """note the end of the data (or a lost connection)"""
+        self.is_eof = True
+        self.exception = exception
+        self.wakeup()
+
+    def wakeup(self) -> None:
+        """wake up read_block, if it is waiting"""
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(None)
+
+    async def read_block(self) -> None:
+        """wait for more data to be fed into the buffer"""
+        if self.available:
+            timeout = self.active_timeout
+        else:
+            timeout = self.timeout
+
+        if self.offset:
+            del self.buffer[: self.offset]
+            self.scanned = max(self.scanned - self.offset, 0)
+            self.offset = 0
+        if self.is_paused:
+            self.is_paused = False
+            self.transport.resume_reading()
+
+        size = len(self.buffer)
+        while len(self.buffer) == size:
+            if self.exception is not None:
+                raise self.exception
+            if self.is_eof:
+                raise HTTPEOF()
+            self.waiter = asyncio.get_running_loop().create_future()
+            try:
+                await asyncio.wait_for(self.waiter, timeout)
+            finally:
+                self.waiter = None
+
+
+class ProtocolWriter:
+    """the parts of the StreamWriter interface that a Connection uses"""
+
+    def __init__(self, transport: asyncio.Transport) -> None:
+        self.transport = transport
+        self.is_paused = False
+        self.exception = None
+        self.waiter = None
+
+    def write(self, data: bytes) -> None:
+        """write data to the transport"""
+        self.transport.write(data)
+
+    def writelines(self, buffers: list[bytes]) -> None:
+        """write a list of buffers to the transport"""
+        self.transport.writelines(buffers)
+
+    async def drain(self) -> None:
+        """wait until the transport's write buffer is below its low watermark"""
+        if self.exception is not None:
+            raise self.exception
+        if self.is_paused:
+            self.waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self.waiter
+            finally:
+                self.waiter = None
+            if self.exception is not None:
+                raise self.exception
+
+    def pause(self) -> None:
+        """the transport's write buffer is above its high watermark"""
+        self.is_paused = True
+
+    def resume(self, exception: Exception | None = None) -> None:
+        """the transport's write buffer is below its low watermark (or lost)"""
+        self.is_paused = False
+        if exception is not None:
+            self.exception = exception
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(None)
+
+    def close(self) -> None:
+        """close the transport"""
+        self.transport.close()
+
+    def can_write_eof(self) -> bool:
+        """True if the transport supports write_eof"""
+        return self.transport.can_write_eof()
+
+    def write_eof(self) -> None:
+        """close the write end of the transport"""
+        self.transport.write_eof()
+
+    def get_extra_info(self, name: str, default=None):
+        """return transport information"""
+        return self.transport.get_extra_info(name, default)
+
+
+class HTTPProtocol(asyncio.Protocol):
+    """run handler(reader, writer) for a connection, like start_server
+
+    reader is a ProtocolReader, created with reader_args, and writer is a
+    ProtocolWriter.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[ProtocolReader, ProtocolWriter], Coroutine],
+        **reader_args,
+    ) -> None:
+        self.handler = handler
+        self.reader_args = reader_args
+        self.reader = None
+        self.writer = None
+        self.task = None
+        self.is_ssl = False
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self.is_ssl = transport.get_extra_info("sslcontext") is not None
+        self.reader = ProtocolReader(transport, **self.reader_args)
+        self.writer = ProtocolWriter(transport)
+        self.task = asyncio.get_running_loop().create_task(
+            self.handler(self.reader, self.writer)
+        )
+
+    def data_received(self, data: bytes) -> None:
+        self.reader.feed_data(data)
+
+    def eof_received(self) -> bool:
+        self.reader.feed_eof()
+        return not self.is_ssl  # keep the write end open to respond
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        lost = exc or ConnectionResetError("Connection lost")
+        self.reader.feed_eof(exc)
+        self.writer.resume(lost)
+
+    def pause_writing(self) -> None:
+        self.writer.pause()
+
+    def resume_writing(self) -> None:
+        self.writer.resume()
@@ -0,0 +1,193 @@
+"""host name resolution for the client, with a cache and happy eyeballs"""
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+import ipaddress
+import itertools
+import socket
+import time
+
+Address = tuple[int, tuple]  # (family, sockaddr)
+
+
+async def getaddrinfo(host: str, port: int) -> list[Address]:
+    """look up the stream addresses for host/port with getaddrinfo"""
+    infos = await asyncio.get_running_loop().getaddrinfo(
+        host, port, type=socket.SOCK_STREAM
+    )
+    return [(family, sockaddr) for family, _, _, _, sockaddr in infos]
+
+
+class Resolver:  # pylint: disable=too-many-instance-attributes
+    """cache of host name lookups, each kept for ttl seconds
+
+    getaddrinfo runs in a thread pool, so a busy client can swamp the pool
+    (and wait for it) if every connection looks up its host. Here, a host's
+    addresses are looked up once per ttl seconds, and concurrent lookups of
+    the same host share one call to lookup (getaddrinfo, by default, or any
+    async function with the same signature, for instance a stub for testing).
+    At most max_entries hosts are cached; the least recently used is
+    dropped to make room.
+
+    connect opens a socket to one of a host's addresses. If
+    happy_eyeballs_delay is set, and the host has more than one address, a
+    connection to the next address (alternating between address families)
+    is started each time that many seconds pass without the previous ones
+    connecting, and the first to connect is used (RFC 8305); otherwise, the
+    addresses are tried one at a time.
+    """
+
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        max_entries: int = 1024,
+        happy_eyeballs_delay: float | None = 0.25,
+        lookup: Callable[[str, int], Awaitable[list[Address]]] = getaddrinfo,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.happy_eyeballs_delay = happy_eyeballs_delay
+        self.lookup = lookup
+        self.cache = OrderedDict()  # (host, port) -> (expires, addresses)
+        self.pending = {}  # (host, port) -> lookup task
+        self.hits = 0
+        self.lookups = 0
+
+    async def resolve(self, host: str, port: int) -> list[Address]:
+        """return the addresses for host/port"""
+        if (address := ip_address(host, port)) is not None:
+            return [address]
+        key = (host, port)
+        if (entry := self.cache.get(key)) is not None:
+            if entry[0] > time.monotonic():
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self.cache[key]
+        if (task := self.pending.get(key)) is None:
+            task = self.pending[key] = asyncio.create_task(self._lookup(key))
+        return await asyncio.shield(task)  # a cancelled caller leaves the lookup
+
+    async def _lookup(self, key: tuple) -> list[Address]:
+        """look up key, and cache the result"""
+        try:
+            self.lookups += 1
+            addresses = await self.lookup(*key)
+            if not addresses:
+                raise OSError(f"no addresses found for {key[0]}")
+            self.cache[key] = (time.monotonic() + self.ttl, addresses)
+            if len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)
+            return addresses
+        finally:
+            del self.pending[key]
+
+    def forget(self, host: str, port: int) -> None:
+        """drop the cached addresses for host/port"""
+        self.cache.pop((host, port), None)
+
+    async def connect(self, host: str, port: int) -> socket.socket:
+        """return a socket connected to one of the addresses of host/port
+
+        if none of the addresses can be connected, the cached addresses are
+        forgotten, and the last error is raised.
+        """
+        addresses = interleave(await self.resolve(host, port))
+        try:
+            if self.happy_eyeballs_delay is None or len(addresses) == 1:
+                return await connect_in_turn(addresses)
+            return await connect_staggered(addresses, self.happy_eyeballs_delay)
+        except OSError:
+            self.forget(host, port)
+            raise
+
+
+def ip_address(host: str, port: int) -> Address | None:
+    """return the address for host, if host is an ip address, else None"""
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return None
+    family = socket.AF_INET6 if address.version == 6 else socket.AF_INET
+    return family, (host, port)
+
+
+def interleave(addresses: list[Address]) -> list[Address]:
+    """alternate address families, keeping the order within each family"""
+    families = {}
+    for address in addresses:
+        families.setdefault(address[0], []).append(address)
+    return [
+        address
+        for group in itertools.zip_longest(*families.values())
+        for address in group
+        if address is not None
+    ]
+
+
+async def connect_address(address: Address) -> socket.socket:
+    """return a non-blocking socket connected to address"""
+    family, sockaddr = address
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    try:
+        sock.setblocking(False)
+        await asyncio.get_running_loop().sock_connect(sock, sockaddr)
+    except BaseException:
+        sock.close()
+        raise
+    return sock
+
+
+async def connect_in_turn(addresses: list[Address]) -> socket.socket:
+    """connect to each address in turn, until one connects"""
+    for address in addresses:
+        try:
+            return await connect_address(address)
+        except OSError as exc:
+            error = exc
+    raise error
+
+
+async def connect_staggered(addresses: list[Address], delay: float) -> socket.socket:
+    """return a socket from the first of the addresses to connect
+
+    a connection attempt is started every delay seconds, or as soon as the
+    previous attempt fails, until one connects (RFC 8305).
+    """
+    remaining = list(addresses)
+    pending = set()
+    error = None
+    try:
+        while remaining or pending:
+            if remaining:
+                pending.add(asyncio.create_task(connect_address(remaining.pop(0))))
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=delay if remaining else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            sockets = [task.result() for task in done if task.exception() is None]
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+            if sockets:
+                for sock in sockets[1:]:
+                    sock.close()
+                return sockets[0]
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+        for result in await asyncio.gather(*pending, return_exceptions=True):
+            if isinstance(result, socket.socket):  # connected as it was cancelled
+                result.close()
+
+
+_default = Resolver()
+
+
+def default_resolver() -> Resolver:
+    """return the resolver shared by clients that don't specify one"""
+    return _default
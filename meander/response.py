@@ -6,6 +6,7 @@ Re-exports HTTPFormat as Response for a cleaner public API.
 from dataclasses import dataclass
 
 from meander.formatter import HTTPFormat as Response  # public alias
+from meander.formatter import http_date
 
 
 @dataclass
@@ -15,6 +16,64 @@ class HTMLResponse(Response):
     content_type: str = "text/html"
 
 
+@dataclass
+class FileResponse(Response):
+    """form a response whose body is count bytes of a file, starting at offset
+
+    only the status line and headers are formatted (the Content-Type and
+    Content-Length headers are expected to be supplied); the connection sends
+    the body directly from the file, with loop.sendfile.
+    """
+
+    path: str = None
+    offset: int = 0
+    count: int = 0
+    charset: str = None
+
+
+@dataclass
+class ConstantResponse(Response):
+    """form a response that is the same every time, serialized once
+
+    the status line, headers and content are formatted when the response is
+    created; only the Date header (and, if the connection is closing, a
+    Connection header) is added as each response is written. the response
+    must not be modified after it is created.
+
+    a ConstantResponse can be used as a route's handler. a route with a
+    simple string handler, and no before or after functions, is served as a
+    ConstantResponse of that string.
+    """
+
+    def __post_init__(self) -> None:
+        header_lower = {key.lower() for key in self.headers or ()}
+        self.is_dated = "date" not in header_lower
+        super().__post_init__()
+        if self.is_streaming:
+            raise AttributeError("a constant response can't be streamed")
+        if self.is_dated:
+            del self.headers["Date"]
+        status, head, *self.body = super().buffers()
+        self.head = status + head[:-2]  # without the blank line
+        self.is_closed = self.close or "connection" in header_lower
+        self.date = (None, b"\r\n")
+
+    def buffers(self, close: bool = False) -> list[bytes]:
+        """return the response as a list of buffers, with a current Date header
+
+        if close is True, a "Connection: close" header is added (unless the
+        response already has a Connection header).
+        """
+        head = self.head
+        if close and not self.is_closed:
+            head += b"Connection: close\r\n"
+        if self.is_dated:
+            date = http_date()
+            if date is not self.date[0]:
+                self.date = (date, f"Date: {date}\r\n\r\n".encode("ascii"))
+        return [head, self.date[1], *self.body]
+
+
 class HTMLRefreshResponse(HTMLResponse):
     """form an html refresh response given a refresh url"""
 
@@ -1,12 +1,21 @@
 """simple router utility"""
 
+from collections import OrderedDict
 from functools import namedtuple
 import io
 import importlib
 import os
 import re
 
-Endpoint = namedtuple("Endpoint", "handler, args, silent, before, after")
+from meander import annotate
+from meander.response import ConstantResponse
+from meander import static
+
+Endpoint = namedtuple(
+    "Endpoint",
+    "handler, args, silent, before, after, binder, stream, constant",
+    defaults=(None, False, None),
+)
 
 
 class Route:  # pylint: disable=too-few-public-methods
@@ -22,13 +31,17 @@ class Route:  # pylint: disable=too-few-public-methods
         after=None,
         silent=False,
         base_url=None,
+        stream=False,
     ):
         self.handler = lookup_by_path(handler)
+        self.binder = annotate.get_binder(self.handler)
         if base_url:
             resource = base_url.rstrip("/") + "/" + resource.lstrip("/")
+        self.pattern = resource
         self.resource = re.compile(resource + "$")
         self.method = method
         self.silent = silent
+        self.stream = stream
 
         self.before = []
         if before is not None:
@@ -40,19 +53,33 @@ class Route:  # pylint: disable=too-few-public-methods
             for path in after:
                 self.after.append(lookup_by_path(path))
 
+        self.constant = None
+        if not self.before and not self.after:
+            if isinstance(handler, ConstantResponse):
+                self.constant = handler
+            elif isinstance(handler, str) and "." not in handler:
+                self.constant = ConstantResponse(handler)
+
     def match(self, resource, method):
         """Return Endpoint if specified resource and method match."""
-        if match := self.resource.match(resource):
-            if self.method == method:
-                return Endpoint(
-                    self.handler,
-                    match.groups(),
-                    self.silent,
-                    self.before,
-                    self.after,
-                )
+        if self.method == method:
+            if match := self.resource.match(resource):
+                return self.endpoint(match.groups())
         return None
 
+    def endpoint(self, args: tuple) -> Endpoint:
+        """Return Endpoint for this route with args from the resource match."""
+        return Endpoint(
+            self.handler,
+            args,
+            self.silent,
+            self.before,
+            self.after,
+            self.binder,
+            self.stream,
+            self.constant,
+        )
+
 
 def lookup_by_path(path):
     """Get handler by dot-delimited path."""
@@ -72,29 +99,329 @@ def lookup_by_path(path):
             path = getattr(mod, funnam)
         else:
             path = simple_string(path)
+    elif isinstance(path, ConstantResponse):
+        path = simple_string(path)
 
     return path
 
 
-class Router:  # pylint: disable=too-few-public-methods
-    """create a router for http requests"""
+REGEX_SPECIAL = frozenset(".^$*+?{}[]\\|()")
+REGEX_QUANTIFIER = frozenset("?*+{")
+
+
+def unescape_literal(segment: str) -> str | None:
+    """Return segment as a literal string, or None if it contains regex syntax.
+
+    Escaped punctuation (eg, "\\.") is treated as literal; escaped letters and
+    digits (eg, "\\d") are character classes or backreferences.
+    """
+    result = []
+    chars = iter(segment)
+    for char in chars:
+        if char == "\\":
+            char = next(chars, None)
+            if char is None or char.isalnum():
+                return None
+        elif char in REGEX_SPECIAL:
+            return None
+        result.append(char)
+    return "".join(result)
+
+
+def literal_prefix(pattern: str) -> tuple[list[str], bool]:
+    """Split a route pattern into leading literal path segments.
+
+    Returns the list of "/"-delimited segments, starting at the beginning of
+    the pattern, that can be matched by simple string comparison, and a flag
+    indicating that the entire pattern is literal (no regex at all).
+
+    A pattern that doesn't start with "/", or contains an alternation, has no
+    usable prefix. A segment followed by a quantified "/" (eg, "/a/?") stops
+    the prefix, since the segment boundary is then optional.
+    """
+    if not pattern.startswith("/") or "|" in pattern:
+        return [], False
+    parts = pattern.split("/")[1:]
+    segments = []
+    for position, part in enumerate(parts):
+        literal = unescape_literal(part)
+        if literal is None:
+            return segments, False
+        if position + 1 < len(parts) and parts[position + 1][:1] in REGEX_QUANTIFIER:
+            return segments, False
+        segments.append(literal)
+    return segments, True
+
+
+class RouteNode:  # pylint: disable=too-few-public-methods
+    """One literal path segment in a RouteTree."""
 
     def __init__(self):
+        self.children = {}
+        self.prefix = []  # (order, route) matched by regex below this node
+        self.exact = []  # (order, route) that end exactly at this node
+
+
+class RouteTree:
+    """Prefix tree of routes keyed on literal path segments.
+
+    Each route is stored at the node reached by its literal prefix. Routes
+    that are entirely literal are only candidates when the whole resource
+    ends at their node; the others are candidates for any resource that
+    passes through their node, and are confirmed with their regex.
+
+    Candidates are returned in the order the routes were added, so the
+    first-match-wins behavior of a linear scan is preserved.
+    """
+
+    def __init__(self, routes: list[Route]):
+        self.root = RouteNode()
+        for order, route in enumerate(routes):
+            self.add(order, route)
+
+    def add(self, order: int, route: Route) -> None:
+        """Add route to the tree at the node for its literal prefix."""
+        segments, is_exact = literal_prefix(route.pattern)
+        node = self.root
+        for segment in segments:
+            node = node.children.setdefault(segment, RouteNode())
+        (node.exact if is_exact else node.prefix).append((order, route))
+
+    def candidates(self, resource: str) -> list[Route]:
+        """Return the routes that might match resource, in order."""
+        node = self.root
+        found = list(node.prefix)
+        if resource.startswith("/"):
+            for segment in resource[1:].split("/"):
+                if (node := node.children.get(segment)) is None:
+                    break
+                found.extend(node.prefix)
+            else:
+                found.extend(node.exact)
+        if len(found) > 1:
+            found.sort(key=lambda item: item[0])
+        return [route for _, route in found]
+
+    def match(self, resource: str, method: str) -> Endpoint | None:
+        """Return Endpoint for the first route matching resource and method."""
+        for route in self.candidates(resource):
+            if endpoint := route.match(resource, method):
+                return endpoint
+        return None
+
+
+class RouteList:  # pylint: disable=too-few-public-methods
+    """Routes matched by trying each one in order."""
+
+    def __init__(self, routes: list[Route]):
+        self.routes = list(routes)
+
+    def match(self, resource: str, method: str) -> Endpoint | None:
+        """Return Endpoint for the first route matching resource and method."""
+        for route in self.routes:
+            if endpoint := route.match(resource, method):
+                return endpoint
+        return None
+
+
+# patterns that can't be embedded in a combined regex: numbered
+# backreferences and conditionals, and global inline flags
+NOT_COMBINABLE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(|\(\?[aiLmsux]+\)")
+
+
+class RouteRegex:  # pylint: disable=too-few-public-methods
+    """Routes matched by a single alternation regex.
+
+    Each route's pattern becomes a named group in one combined pattern, so
+    one re.match call finds the first matching route (the alternation is
+    tried in order) along with its captured args.
+
+    The re module saves every group's state at each alternative, so the
+    cost of one combined pattern grows with the square of its size; routes
+    are combined in groups of at most max_combined.
+
+    Routes that can't be combined (named groups, backreferences or global
+    flags) are matched on their own, in their place in the order, and split
+    the remaining routes into separate combined patterns.
+    """
+
+    max_combined = 20
+
+    def __init__(self, routes: list[Route]):
+        self.chunks = []  # Route or (combined pattern, {group: route})
+        pending = []
+        for route in routes:
+            if route.resource.groupindex or NOT_COMBINABLE.search(route.pattern):
+                self.combine(pending)
+                self.chunks.append(route)
+                pending = []
+            else:
+                pending.append(route)
+                if len(pending) == self.max_combined:
+                    self.combine(pending)
+                    pending = []
+        self.combine(pending)
+
+    def combine(self, routes: list[Route]) -> None:
+        """Add one combined pattern for routes to chunks."""
+        if not routes:
+            return
+        parts = []
+        groups = {}
+        index = 1
+        for route in routes:
+            parts.append(f"(?P<r{index}>{route.pattern}$)")
+            groups[index] = (route, range(index + 1, index + 1 + route.resource.groups))
+            index += 1 + route.resource.groups
+        try:
+            self.chunks.append((re.compile("|".join(parts)), groups))
+        except re.error:
+            self.chunks.extend(routes)
+
+    def match(self, resource: str, method: str) -> Endpoint | None:
+        """Return Endpoint for the first route matching resource and method."""
+        for chunk in self.chunks:
+            if isinstance(chunk, Route):
+                if endpoint := chunk.match(resource, method):
+                    return endpoint
+            elif match := chunk[0].match(resource):
+                route, args = chunk[1][match.lastindex]
+                if route.method == method:
+                    return route.endpoint(tuple(map(match.group, args)))
+        return None
+
+
+MATCHERS = {"linear": RouteList, "tree": RouteTree, "regex": RouteRegex}
+
+
+class RouteCache:
+    """Bounded cache of (resource, method) -> Endpoint | None lookups.
+
+    Both matches and misses are cached. When the cache is full, an entry is
+    evicted based on policy:
+        lru - the least recently used entry (default)
+        fifo - the oldest entry
+
+    hits and misses count the lookups that were, or weren't, found.
+    """
+
+    def __init__(self, size: int, policy: str = "lru"):
+        if policy not in ("lru", "fifo"):
+            raise ValueError(f"invalid cache policy: {policy}")
+        self.size = size
+        self.policy = policy
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __getitem__(self, key: tuple[str, str]) -> Endpoint | None:
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        if self.policy == "lru":
+            self.entries.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: tuple[str, str], value: Endpoint | None) -> None:
+        if len(self.entries) >= self.size:
+            self.entries.popitem(last=False)
+        self.entries[key] = value
+
+    def clear(self) -> None:
+        """Remove all entries; hits and misses are kept."""
+        self.entries.clear()
+
+
+class Router:
+    """create a router for http requests
+
+    Routes are evaluated in the order they are added; the first route that
+    matches both resource and method wins. Routes are split into one table
+    per method, so a request never pays for routes of another method. A
+    RouteTree of all routes is kept to find the methods that are allowed for
+    a resource that doesn't match the requested method.
+
+    mode selects how each method's table is matched:
+        tree - RouteTree of literal path segments (default)
+        regex - RouteRegex single combined pattern
+        linear - RouteList, each route's regex in turn
+
+    If cache_size is non-zero, the result of each lookup is kept in a
+    RouteCache of that size, with the specified cache_policy.
+
+    The tables are (re)built, and the cache cleared, the first time the
+    router is called after a route is added.
+    """
+
+    def __init__(
+        self, mode: str = "tree", cache_size: int = 0, cache_policy: str = "lru"
+    ):
+        if mode not in MATCHERS:
+            raise ValueError(f"invalid router mode: {mode}")
+        self.mode = mode
         self.routes = []
+        self.tables = None  # method -> matcher
+        self.tree = None  # RouteTree of all routes
+        self.cache = RouteCache(cache_size, cache_policy) if cache_size else None
 
     def add(self, route):
         self.routes.append(route)
+        self.tables = None
+        self.tree = None
+        if self.cache is not None:
+            self.cache.clear()
+
+    def compile(self) -> None:
+        """Build the per-method tables and the path RouteTree."""
+        matcher = MATCHERS[self.mode]
+        by_method = {}
+        for route in self.routes:
+            by_method.setdefault(route.method, []).append(route)
+        self.tables = {method: matcher(routes) for method, routes in by_method.items()}
+        self.tree = RouteTree(self.routes)
 
     def __call__(self, resource: str, method: str) -> Endpoint | None:
         """Try to match a resource+method to a defined route.
 
         If a matching route is found, an Endpoint is returned, else None.
         """
-        for route in self.routes:
-            if endpoint := route.match(resource, method):
-                return endpoint
+        if self.cache is None:
+            return self.match(resource, method)
+        key = (resource, method)
+        try:
+            return self.cache[key]
+        except KeyError:
+            endpoint = self.cache[key] = self.match(resource, method)
+            return endpoint
+
+    def match(self, resource: str, method: str) -> Endpoint | None:
+        """Match resource+method against the method's table (no caching)."""
+        if self.tables is None:
+            self.compile()
+        if (table := self.tables.get(method)) is not None:
+            return table.match(resource, method)
         return None
 
+    def allowed(self, resource: str) -> list[str]:
+        """Return the methods of any routes that match resource.
+
+        This is meant to be called after a failed match in order to
+        distinguish a "405 Method Not Allowed" from a "404 Not Found".
+        """
+        if self.tree is None:
+            self.compile()
+        methods = []
+        for route in self.tree.candidates(resource):
+            if route.method not in methods and route.resource.match(resource):
+                methods.append(route.method)
+        return methods
+
 
 class RouteNotDefinedError(Exception):
     """Indicate that ROUTE is not first directive in file."""
@@ -158,16 +485,23 @@ def parse_line(line: str) -> tuple[str, list[str]] | tuple[None, None]:
     return parts[0].upper(), parts[1:]
 
 
-def load(config: str | io.IOBase, base_url: str = "") -> Router:
+def load(
+    config: str | io.IOBase,
+    base_url: str = "",
+    mode: str = "tree",
+    cache_size: int = 0,
+) -> Router:
     """Build router from config file.
 
     config - dot delimited path to config file or io.IOBase stream
     base_url - prefix for each url specified in the config
+    mode - route matching mode (see Router)
+    cache_size - size of the Router's lookup cache (0 for no cache)
     """
 
     if not isinstance(config, io.IOBase):
         config = open(dot_delimited_to_path(config), encoding="utf-8")
-    router = Router()
+    router = Router(mode, cache_size)
     methods = set()
 
     def add_route():
@@ -232,6 +566,12 @@ def load(config: str | io.IOBase, base_url: str = "") -> Router:
                 add_method("GET")
             route["handler"] = one_parameter()
 
+        elif directive == "STATIC":
+            no_duplicates("handler")
+            if "method" not in route:
+                add_method("GET")
+            route["handler"] = static.StaticFiles(one_parameter())
+
         elif directive == "BEFORE":
             route.setdefault("before", []).append(one_parameter())
 
@@ -243,6 +583,11 @@ def load(config: str | io.IOBase, base_url: str = "") -> Router:
             no_duplicates("silent")
             route["silent"] = True
 
+        elif directive == "STREAM":
+            no_parameters()
+            no_duplicates("stream")
+            route["stream"] = True
+
         else:
             raise UnexpectedDirectiveError(line_no, directive)
 
@@ -2,21 +2,156 @@
 
 import asyncio
 from collections.abc import Callable, Coroutine
+import logging
+import os
+import signal
+import time
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover
+    uvloop = None
+
+log = logging.getLogger(__package__)
 
 tasks: list[Callable[[], Coroutine]] = []
 
+reuse_port = False  # servers bind with SO_REUSEPORT (set in worker processes)
+
+RESTART_DELAY = 1.0  # seconds to wait before restarting a worker that died young
+
+LOOPS = ("asyncio", "uvloop", "auto")
+
 
 def add_task(task: Callable[[], Coroutine]) -> None:
     """add an async function to be run as a task"""
     tasks.append(task)
 
 
-def run() -> None:
-    """start all defined runnables in an event loop"""
+def run(workers: int = 0, loop: str = "asyncio") -> None:
+    """start all defined runnables in an event loop
+
+    loop selects the event loop implementation: "asyncio" (the standard
+    library's), "uvloop" (requires the optional uvloop package), or "auto"
+    (uvloop, if installed). If uvloop is requested, but not installed, a
+    warning is logged, and the asyncio loop is used.
+
+    If workers is non-zero, that many worker processes are forked, each
+    running all of the tasks in its own event loop, with servers bound to
+    their ports with SO_REUSEPORT, so that the kernel spreads connections
+    across the workers. This process becomes a supervisor (see supervise).
+    """
+    loop_factory = get_loop_factory(loop)
+    if workers:
+        supervise(workers, loop_factory)
+    else:
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            runner.run(_run())
+
 
-    async def _run() -> None:
+def get_loop_factory(loop: str) -> Callable[[], asyncio.AbstractEventLoop] | None:
+    """return the event loop factory for loop (None for asyncio's default)"""
+    if loop not in LOOPS:
+        raise ValueError(f"invalid loop: {loop}")
+    if loop == "asyncio":
+        return None
+    if uvloop is None:
+        if loop == "uvloop":
+            log.warning("uvloop is not installed, using the asyncio event loop")
+        return None
+    return uvloop.new_event_loop
+
+
+async def _run() -> None:
+    """run all tasks until they finish, or until SIGTERM (or SIGINT)
+
+    a signal cancels the tasks; a server stops accepting connections, and
+    lets its open connections finish their requests (see Server.shutdown),
+    before its task is done.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except (NotImplementedError, RuntimeError):  # pragma: no cover
+        pass  # no signal support (eg, windows, or not in the main thread)
+    try:
         async with asyncio.TaskGroup() as group:
             for task in tasks:
                 group.create_task(task())
+    except asyncio.CancelledError:
+        log.info("pid=%d stopped", os.getpid())
+
+
+def supervise(
+    workers: int, loop_factory: Callable[[], asyncio.AbstractEventLoop] | None = None
+) -> None:
+    """fork worker processes, and restart any that die
+
+    SIGTERM (or SIGINT) is forwarded to the workers, and the supervisor
+    returns once they have all exited. A worker that dies within
+    RESTART_DELAY seconds of starting is restarted after a delay, so that a
+    worker that can't start doesn't turn into a fork loop.
+    """
+    children = {}  # pid -> start time
+    stopping = False
+
+    def start_worker() -> None:
+        global reuse_port  # pylint: disable=global-statement
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover (the worker)
+            code = 0
+            try:
+                reuse_port = True
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_IGN)  # supervisor's job
+                with asyncio.Runner(loop_factory=loop_factory) as runner:
+                    runner.run(_run())
+            except BaseException:  # pylint: disable=broad-exception-caught
+                log.exception("worker pid=%d failed", os.getpid())
+                code = 1
+            finally:
+                os._exit(code)  # pylint: disable=protected-access
+        log.info("started worker pid=%d", pid)
+        children[pid] = time.monotonic()
+        if stopping:  # signalled while forking
+            os.kill(pid, signal.SIGTERM)
+
+    def stop(signum, frame) -> None:  # pylint: disable=unused-argument
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
 
-    asyncio.run(_run())
+    previous = {
+        signum: signal.signal(signum, stop)
+        for signum in (signal.SIGTERM, signal.SIGINT)
+    }
+    try:
+        for _ in range(workers):
+            start_worker()
+        while children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started = children.pop(pid, None)
+            if started is None:
+                continue
+            if stopping:
+                log.info("worker pid=%d stopped", pid)
+                continue
+            log.warning(
+                "worker pid=%d exited with status %d, restarting",
+                pid,
+                os.waitstatus_to_exitcode(status),
+            )
+            if time.monotonic() - started < RESTART_DELAY:
+                time.sleep(RESTART_DELAY)
+            if not stopping:
+                start_worker()
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
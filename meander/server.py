@@ -5,14 +5,25 @@ from collections.abc import Callable
 from dataclasses import dataclass
 import logging
 import io
-import ssl
 
 from meander.connection import Connection
+from meander.exception import HTTPEOF
+from meander.limit import Limit
+from meander import parser
+from meander.protocol import HTTPProtocol
+from meander.response import ConstantResponse, Response
 from meander import router
 from meander import runner
+from meander import tls
 
 log = logging.getLogger(__package__)
 
+all_connections = Limit()  # open connections, across all servers
+
+CONNECTION_POLICIES = ("reject", "wait")
+TRANSPORTS = ("stream", "protocol")
+REJECT_LINGER = 1.0  # seconds
+
 
 @dataclass
 class Server:
@@ -33,26 +44,54 @@ class Server:
     base_url: str = None
     ssl_certfile: str = None
     ssl_keyfile: str = None
+    route_cache_size: int = 0
+    parser_backend: str | None = None
+    write_high_water: int | None = None
+    write_low_water: int | None = None
+    pipeline_limit: int = 0
+    shutdown_timeout: float = 30.0
+    max_connections: int = 0
+    connection_policy: str = "reject"
+    max_in_flight: int = 0
+    transport: str = "stream"
 
     def __post_init__(self):
         if self.ssl_certfile and not self.ssl_keyfile:
             raise AttributeError("ssl_keyfile not specified")
         if self.ssl_keyfile and not self.ssl_certfile:
             raise AttributeError("ssl_certfile not specified")
+        if self.parser_backend not in (None, "auto", *parser.BACKENDS):
+            raise AttributeError(f"parser backend not available: {self.parser_backend}")
+        if self.write_high_water is not None and self.write_low_water is not None:
+            if self.write_low_water > self.write_high_water:
+                raise AttributeError("write_low_water exceeds write_high_water")
+
+        if self.connection_policy not in CONNECTION_POLICIES:
+            raise AttributeError(f"invalid connection policy: {self.connection_policy}")
+        if self.transport not in TRANSPORTS:
+            raise AttributeError(f"invalid transport: {self.transport}")
+
+        self.connections = set()
+        self.open_connections = Limit(self.max_connections)
+        self.in_flight = Limit(self.max_in_flight)
+        self.rejected = 0  # connections turned away with a 503
 
         if self.routes is None:
-            self.router = router.Router()
+            self.router = router.Router(cache_size=self.route_cache_size)
         else:
-            self.router = router.load(self.routes, self.base_url)
+            self.router = router.load(
+                self.routes, self.base_url, cache_size=self.route_cache_size
+            )
 
     def add_route(
         self,
         resource: str,
-        handler: str | Callable,
+        handler: str | Callable | ConstantResponse,
         method: str = "GET",
         before: Callable | list[Callable] | None = None,
         after: Callable | list[Callable] | None = None,
         silent: bool = False,
+        stream: bool = False,
     ):
         """Add a route to the server.
 
@@ -60,12 +99,16 @@ class Server:
         handler - a callable to execute on match
                   or a dot-delimited path to an callable to be loaded
                   or a simple string (no imbedded dot character) to be returned
+                  or a ConstantResponse to be returned (formatted once)
         method - the method that matches the HTTP request's method (eg, "POST")
         before - a callable, or list of callables, to run before calling the
                  handler
         after - a callable, or list of callables, to run after calling the
                 handler
         silent - a flag to control connection logging
+        stream - a flag to pass the request body to the handler as an async
+                 iterator of bytes (request.content), instead of reading it
+                 into memory before the handler is called
 
         This route will be evaluated for a match against an incoming HTTP
         request after any other routes that have already been added.
@@ -83,6 +126,7 @@ class Server:
                 after,
                 silent,
                 self.base_url,
+                stream,
             )
         )
         return self
@@ -96,17 +140,107 @@ class Server:
 
         context = None
         if self.ssl_certfile and self.ssl_keyfile:
-            context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
-            context.load_cert_chain(self.ssl_certfile, self.ssl_keyfile)
+            context = tls.server_context(self.ssl_certfile, self.ssl_keyfile)
 
-        return await (
-            await asyncio.start_server(self, port=self.port, ssl=context)
-        ).serve_forever()
+        if self.transport == "protocol":
+            server = await asyncio.get_running_loop().create_server(
+                lambda: HTTPProtocol(self, backend=self.parser_backend),
+                port=self.port,
+                ssl=context,
+                reuse_port=runner.reuse_port,
+            )
+        else:
+            server = await asyncio.start_server(
+                self, port=self.port, ssl=context, reuse_port=runner.reuse_port
+            )
+        try:
+            await asyncio.get_running_loop().create_future()  # until cancelled
+        finally:
+            server.close()
+            await self.shutdown()
+
+    async def shutdown(self) -> None:
+        """Close all connections, giving busy ones time to finish.
+
+        Idle connections are closed immediately; a connection that is
+        handling a request is closed after sending the response. Any that
+        are still open after shutdown_timeout seconds are cancelled.
+        """
+        if not self.connections:
+            return
+        log.info("closing %d connections", len(self.connections))
+        for connection in self.connections:
+            connection.shutdown()
+        tasks = [connection.task for connection in self.connections]
+        _, pending = await asyncio.wait(tasks, timeout=self.shutdown_timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            log.warning("cancelled %d connections", len(pending))
+            await asyncio.wait(pending)
 
     async def __call__(self, reader, writer):
-        """Called for each new connection to the port."""
-        connection = Connection(reader, writer, self.router, self.name)
-        await connection.handle()
+        """Called for each new connection to the port.
+
+        If the server (or all_connections) has reached its limit of open
+        connections, the connection_policy decides what happens: "reject"
+        responds with a 503 and closes the connection; "wait" leaves the
+        connection unread until another connection closes.
+        """
+        if self.connection_policy == "reject" and (
+            self.open_connections.is_full or all_connections.is_full
+        ):
+            self.rejected += 1
+            await self.reject(reader, writer)
+            return
+        # the server's own limit first, so a connection waiting for it
+        # doesn't hold one of all_connections, which other servers share
+        async with self.open_connections, all_connections:
+            await self.handle(reader, writer)
+
+    async def reject(self, reader, writer):
+        """Respond with a 503, and close the connection.
+
+        Whatever the client sends is read (and discarded) for up to
+        REJECT_LINGER seconds after the response, until the client closes its
+        end; closing a socket with unread data resets the connection, and the
+        client could lose the response.
+        """
+        response = Response(code=503, message="Service Unavailable", close=True)
+        if not isinstance(reader, parser.HTTPReader):
+            reader = parser.HTTPReader(reader)
+        try:
+            writer.writelines(response.buffers())
+            if writer.can_write_eof():
+                writer.write_eof()
+            async with asyncio.timeout(REJECT_LINGER):
+                while True:
+                    await reader.read_some(65536)
+        except (ConnectionResetError, TimeoutError, HTTPEOF):
+            pass
+        finally:
+            writer.close()
+
+    async def handle(self, reader, writer):
+        """Handle the requests on a connection."""
+        if self.write_high_water is not None or self.write_low_water is not None:
+            writer.transport.set_write_buffer_limits(
+                self.write_high_water, self.write_low_water
+            )
+        connection = Connection(
+            reader,
+            writer,
+            self.router,
+            self.name,
+            self.parser_backend,
+            self.pipeline_limit,
+            self.in_flight,
+        )
+        self.connections.add(connection)
+        try:
+            await connection.handle()
+        finally:
+            self.connections.discard(connection)
 
 
 def add_server(  # pylint: disable=too-many-arguments
@@ -116,8 +250,35 @@ def add_server(  # pylint: disable=too-many-arguments
     base_url: str | None = None,
     ssl_certfile: str | None = None,
     ssl_keyfile: str | None = None,
+    route_cache_size: int = 0,
+    parser_backend: str | None = None,
+    write_high_water: int | None = None,
+    write_low_water: int | None = None,
+    pipeline_limit: int = 0,
+    shutdown_timeout: float = 30.0,
+    max_connections: int = 0,
+    connection_policy: str = "reject",
+    max_in_flight: int = 0,
+    transport: str = "stream",
 ) -> Server:
     """Define and add a new server for meander to run."""
-    server = Server(port, name, routes, base_url, ssl_certfile, ssl_keyfile)
+    server = Server(
+        port,
+        name,
+        routes,
+        base_url,
+        ssl_certfile,
+        ssl_keyfile,
+        route_cache_size,
+        parser_backend,
+        write_high_water,
+        write_low_water,
+        pipeline_limit,
+        shutdown_timeout,
+        max_connections,
+        connection_policy,
+        max_in_flight,
+        transport,
+    )
     runner.add_task(server.start)
     return server
@@ -0,0 +1,162 @@
+"""pool of keep-alive http client connections"""
+
+from collections.abc import AsyncIterator
+import contextlib
+import time
+
+from meander.client import Client
+from meander.limit import Limit
+from meander.resolver import Resolver, default_resolver
+
+
+class Session:  # pylint: disable=too-many-instance-attributes
+    """reuse keep-alive client connections, keyed by (host, port, is_ssl)
+
+    Usage:
+
+        async with Session() as session:
+            response = await call(url, session=session)
+
+    A connection is checked out of the pool for each request, and checked
+    back in when the response has been read, unless either side asked to
+    close it. At most max_per_host connections to a host, and at most
+    max_connections in total, are checked out at once; other requests wait
+    their turn. Idle connections are closed once they have been idle for
+    idle_timeout seconds (checked, for every host, whenever a connection is
+    checked out or in), or to make room for a connection to another host,
+    and each one is checked for a close (or unexpected data) from the server
+    before it is reused.
+
+    The number of connections checked out, and the peak, are available as
+    session.in_use.current and session.in_use.peak; opened and reused count
+    new and reused connections.
+
+    https servers are verified with cafile (certifi's CA bundle, by default),
+    and host names are resolved with resolver (the shared resolver, by default).
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        max_connections: int = 100,
+        max_per_host: int = 10,
+        idle_timeout: float = 30.0,
+        verbose: bool = False,
+        parser_backend: str | None = None,
+        cafile: str | None = None,
+        resolver: Resolver | None = None,
+    ) -> None:
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.verbose = verbose
+        self.parser_backend = parser_backend
+        self.cafile = cafile
+        self.resolver = resolver or default_resolver()
+        self.in_use = Limit(max_connections)
+        self.hosts = {}  # key -> Limit(max_per_host)
+        self.idle = {}  # key -> [(Client, idle since), ...], oldest first
+        self.idle_count = 0
+        self.opened = 0
+        self.reused = 0
+
+    async def __aenter__(self) -> "Session":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    @contextlib.asynccontextmanager
+    async def connection(
+        self, host: str, port: int, is_ssl: bool = False
+    ) -> AsyncIterator[Client]:
+        """check out a connection to host/port for one request and response
+
+        if the block ends with an exception, or the client is no longer
+        keep-alive, the connection is closed instead of being checked in.
+        """
+        key = (host, port, is_ssl)
+        if (host_limit := self.hosts.get(key)) is None:
+            host_limit = self.hosts[key] = Limit(self.max_per_host)
+        async with host_limit, self.in_use:
+            client = self.checkout(key)
+            if client is None:
+                client = await self.open(key)
+            is_ok = False
+            try:
+                yield client
+                is_ok = True
+            finally:
+                if is_ok and client.is_keep_alive:
+                    self.checkin(key, client)
+                else:
+                    client.writer.close()
+
+    def checkout(self, key: tuple) -> Client | None:
+        """return an idle connection for key, if a usable one is available"""
+        self.expire()
+        idle = self.idle.get(key)
+        while idle:
+            client, _ = idle.pop()
+            self.idle_count -= 1
+            if client.is_stale:
+                client.writer.close()
+                continue
+            self.reused += 1
+            return client
+        return None
+
+    def checkin(self, key: tuple, client: Client) -> None:
+        """return a connection to the pool"""
+        self.expire()
+        self.idle.setdefault(key, []).append((client, time.monotonic()))
+        self.idle_count += 1
+
+    def expire(self) -> None:
+        """close the connections, to any host, idle past idle_timeout"""
+        if not self.idle_count:
+            return
+        limit = time.monotonic() - self.idle_timeout
+        for idle in self.idle.values():
+            count = 0
+            while count < len(idle) and idle[count][1] < limit:  # oldest first
+                idle[count][0].writer.close()
+                count += 1
+            del idle[:count]
+            self.idle_count -= count
+
+    async def open(self, key: tuple) -> Client:
+        """open a new connection for key, making room if the pool is full"""
+        if self.max_connections:
+            while self.idle_count and (
+                self.in_use.current + self.idle_count > self.max_connections
+            ):
+                self.evict()
+        host, port, is_ssl = key
+        client = Client(
+            verbose=self.verbose,
+            parser_backend=self.parser_backend,
+            cafile=self.cafile,
+            resolver=self.resolver,
+        )
+        await client.open(host, port, is_ssl=is_ssl)
+        self.opened += 1
+        return client
+
+    def evict(self) -> None:
+        """close the connection that has been idle the longest"""
+        key = min(
+            (key for key, idle in self.idle.items() if idle),
+            key=lambda key: self.idle[key][0][1],
+        )
+        client, _ = self.idle[key].pop(0)
+        self.idle_count -= 1
+        client.writer.close()
+
+    async def close(self) -> None:
+        """close all of the idle connections"""
+        idle = [client for clients in self.idle.values() for client, _ in clients]
+        self.idle.clear()
+        self.idle_count = 0
+        for client in idle:
+            with contextlib.suppress(ConnectionError):
+                await client.close()
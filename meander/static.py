@@ -0,0 +1,216 @@
+"""serve static files from a directory"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import email.utils
+import mimetypes
+import os
+import time
+import urllib.parse
+
+from meander.document import ServerDocument as Request
+from meander.exception import HTTPException
+from meander.response import FileResponse, Response
+
+
+@dataclass
+class BytesResponse(Response):
+    """form a response whose content is bytes, sent as is
+
+    the Content-Type header is expected to be supplied; unlike Response, the
+    content isn't converted to match it (for instance, with json.dumps).
+    """
+
+    charset: str = None
+
+    def fmt_content(self, header_lower: dict) -> None:
+        if not self.content_type:
+            self.content_type = header_lower.get("content-type", None)
+
+
+@dataclass
+class StaticFile:  # pylint: disable=too-many-instance-attributes
+    """cached stat results (and maybe content) of one file"""
+
+    path: str
+    size: int
+    mtime_ns: int
+    etag: str
+    last_modified: str
+    content_type: str
+    content: bytes | None  # None if the body isn't cached
+    checked: float  # time.monotonic of the last stat
+
+
+class StaticFiles:
+    """handler that serves the files in a directory
+
+    The file is named by the last group in the route's pattern, relative to
+    directory; for example, this serves "/static/css/site.css" from
+    "public/css/site.css":
+
+        server.add_route("/static/(.+)", StaticFiles("public"))
+
+    Responses carry ETag and Last-Modified headers, and a matching
+    If-None-Match or If-Modified-Since results in a 304. A single "bytes"
+    Range (optionally qualified by If-Range) results in a 206; other Range
+    values are ignored.
+
+    Files up to max_file_size bytes are kept in memory; larger files are
+    sent with loop.sendfile (see FileResponse). The stat results of up to
+    max_entries files, and the content of small files up to a total of
+    max_bytes, are cached (least recently used is evicted first). A cached
+    stat is trusted for ttl seconds.
+    """
+
+    # pylint: disable-next=too-many-arguments, too-many-positional-arguments
+    def __init__(
+        self,
+        directory: str,
+        max_entries: int = 1024,
+        max_bytes: int = 8 * 1024 * 1024,
+        max_file_size: int = 64 * 1024,
+        ttl: float = 1.0,
+    ) -> None:
+        self.directory = os.path.realpath(directory)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_file_size = max_file_size
+        self.ttl = ttl
+        self.cache = OrderedDict()  # name -> StaticFile
+        self.cached_bytes = 0
+
+    def __call__(self, request: Request) -> Response:
+        """return a response for the file named by the request's last arg"""
+        if not request.args:
+            raise HTTPException(404, "Not Found")
+        file = self.lookup(request.args[-1])
+        headers = {
+            "ETag": file.etag,
+            "Last-Modified": file.last_modified,
+            "Accept-Ranges": "bytes",
+        }
+        if is_not_modified(request.http_headers, file):
+            response = Response(code=304, message="Not Modified", headers=headers)
+            del response.headers["Content-Length"]  # a 304 has no body
+            return response
+
+        headers["Content-Type"] = file.content_type
+        code, message = 200, "OK"
+        start, end = 0, file.size
+        if byte_range := get_range(request.http_headers, file):
+            start, end = byte_range
+            code, message = 206, "Partial Content"
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{file.size}"
+        headers["Content-Length"] = end - start
+
+        if file.content is not None:
+            return BytesResponse(file.content[start:end], code, message, headers)
+        return FileResponse(
+            code=code,
+            message=message,
+            headers=headers,
+            path=file.path,
+            offset=start,
+            count=end - start,
+        )
+
+    def lookup(self, name: str) -> StaticFile:
+        """return the (cached) StaticFile for name (which is percent-encoded)"""
+        name = urllib.parse.unquote(name)
+        now = time.monotonic()
+        if (file := self.cache.get(name)) is not None:
+            if now - file.checked < self.ttl:
+                self.cache.move_to_end(name)
+                return file
+
+        try:
+            path = os.path.realpath(os.path.join(self.directory, name))
+            if os.path.commonpath((self.directory, path)) != self.directory:
+                raise HTTPException(404, "Not Found")
+            stat = os.stat(path)
+        except (OSError, ValueError):  # ValueError for an embedded NUL
+            stat = None
+        if stat is None or not os.path.isfile(path):
+            self.evict(name)
+            raise HTTPException(404, "Not Found")
+
+        if file and (file.mtime_ns, file.size) == (stat.st_mtime_ns, stat.st_size):
+            file.checked = now
+            self.cache.move_to_end(name)
+            return file
+
+        self.evict(name)
+        file = StaticFile(
+            path,
+            stat.st_size,
+            stat.st_mtime_ns,
+            f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+            email.utils.formatdate(stat.st_mtime, usegmt=True),
+            mimetypes.guess_type(path)[0] or "application/octet-stream",
+            None,
+            now,
+        )
+        if file.size <= self.max_file_size and file.size <= self.max_bytes:
+            with open(path, "rb") as stream:
+                file.content = stream.read()
+            self.cached_bytes += len(file.content)
+        self.cache[name] = file
+
+        while len(self.cache) > self.max_entries or self.cached_bytes > self.max_bytes:
+            self.evict(next(iter(self.cache)))
+        return file
+
+    def evict(self, name: str) -> None:
+        """remove name from the cache, if present"""
+        if (file := self.cache.pop(name, None)) is not None and file.content:
+            self.cached_bytes -= len(file.content)
+
+
+def is_not_modified(headers: dict, file: StaticFile) -> bool:
+    """return True if the request's conditional headers match file"""
+    if (match := headers.get("if-none-match")) is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in match.split(",")]
+        return "*" in tags or file.etag in tags
+    if since := headers.get("if-modified-since"):
+        try:
+            since = email.utils.parsedate_to_datetime(since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return file.mtime_ns // 1_000_000_000 <= since
+    return False
+
+
+def get_range(headers: dict, file: StaticFile) -> tuple[int, int] | None:
+    """return the (start, end) of a single byte range request, or None
+
+    raises a 416 if the range is valid, but outside the file.
+    """
+    value = headers.get("range", "")
+    if not value.startswith("bytes=") or "," in value:
+        return None
+    if (if_range := headers.get("if-range")) is not None:
+        if if_range not in (file.etag, file.last_modified):
+            return None
+
+    first, dash, last = value[6:].strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if first:
+            start = int(first)
+            if last and int(last) < start:
+                return None
+            end = min(int(last) + 1, file.size) if last else file.size
+        else:
+            start = max(file.size - int(last), 0)
+            end = file.size if int(last) else 0
+    except ValueError:
+        return None
+    if start < 0 or start >= end:
+        raise HTTPException(
+            416,
+            "Range Not Satisfiable",
+            headers={"Content-Range": f"bytes */{file.size}"},
+        )
+    return start, end
@@ -0,0 +1,84 @@
+"""shared ssl contexts, with tls session resumption
+
+Creating an SSLContext, and loading a CA bundle into it, takes milliseconds
+of cpu, so contexts are created once per configuration, and shared by all
+of the connections (and servers) that use that configuration.
+"""
+
+import functools
+import ssl
+
+import certifi
+
+MAX_SESSIONS = 1024  # tls sessions saved per client context
+
+
+class ClientContext(ssl.SSLContext):
+    """client SSLContext that resumes tls sessions with the hosts it has seen
+
+    asyncio doesn't pass a session when it wraps a connection, so wrap_bio
+    adds the session saved (with save_session) for the server's hostname.
+    If the server won't resume the session, a full handshake is done.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:  # pylint: disable=unused-argument
+        super().__init__()
+        self.sessions = {}  # hostname -> ssl.SSLSession, least recent first
+
+    # pylint: disable-next=too-many-arguments, too-many-positional-arguments
+    def wrap_bio(
+        self,
+        incoming: ssl.MemoryBIO,
+        outgoing: ssl.MemoryBIO,
+        server_side: bool = False,
+        server_hostname: str | None = None,
+        session: ssl.SSLSession | None = None,
+    ) -> ssl.SSLObject:
+        if session is None and not server_side:
+            session = self.sessions.get(server_hostname)
+        return super().wrap_bio(
+            incoming, outgoing, server_side, server_hostname, session
+        )
+
+    def save_session(self, hostname: str, ssl_object: ssl.SSLObject | None) -> None:
+        """save the session from a connection to hostname, for resumption
+
+        with tls 1.3, the session ticket arrives after the handshake, so
+        this should be called once some data has been read.
+        """
+        if ssl_object is None or ssl_object.session is None:
+            return
+        self.sessions.pop(hostname, None)
+        self.sessions[hostname] = ssl_object.session
+        if len(self.sessions) > MAX_SESSIONS:
+            del self.sessions[next(iter(self.sessions))]
+
+
+@functools.cache
+def client_context(cafile: str | None = None) -> ClientContext:
+    """return the shared client context that verifies servers with cafile
+
+    by default, servers are verified with certifi's CA bundle. the options
+    and verify flags are those of ssl.create_default_context, so that a
+    shared context verifies servers as strictly as a default one.
+    """
+    default = ssl.create_default_context(cafile=cafile or certifi.where())
+    context = ClientContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.options = default.options
+    context.verify_flags = default.verify_flags
+    context.minimum_version = default.minimum_version
+    context.load_verify_locations(cafile=cafile or certifi.where())
+    return context
+
+
+@functools.cache
+def server_context(certfile: str, keyfile: str) -> ssl.SSLContext:
+    """return the shared server context for a certificate and key
+
+    session tickets are enabled, so that clients can resume sessions,
+    including with other servers (or ports) that use the same certificate.
+    """
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(certfile, keyfile)
+    context.options &= ~ssl.OP_NO_TICKET
+    return context
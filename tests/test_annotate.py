@@ -212,3 +212,78 @@ def test_conflict_with_kwargs():
     request.content = {"test": 1, "test_kwargs": 10}
     with pytest.raises(exception.ExtraAttributeError):
         annotate.call(call_with_kwargs, request)
+
+
+def call_args(first: int, second=None):
+    """url args only"""
+    return first, second
+
+
+def call_connection_id(cid: types_.ConnectionId, value: int = 0):
+    """expect a connection id"""
+    return cid, value
+
+
+@pytest.mark.parametrize(
+    "func, bind",
+    (
+        (func1, "bind_nothing"),
+        (call_content, "bind_content"),
+        (call_request, "bind_request"),
+        (call_args, "bind_args"),
+        (call_one, "bind_args"),
+        (call_with_kwargs, "bind_plan"),
+        (func4, "bind_plan"),
+    ),
+)
+def test_binder_fast_paths(func, bind):
+    """verify the binder chooses the expected strategy"""
+    binder = annotate.get_binder(func)
+    assert binder.bind.__name__ == bind
+    assert annotate.get_binder(func) is binder
+
+
+@pytest.mark.parametrize(
+    "args, content, result",
+    (
+        (["1", "2"], {}, (1, "2")),
+        (["1", "2"], None, (1, "2")),
+        (["1"], {}, (1, None)),
+        (["1"], {"second": 3}, (1, 3)),
+        ([], {"first": "4"}, (4, None)),
+    ),
+)
+def test_binder_args(args, content, result):
+    """url args with and without content"""
+    req = Request()
+    req.args = args
+    req.content = content
+    assert annotate.call(call_args, req) == result
+
+
+def test_binder_args_errors():
+    """url args fast path reports the same errors as the plan"""
+    req = Request()
+    req.args = ["abc", "2"]
+    req.content = {}
+    with pytest.raises(exception.PayloadValueError):
+        annotate.call(call_args, req)
+
+    req.args = ["1", "2", "3"]
+    with pytest.raises(exception.ExtraAttributeError):
+        annotate.call(call_args, req)
+
+    req.args = ["1", "2"]
+    req.content = {"first": 1}
+    with pytest.raises(exception.DuplicateAttributeError):
+        annotate.call(call_args, req)
+
+
+def test_binder_connection_id():
+    """connection id is formatted from the request"""
+    req = Request()
+    req.args = []
+    req.content = {"value": "5"}
+    req.connection_id = 10
+    req.id = 20
+    assert annotate.call(call_connection_id, req) == ("con=10 req=20", 5)
@@ -3,6 +3,7 @@
 import asyncio
 from unittest.mock import AsyncMock, patch, MagicMock
 
+import pytest
 
 from meander.call import call, _URL
 from meander.document import ClientDocument
@@ -408,3 +409,111 @@ def test_call_delete_shortcut():
             assert clients[0].write.call_args.kwargs["method"] == "DELETE"
 
     asyncio.run(test())
+
+
+# --- gather / as_completed tests ---
+
+
+def _fake_call(running: list, peak: list):
+    """a call that takes delay seconds for url "delay", or fails for "fail" """
+
+    async def fake(url, session=None, **kwargs):  # pylint: disable=unused-argument
+        running.append(url)
+        peak.append(len(running))
+        try:
+            if url == "fail":
+                raise ValueError("failed")
+            await asyncio.sleep(float(url))
+            return _make_response(200, url)
+        finally:
+            running.remove(url)
+
+    return fake
+
+
+def test_gather_in_order():
+    """gather returns responses in request order, limiting concurrency"""
+    running, peak = [], []
+
+    async def test():
+        with patch("meander.call.call", _fake_call(running, peak)):
+            results = await call.gather(
+                ["0.03", "0.01", {"url": "0.02"}, "0"], max_concurrency=2
+            )
+            assert [r.http_status_message for r in results] == [
+                "0.03",
+                "0.01",
+                "0.02",
+                "0",
+            ]
+            assert max(peak) == 2
+
+    asyncio.run(test())
+
+
+def test_as_completed_order():
+    """as_completed yields (index, response) as each call completes"""
+    running, peak = [], []
+
+    async def test():
+        with patch("meander.call.call", _fake_call(running, peak)):
+            indexes = [
+                index
+                async for index, _ in call.as_completed(
+                    ["0.03", "0.01", "0.02"], max_concurrency=0
+                )
+            ]
+            assert indexes == [1, 2, 0]
+            assert max(peak) == 3
+
+    asyncio.run(test())
+
+
+def test_gather_fail_fast():
+    """by default, the first exception cancels the other calls"""
+    running, peak = [], []
+
+    async def test():
+        with patch("meander.call.call", _fake_call(running, peak)):
+            with pytest.raises(ValueError, match="failed"):
+                await call.gather(["5", "fail", "5"])
+            assert not running
+
+    asyncio.run(test())
+
+
+def test_gather_collect_errors():
+    """with fail_fast False, exceptions take the place of responses"""
+    running, peak = [], []
+
+    async def test():
+        with patch("meander.call.call", _fake_call(running, peak)):
+            results = await call.gather(["0", "fail", "0"], fail_fast=False)
+            assert results[0].http_status_code == 200
+            assert isinstance(results[1], ValueError)
+            assert results[2].http_status_code == 200
+
+    asyncio.run(test())
+
+
+@pytest.mark.parametrize("fail_fast", (True, False))
+def test_gather_deadline(fail_fast):
+    """calls still running at the deadline are cancelled"""
+    running, peak = [], []
+
+    async def test():
+        with patch("meander.call.call", _fake_call(running, peak)):
+            start = asyncio.get_running_loop().time()
+            if fail_fast:
+                with pytest.raises(TimeoutError):
+                    await call.gather(["0", "5", "5"], timeout=0.05)
+            else:
+                results = await call.gather(
+                    ["0", "5", "5"], timeout=0.05, fail_fast=False
+                )
+                assert results[0].http_status_code == 200
+                assert all(isinstance(r, TimeoutError) for r in results[1:])
+            assert asyncio.get_running_loop().time() - start < 1
+            assert not running
+
+    asyncio.run(test())
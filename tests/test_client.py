@@ -1,10 +1,13 @@
 """tests for http client"""
 
 import asyncio
+import gzip
+import io
+import random
 
 import pytest
 
-from meander.client import Client
+from meander.client import Client, ResponseStream
 from meander.formatter import HTTPFormat
 
 
@@ -132,6 +135,39 @@ def test_read_parses_response():
     asyncio.run(test())
 
 
+@pytest.mark.parametrize(
+    "close, headers, is_keep_alive",
+    (
+        (False, None, True),
+        (True, None, False),
+        (False, {"Connection": "close"}, False),
+    ),
+)
+def test_read_keep_alive(close, headers, is_keep_alive):
+    """the client is keep-alive unless either side asks to close"""
+    client, _ = _make_client(_build_response(200, "OK", "hi", headers))
+
+    async def test():
+        client.write(close=close)
+        await client.read()
+        assert client.requests == 1
+        assert client.is_keep_alive is is_keep_alive
+
+    asyncio.run(test())
+
+
+def test_read_eof():
+    """read returns None, and the client isn't keep-alive, on EOF"""
+    client, _ = _make_client(b"")
+
+    async def test():
+        client.write()
+        assert await client.read() is None
+        assert client.is_keep_alive is False
+
+    asyncio.run(test())
+
+
 def test_read_updates_reader_settings():
     """test read passes timeout settings to reader"""
     response = _build_response(204, "No Content")
@@ -172,7 +208,7 @@ def test_open_sets_host():
 
             mp.setattr(asyncio, "open_connection", mock_open_connection)
 
-            client = Client()
+            client = Client(resolver=None)
             await client.open("localhost", 8080)
             assert client.host == "localhost"
             assert client.reader is not None
@@ -197,7 +233,7 @@ def test_open_ssl_creates_context():
 
             mp.setattr(asyncio, "open_connection", mock_open_connection)
 
-            client = Client()
+            client = Client(resolver=None)
             await client.open("example.com", 443, is_ssl=True)
 
     asyncio.run(test())
@@ -221,8 +257,120 @@ def test_open_no_ssl_passes_none():
 
             mp.setattr(asyncio, "open_connection", mock_open_connection)
 
-            client = Client()
+            client = Client(resolver=None)
             await client.open("example.com", 80, is_ssl=False)
 
     asyncio.run(test())
     assert ssl_args == [None]
+
+
+def test_open_parser_backend():
+    """test open passes parser_backend to the reader"""
+
+    async def test():
+        with pytest.MonkeyPatch.context() as mp:
+
+            async def mock_open_connection(host, port, ssl=None):
+                return ByteReader(b""), MockWriter()
+
+            mp.setattr(asyncio, "open_connection", mock_open_connection)
+
+            client = Client(parser_backend="auto", resolver=None)
+            await client.open("localhost", 8080)
+            assert client.reader.backend in ("python", "httptools")
+
+    asyncio.run(test())
+
+
+def _chunked(body: bytes, size: int, headers: str = "") -> bytes:
+    """build a raw chunked HTTP response, with chunks of size bytes"""
+    chunks = b"".join(
+        b"%x\r\n%s\r\n" % (len(body[i : i + size]), body[i : i + size])
+        for i in range(0, len(body), size)
+    )
+    head = f"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n{headers}\r\n"
+    return head.encode("ascii") + chunks + b"0\r\n\r\n"
+
+
+async def _stream(data: bytes) -> tuple[Client, ResponseStream, list]:
+    """read a streamed response, returning the client, stream and releases"""
+    client, _ = _make_client(data)
+    client.write()
+    response = await client.read(stream=True)
+    assert response.http_status_code == 200
+    releases = []
+
+    async def release():
+        releases.append(True)
+
+    return client, ResponseStream(response.content, client, release), releases
+
+
+def test_stream_gzip_chunked():
+    """a chunked, gzipped body is decompressed piece by piece"""
+    body = random.Random(0).randbytes(100000)  # doesn't compress
+    data = _chunked(gzip.compress(body), 1000, "Content-Encoding: gzip\r\n")
+
+    async def test():
+        client, stream, releases = await _stream(data)
+        pieces = [piece async for piece in stream]
+        assert len(pieces) > 1
+        assert b"".join(pieces) == body
+        assert releases == [True]
+        assert client.is_keep_alive is True
+        await stream.close()
+        assert releases == [True]
+
+    asyncio.run(test())
+
+
+def test_stream_close_early():
+    """a stream closed before the end of the body isn't reusable"""
+
+    async def test():
+        client, stream, releases = await _stream(_chunked(b"x" * 10000, 100))
+        async with stream:
+            assert await anext(stream) == b"x" * 100
+        assert releases == [True]
+        assert client.is_keep_alive is False
+
+    asyncio.run(test())
+
+
+def test_stream_write_to_file(tmp_path):
+    """the body can be written to a file"""
+    path = tmp_path / "body"
+
+    async def test():
+        _, stream, releases = await _stream(_build_response(body="hello" * 2000))
+        assert await stream.write_to(path) == 10000
+        assert releases == [True]
+
+    asyncio.run(test())
+    assert path.read_bytes() == b"hello" * 2000
+
+
+def test_stream_write_to_sink():
+    """the body can be written to a sink with a sync or async write"""
+
+    class AsyncSink:  # pylint: disable=too-few-public-methods
+        """collects data"""
+
+        def __init__(self):
+            self.data = b""
+
+        async def write(self, data):
+            """collect data"""
+            self.data += data
+
+    async def test():
+        _, stream, _ = await _stream(_chunked(b"abc" * 100, 7))
+        sink = AsyncSink()
+        assert await stream.write_to(sink) == 300
+        assert sink.data == b"abc" * 100
+        _, stream, _ = await _stream(_chunked(b"abc" * 100, 7))
+        buffer = io.BytesIO()
+        await stream.write_to(buffer)
+        assert buffer.getvalue() == b"abc" * 100
+
+    asyncio.run(test())
@@ -1,10 +1,14 @@
 """tests to lock down connection request handling"""
 
 import asyncio
+import re
 
-from meander import Request
+import pytest
+
+from meander import ConstantResponse, Request
+from meander import exception
 from meander.connection import Connection
-from meander.router import Endpoint
+from meander.router import Endpoint, Route, Router
 
 
 class ByteWriter:
@@ -17,11 +21,34 @@ class ByteWriter:
         """append value to buffer"""
         self.out += value
 
+    def writelines(self, values: list[bytes]):
+        """append values to buffer"""
+        for value in values:
+            self.write(value)
+
+    async def drain(self):
+        """nothing to wait for"""
+
+    def close(self):
+        """nothing to close"""
+
     def get_extra_info(self, *args):  # pylint: disable=unused-argument
         """return dummy value"""
         return ["", ""]
 
 
+class ByteReader:  # pylint: disable=too-few-public-methods
+    """mock read stream"""
+
+    def __init__(self, data):
+        self.data = data
+
+    async def read(self, length):
+        """return length bytes from self.data"""
+        result, self.data = self.data[:length], self.data[length:]
+        return result
+
+
 class EasyRouter:  # pylint: disable=too-few-public-methods
     """always returns the same thing (not testing routing function)"""
 
@@ -51,6 +78,38 @@ def test_text():
     asyncio.run(test())
 
 
+@pytest.mark.parametrize("is_closing", (False, True))
+def test_constant(is_closing):
+    """a constant response is written without running a handler"""
+    constant = ConstantResponse("pong")
+
+    def handler():
+        raise AssertionError("handler called")
+
+    class ConstantRouter:  # pylint: disable=too-few-public-methods
+        """routes to the constant"""
+
+        def __call__(self, *args):
+            return Endpoint(handler, [], False, [], [], constant=constant)
+
+    writer = ByteWriter()
+    con = Connection(None, writer, ConstantRouter())
+    con.is_closing = is_closing
+
+    async def test():
+        await con.handle_request(Request())
+        await con.handle_request(Request())
+        response = writer.out.split(b"pong")[0] + b"pong"
+        assert response.startswith(b"HTTP/1.1 200 OK\r\n")
+        assert b"\r\nDate: " in response
+        assert (b"\r\nConnection: close\r\n" in response) is is_closing
+        undated = re.sub(rb"Date: [^\r]*", b"", response)
+        assert re.sub(rb"Date: [^\r]*", b"", writer.out) == undated * 2
+        assert "Connection" not in constant.headers
+
+    asyncio.run(test())
+
+
 def test_text_coro():
     """simple text return from coroutine"""
 
@@ -205,3 +264,247 @@ def test_before_and_after():
         assert writer.out.endswith(b"\r\n20")
 
     asyncio.run(test())
+
+
+def test_method_not_allowed():
+    """path matches under another method"""
+    rtr = Router()
+    rtr.add(Route("pong", "/ping", "GET"))
+    rtr.add(Route("pong", "/ping", "PUT"))
+    con = Connection(None, ByteWriter(), rtr)
+    request = Request()
+    request.http_resource = "/ping"
+    request.http_method = "POST"
+
+    async def test():
+        with pytest.raises(exception.HTTPException) as exc:
+            await con.handle_request(request)
+        assert exc.value.code == 405
+        assert exc.value.headers == {"Allow": "GET, PUT"}
+        result = con.on_http_exception(exc.value)
+        assert result.serial().startswith(b"HTTP/1.1 405 Method Not Allowed\r\n")
+        assert result.headers["Allow"] == "GET, PUT"
+
+    asyncio.run(test())
+
+
+def test_not_found():
+    """path doesn't match any route"""
+    rtr = Router()
+    rtr.add(Route("pong", "/ping", "GET"))
+    con = Connection(None, ByteWriter(), rtr)
+    request = Request()
+    request.http_resource = "/pong"
+    request.http_method = "GET"
+
+    async def test():
+        with pytest.raises(exception.HTTPException) as exc:
+            await con.handle_request(request)
+        assert exc.value.code == 404
+
+    asyncio.run(test())
+
+
+@pytest.mark.parametrize("pipeline_limit", (1, 2))
+def test_not_found_routed_once(pipeline_limit):
+    """a request with no route is looked up once"""
+    rtr = Router(cache_size=4)
+    rtr.add(Route("pong", "/ping", "GET"))
+    writer = ByteWriter()
+    con = Connection(pipelined("/pong"), writer, rtr, pipeline_limit=pipeline_limit)
+
+    async def test():
+        await con.handle()
+        assert writer.out.startswith(b"HTTP/1.1 404 Not Found")
+        assert (rtr.cache.hits, rtr.cache.misses) == (0, 1)
+
+    asyncio.run(test())
+
+
+UPLOAD = (
+    b"POST /upload HTTP/1.1\r\nContent-Length: 10\r\n\r\n0123456789"
+    b"GET /ping HTTP/1.1\r\n\r\n"
+)
+
+
+@pytest.mark.parametrize("stream", (False, True))
+def test_stream_route(stream):
+    """a stream route's handler reads the body from the connection"""
+    received = []
+
+    async def handler(body):
+        if stream:
+            assert not isinstance(body, bytes)
+            async for chunk in body:
+                received.append(chunk)
+        else:
+            received.append(body)
+
+    rtr = Router()
+    rtr.add(Route(handler, "/upload", "POST", stream=stream))
+    rtr.add(Route("pong", "/ping", "GET"))
+    writer = ByteWriter()
+    con = Connection(ByteReader(UPLOAD), writer, rtr)
+
+    async def test():
+        assert await con.next_request() is True
+        assert b"".join(received) == b"0123456789"
+        assert await con.next_request() is True
+        assert writer.out.endswith(b"\r\npong")
+
+    asyncio.run(test())
+
+
+def test_stream_route_args():
+    """a stream route's handler can take url args along with the request"""
+    received = {}
+
+    async def handler(name: str, request: Request):
+        received[name] = b"".join([chunk async for chunk in request.content])
+        return "saved"
+
+    rtr = Router()
+    rtr.add(Route(handler, r"/(\w+)", "POST", stream=True))
+    writer = ByteWriter()
+    con = Connection(ByteReader(UPLOAD), writer, rtr)
+
+    async def test():
+        assert await con.next_request() is True
+        assert writer.out.startswith(b"HTTP/1.1 200 OK")
+        assert received == {"upload": b"0123456789"}
+
+    asyncio.run(test())
+
+
+def test_stream_route_unread():
+    """an unread stream body closes the connection after the response"""
+
+    def handler(body):  # pylint: disable=unused-argument
+        return "ok"
+
+    rtr = Router()
+    rtr.add(Route(handler, "/upload", "POST", stream=True))
+    writer = ByteWriter()
+    con = Connection(ByteReader(UPLOAD), writer, rtr)
+
+    async def test():
+        assert await con.next_request() is False
+        assert writer.out.endswith(b"\r\nok")
+
+    asyncio.run(test())
+
+
+def test_streaming_response():
+    """a generator handler's response is written a chunk at a time"""
+    writes = []
+
+    def handler():
+        yield "abc"
+        writes.append(len(writer.out))
+        yield "def"
+
+    writer = ByteWriter()
+    con = Connection(None, writer, EasyRouter(handler))
+
+    async def test():
+        assert await con.handle_request(Request()) is True
+        assert writes and writes[0] < len(writer.out)
+        assert writer.out.endswith(b"\r\n\r\n3\r\nabc\r\n3\r\ndef\r\n0\r\n\r\n")
+
+    asyncio.run(test())
+
+
+def test_streaming_response_error():
+    """a failing generator cuts the response short and closes the connection"""
+
+    async def handler():
+        yield "abc"
+        raise ValueError("oops")
+
+    writer = ByteWriter()
+    con = Connection(None, writer, EasyRouter(handler))
+
+    async def test():
+        assert await con.handle_request(Request()) is False
+        assert writer.out.endswith(b"\r\n\r\n3\r\nabc\r\n")
+
+    asyncio.run(test())
+
+
+def pipelined(*resources):
+    """a ByteReader with a GET request for each resource"""
+    return ByteReader(
+        b"".join(f"GET {resource} HTTP/1.1\r\n\r\n".encode() for resource in resources)
+    )
+
+
+def test_pipelined():
+    """pipelined handlers run concurrently; responses are written in order"""
+    running = []
+    peak = []
+
+    async def handler(delay: int):
+        running.append(delay)
+        peak.append(len(running))
+        await asyncio.sleep(delay / 100)
+        running.remove(delay)
+        return f"<{delay}>"
+
+    rtr = Router()
+    rtr.add(Route(handler, r"/sleep/(\d+)", "GET"))
+    writer = ByteWriter()
+    reader = pipelined("/sleep/3", "/sleep/2", "/sleep/1", "/sleep/0", "/sleep/0")
+    con = Connection(reader, writer, rtr, pipeline_limit=3)
+
+    async def test():
+        await con.handle()
+        bodies = re.findall(rb"\r\n\r\n(<\d>)", writer.out)
+        assert bodies == [b"<3>", b"<2>", b"<1>", b"<0>", b"<0>"]
+        assert max(peak) == 3
+
+    asyncio.run(test())
+
+
+def test_pipelined_error():
+    """a failed request is written in order, then the connection closes"""
+    handled = []
+
+    async def handler(delay: int):
+        await asyncio.sleep(delay / 100)
+        handled.append(delay)
+        return f"<{delay}>"
+
+    rtr = Router()
+    rtr.add(Route(handler, r"/sleep/(\d+)", "GET"))
+    writer = ByteWriter()
+    reader = pipelined("/sleep/2", "/nope", "/sleep/0")
+    con = Connection(reader, writer, rtr, pipeline_limit=3)
+
+    async def test():
+        await con.handle()
+        assert writer.out.startswith(b"HTTP/1.1 200 OK")
+        assert b"<2>HTTP/1.1 404 Not Found" in writer.out
+        assert b"<0>" not in writer.out
+
+    asyncio.run(test())
+
+
+def test_pipelined_bad_request():
+    """a request that can't be parsed is answered after those before it"""
+
+    async def handler():
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    rtr = Router()
+    rtr.add(Route(handler, "/ok", "GET"))
+    writer = ByteWriter()
+    reader = ByteReader(b"GET /ok HTTP/1.1\r\n\r\nGET /ok HTTP/1.0\r\n\r\n")
+    con = Connection(reader, writer, rtr, pipeline_limit=2)
+
+    async def test():
+        await con.handle()
+        assert writer.out.startswith(b"HTTP/1.1 200 OK")
+        assert b"\r\nokHTTP/1.1 400 Bad Request" in writer.out
+
+    asyncio.run(test())
@@ -1,7 +1,13 @@
 """tests for http formatter"""
 
+import asyncio
+import email.utils
+import gzip
+import time
+
 import pytest
 
+from meander import ConstantResponse, formatter
 from meander.formatter import HTTPFormat
 
 
@@ -108,3 +114,131 @@ def test_content_type_header(content, content_type, result):
         assert "Content-Type" not in fmt.headers
     else:
         assert fmt.headers["Content-Type"] == result + "; charset=utf-8"
+
+
+def sync_pieces():
+    """produce content from a generator"""
+    yield "abc"
+    yield b""
+    yield b"defgh"
+
+
+async def async_pieces():
+    """produce content from an async generator"""
+    for piece in sync_pieces():
+        yield piece
+
+
+def collect(fmt):
+    """return the list of chunks written for a streaming document"""
+
+    async def _collect():
+        return [chunk async for chunk in fmt.chunks()]
+
+    return asyncio.run(_collect())
+
+
+@pytest.mark.parametrize("pieces", (sync_pieces, async_pieces))
+def test_streaming(pieces):
+    """iterator content is sent a piece at a time with chunked encoding"""
+    fmt = HTTPFormat(pieces())
+    assert fmt.is_streaming
+    assert fmt.headers["Transfer-Encoding"] == "chunked"
+    assert "Content-Length" not in fmt.headers
+    assert fmt.headers["Content-Type"] == "text/plain; charset=utf-8"
+    assert fmt.serial().endswith(b"\r\n\r\n")
+    assert collect(fmt) == [b"3\r\nabc\r\n", b"5\r\ndefgh\r\n", b"0\r\n\r\n"]
+
+
+def test_streaming_content_length():
+    """with a content-length header, pieces are sent without chunk framing"""
+    fmt = HTTPFormat(sync_pieces(), headers={"Content-Length": 8})
+    assert "Transfer-Encoding" not in fmt.headers
+    assert collect(fmt) == [b"abc", b"defgh"]
+
+
+def test_streaming_compress():
+    """pieces are compressed as they are produced"""
+    fmt = HTTPFormat(sync_pieces(), compress=True)
+    assert fmt.headers["Content-Encoding"] == "gzip"
+    body = b""
+    for chunk in collect(fmt)[:-1]:
+        length, data = chunk.split(b"\r\n", 1)
+        assert len(data) == int(length, 16) + 2
+        body += data[:-2]
+    assert gzip.decompress(body) == b"abcdefgh"
+
+
+def test_date_header():
+    """the Date header is in GMT, and formatted once per second"""
+    date = HTTPFormat("x").headers["Date"]
+    assert date.endswith(" GMT")
+    assert abs(email.utils.parsedate_to_datetime(date).timestamp() - time.time()) < 2
+    assert HTTPFormat("y").headers["Date"] is formatter.http_date()
+
+
+def test_date_header_not_replaced():
+    """a Date header supplied by the caller is kept"""
+    fmt = HTTPFormat("x", headers={"date": "yesterday"})
+    assert fmt.headers == {
+        "date": "yesterday",
+        "Content-Type": "text/plain; charset=utf-8",
+        "Content-Length": 1,
+    }
+
+
+def test_buffers():
+    """buffers are the status line, headers and content, without copying"""
+    fmt = HTTPFormat("pong", headers={"Date": "now"})
+    status, headers, content = fmt.buffers()
+    assert status == b"HTTP/1.1 200 OK\r\n"
+    assert status is formatter.status_line(200, "OK")
+    assert headers == (
+        b"Date: now\r\n"
+        b"Content-Type: text/plain; charset=utf-8\r\n"
+        b"Content-Length: 4\r\n\r\n"
+    )
+    assert content is fmt.content
+    assert fmt.serial() == status + headers + content
+
+
+def test_buffers_no_content():
+    """without content there is no content buffer"""
+    fmt = HTTPFormat(code=204, message="No Content", headers={"Date": "now"})
+    assert fmt.buffers() == [
+        b"HTTP/1.1 204 No Content\r\n",
+        b"Date: now\r\nContent-Length: 0\r\n\r\n",
+    ]
+
+
+def test_constant_response():
+    """a constant response is formatted once, with a current Date header"""
+    constant = ConstantResponse({"a": 1})
+    head, date, content = constant.buffers()
+    assert head == (
+        b"HTTP/1.1 200 OK\r\n"
+        b"Content-Type: application/json; charset=utf-8\r\n"
+        b"Content-Length: 8\r\n"
+    )
+    assert date == f"Date: {formatter.http_date()}\r\n\r\n".encode()
+    assert content == b'{"a": 1}'
+    assert constant.buffers()[1] is date  # not formatted again this second
+    assert constant.buffers(close=True)[0] == head + b"Connection: close\r\n"
+
+
+def test_constant_response_headers():
+    """a supplied Date or Connection header is kept as is"""
+    constant = ConstantResponse(
+        "x", headers={"Date": "now", "Connection": "keep-alive"}
+    )
+    assert (
+        constant.serial()
+        == HTTPFormat("x", headers={"Date": "now", "Connection": "keep-alive"}).serial()
+    )
+    assert b"close" not in b"".join(constant.buffers(close=True))
+
+
+def test_constant_response_streaming():
+    """a constant response can't be an iterator"""
+    with pytest.raises(AttributeError, match="can't be streamed"):
+        ConstantResponse(sync_pieces())
@@ -6,10 +6,19 @@ import json
 
 import pytest
 
+from meander.document import ServerDocument
 from meander.exception import HTTPException, HTTPEOF
+from meander import parser
 from meander.parser import HTTPReader, parse
 
 
+@pytest.fixture(autouse=True, params=parser.BACKENDS)
+def backend(request, monkeypatch):
+    """run every test with each available parser backend"""
+    monkeypatch.setattr(parser, "BACKEND", request.param)
+    return request.param
+
+
 class ByteReader:  # pylint: disable=too-few-public-methods
     """mock read stream"""
 
@@ -51,6 +60,22 @@ def test_reader_readline():
     asyncio.run(test())
 
 
+def test_reader_small_blocks():
+    """lines and reads span several blocks; consumed data is discarded"""
+    reader = HTTPReader(ByteReader(b"one\r\ntwo\nthree12345"), max_read_size=2)
+
+    async def test():
+        assert "one" == await reader.readline()
+        assert "two" == await reader.readline()
+        assert b"three" == await reader.read(5)
+        assert b"1" == await reader.read(1)
+        assert len(reader.buffer) <= 4
+        assert b"2345" == await reader.read(4)
+        assert reader.available == 0
+
+    asyncio.run(test())
+
+
 @pytest.mark.parametrize(
     "max_length, data",
     (
@@ -80,6 +105,31 @@ def test_reader_timeout():
     asyncio.run(test())
 
 
+def test_partial_head_timeout():
+    """a partial head times out after one wait, with either backend"""
+    reads = []
+
+    class StallReader:  # pylint: disable=too-few-public-methods
+        """return a partial head, then nothing"""
+
+        async def read(self, length):  # pylint: disable=unused-argument
+            """return the partial head once, then wait"""
+            reads.append(length)
+            if len(reads) == 1:
+                return b"GET / HTTP/1.1\r\nHost: x\r\n"
+            await asyncio.sleep(1)
+            return b""
+
+    reader = HTTPReader(StallReader(), active_timeout=0.01)
+
+    async def test():
+        with pytest.raises(TimeoutError):
+            await parse(reader)
+        assert len(reads) == 2
+
+    asyncio.run(test())
+
+
 @pytest.mark.parametrize(
     "data, message",
     (
@@ -500,3 +550,250 @@ def test_chunked_keepalive():
         assert doc2.http_resource == "/next"
 
     asyncio.run(test())
+
+
+def test_pipelined():
+    """several documents arriving in one block"""
+    data = b"".join(
+        f"POST /{index} HTTP/1.1\r\ncontent-length: 3\r\n\r\nabc".encode()
+        for index in range(50)
+    )
+    reader = HTTPReader(ByteReader(data), max_read_size=len(data))
+
+    async def test():
+        for index in range(50):
+            document = await reader.read_document()
+            assert document.http_resource == f"/{index}"
+            assert document.http_content == b"abc"
+        assert await reader.read_document() is None
+
+    asyncio.run(test())
+
+
+@pytest.mark.parametrize(
+    "data, lines",
+    (
+        (b"\n", []),
+        (b"\r\n", []),
+        (b"a: 1\nb: 2\n\n", ["a: 1", "b: 2"]),
+        (b"a: 1\r\nb: 2\r\n\r\nGET", ["a: 1", "b: 2"]),
+        (b"a: 1\r\n\nb: 2\n\n", ["a: 1"]),
+    ),
+)
+def test_read_header_block(data, lines):
+    """test header block split into lines"""
+    reader = HTTPReader(ByteReader(data), max_read_size=3)
+
+    async def test():
+        assert await reader.read_header_block() == lines
+
+    asyncio.run(test())
+
+
+def test_read_header_block_line_too_long():
+    """test long line in a complete header block"""
+    reader = HTTPReader(ByteReader(b"a: 12345678\n\n"), max_line_length=10)
+
+    async def test():
+        with pytest.raises(HTTPException) as exc:
+            await reader.read_header_block()
+        assert exc.value.code == 431
+
+    asyncio.run(test())
+
+
+def test_oversized_header_block():
+    """test fallback to line-at-a-time reading for a large header block"""
+    headers = "".join(f"header-{index}: {index}\r\n" for index in range(20))
+    data = f"POST / HTTP/1.1\r\n{headers}\r\n".encode()
+    reader = HTTPReader(ByteReader(data), max_line_length=50, max_read_size=10)
+
+    async def test():
+        assert await reader.read_header_block() is None
+        document = await parse(
+            HTTPReader(ByteReader(data), max_line_length=50, max_read_size=10)
+        )
+        assert len(document.http_headers) == 20
+        assert document.http_headers["header-19"] == "19"
+
+    asyncio.run(test())
+
+
+def test_oversized_header_block_count():
+    """test max header count when reading line-at-a-time"""
+    headers = "".join(f"header-{index}: {index}\r\n" for index in range(20))
+    data = f"POST / HTTP/1.1\r\n{headers}\r\n".encode()
+    reader = HTTPReader(ByteReader(data), max_line_length=50, max_header_count=5)
+
+    async def test():
+        with pytest.raises(HTTPException) as exc:
+            await parse(reader)
+        assert exc.value.args[2] == "max header count exceeded"
+
+    asyncio.run(test())
+
+
+DOCUMENTS = (
+    b"GET /a/b?x=1&y=2&y=3 HTTP/1.1\r\nHost: localhost\r\n\r\n",
+    (
+        b"POST /form HTTP/1.1\r\n"
+        b"Content-Type: application/x-www-form-urlencoded\r\n"
+        b"Content-Length: 7\r\n"
+        b"X-Spaces:   a  b   \r\n"
+        b"\r\n"
+        b"a=1&b=2"
+    ),
+    (
+        b"PUT /json HTTP/1.1\r\n"
+        b"content-type: application/json; charset=utf-8\r\n"
+        b"transfer-encoding: chunked\r\n"
+        b"connection: close\r\n"
+        b"\r\n"
+        b"8\r\n"
+        b'{"a": 1}\r\n'
+        b"0\r\n"
+        b"\r\n"
+    ),
+    b"get /lower HTTP/1.1\r\n\r\n",
+    b"GET /bare HTTP/1.1\nhost: x\n\n",
+)
+
+
+@pytest.mark.parametrize("data", DOCUMENTS)
+def test_backends_identical(data):
+    """each backend produces the same server document"""
+
+    async def test():
+        documents = [
+            await parse(HTTPReader(ByteReader(data), backend=name))
+            for name in parser.BACKENDS
+        ]
+        for document in documents[1:]:
+            assert vars(document) == vars(documents[0])
+
+    asyncio.run(test())
+
+
+@pytest.mark.parametrize(
+    "data",
+    (
+        b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok",
+        b"HTTP/1.0 404   Not    Found\r\n\r\n",
+        b"HTTP/1.1 204\r\n\r\n",
+    ),
+)
+def test_backends_identical_client(data):
+    """each backend produces the same client document"""
+
+    async def test():
+        documents = [
+            await parse(HTTPReader(ByteReader(data), is_server=False, backend=name))
+            for name in parser.BACKENDS
+        ]
+        for document in documents[1:]:
+            assert vars(document) == vars(documents[0])
+
+    asyncio.run(test())
+
+
+def test_backend_auto():
+    """auto picks httptools, if installed"""
+    reader = HTTPReader(ByteReader(b""), backend="auto")
+    assert reader.backend == parser.BACKENDS[-1]
+
+
+def test_backend_invalid():
+    """unknown backend is an error"""
+    with pytest.raises(ValueError):
+        HTTPReader(ByteReader(b""), backend="bogus")
+
+
+def body_stream(data, max_read_size=5000, **kwargs):
+    """return a reader on data, with the head of its document parsed"""
+    reader = HTTPReader(ByteReader(data), max_read_size=max_read_size, **kwargs)
+
+    async def parse_stream():
+        document = ServerDocument()
+        await parser.parse_server_head(reader, document)
+        await parser.parse_server_body(reader, document, stream=True)
+        return document
+
+    return reader, asyncio.run(parse_stream())
+
+
+@pytest.mark.parametrize(
+    "headers, body",
+    (
+        (b"Content-Length: 10\r\n", b"0123456789"),
+        (b"Transfer-Encoding: chunked\r\n", b"4\r\n0123\r\n6\r\n456789\r\n0\r\n\r\n"),
+    ),
+)
+def test_body_stream(headers, body):
+    """the body arrives in pieces, leaving the next document on the reader"""
+    data = b"POST /upload HTTP/1.1\r\n" + headers + b"\r\n" + body
+    data += b"GET /ping HTTP/1.1\r\n\r\n"
+    reader, document = body_stream(data, max_read_size=3)
+    assert document.http_content is None
+    stream = document.content
+    assert isinstance(stream, parser.BodyStream)
+
+    async def test():
+        chunks = [chunk async for chunk in stream]
+        assert len(chunks) > 1
+        assert max(map(len, chunks)) <= 6
+        assert b"".join(chunks) == b"0123456789"
+        assert stream.is_done
+        document = await parse(reader)
+        assert document.http_resource == "/ping"
+
+    asyncio.run(test())
+
+
+def test_body_stream_empty():
+    """a request without a body is already done"""
+    _, document = body_stream(b"POST /upload HTTP/1.1\r\n\r\n")
+
+    async def test():
+        assert document.content.is_done
+        assert await document.content.read() == b""
+
+    asyncio.run(test())
+
+
+def test_body_stream_gzip():
+    """gzip content is decompressed as it arrives"""
+    body = gzip.compress(b"abc" * 1000)
+    data = (
+        b"POST /upload HTTP/1.1\r\nContent-Encoding: gzip\r\n"
+        + f"Content-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+    _, document = body_stream(data, max_read_size=100)
+
+    async def test():
+        assert await document.content.read() == b"abc" * 1000
+
+    asyncio.run(test())
+
+
+def test_body_stream_max_content_length():
+    """chunked bodies are limited to max_content_length as they arrive"""
+    data = b"POST /upload HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+    data += b"4\r\n0123\r\n4\r\n4567\r\n0\r\n\r\n"
+    _, document = body_stream(data, max_content_length=6)
+
+    async def test():
+        assert await anext(document.content) == b"0123"
+        with pytest.raises(HTTPException) as exc:
+            await anext(document.content)
+        assert exc.value.code == 413
+
+    asyncio.run(test())
+
+
+def test_body_stream_content_length_too_large():
+    """content-length is checked before the handler gets the stream"""
+    data = b"POST /upload HTTP/1.1\r\nContent-Length: 10\r\n\r\n0123456789"
+    with pytest.raises(HTTPException) as exc:
+        body_stream(data, max_content_length=6)
+    assert exc.value.code == 413
@@ -0,0 +1,234 @@
+"""tests for the client's host name resolver"""
+
+import asyncio
+import socket
+
+import pytest
+
+from meander.client import Client
+from meander import resolver
+from meander.resolver import Resolver
+
+from tests.test_server import free_port
+
+V4 = socket.AF_INET
+V6 = socket.AF_INET6
+
+
+def stub(addresses: dict, delay: float = 0):
+    """a lookup function that answers from addresses, and counts calls"""
+    calls = []
+
+    async def lookup(host, port):
+        calls.append(host)
+        await asyncio.sleep(delay)
+        if host not in addresses:
+            raise socket.gaierror(f"unknown host: {host}")
+        return [(family, (address, port)) for family, address in addresses[host]]
+
+    return lookup, calls
+
+
+def test_resolve_cached():
+    """a host is looked up once per ttl"""
+    lookup, calls = stub({"a.test": [(V4, "10.0.0.1")]})
+    dns = Resolver(lookup=lookup)
+
+    async def test():
+        for _ in range(3):
+            assert await dns.resolve("a.test", 80) == [(V4, ("10.0.0.1", 80))]
+        assert calls == ["a.test"]
+        assert dns.hits == 2
+        await dns.resolve("a.test", 443)  # another port is another entry
+        assert len(calls) == 2
+
+    asyncio.run(test())
+
+
+def test_resolve_ttl():
+    """an expired entry is looked up again"""
+    lookup, calls = stub({"a.test": [(V4, "10.0.0.1")]})
+    dns = Resolver(ttl=0, lookup=lookup)
+
+    async def test():
+        await dns.resolve("a.test", 80)
+        await dns.resolve("a.test", 80)
+        assert len(calls) == 2
+
+    asyncio.run(test())
+
+
+def test_resolve_merged():
+    """concurrent lookups of a host share one lookup"""
+    lookup, calls = stub({"a.test": [(V4, "10.0.0.1")]}, delay=0.02)
+    dns = Resolver(lookup=lookup)
+
+    async def test():
+        results = await asyncio.gather(*(dns.resolve("a.test", 80) for _ in range(5)))
+        assert results == [[(V4, ("10.0.0.1", 80))]] * 5
+        assert calls == ["a.test"]
+        assert not dns.pending
+
+    asyncio.run(test())
+
+
+def test_resolve_cancelled_caller():
+    """a cancelled caller doesn't cancel a shared lookup"""
+    lookup, calls = stub({"a.test": [(V4, "10.0.0.1")]}, delay=0.02)
+    dns = Resolver(lookup=lookup)
+
+    async def test():
+        first = asyncio.create_task(dns.resolve("a.test", 80))
+        second = asyncio.create_task(dns.resolve("a.test", 80))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == [(V4, ("10.0.0.1", 80))]
+        assert calls == ["a.test"]
+
+    asyncio.run(test())
+
+
+def test_resolve_error_not_cached():
+    """a failed lookup is raised to every caller, and isn't cached"""
+    lookup, calls = stub({}, delay=0.01)
+    dns = Resolver(lookup=lookup)
+
+    async def test():
+        results = await asyncio.gather(
+            dns.resolve("x.test", 80), dns.resolve("x.test", 80), return_exceptions=True
+        )
+        assert all(isinstance(result, socket.gaierror) for result in results)
+        with pytest.raises(socket.gaierror):
+            await dns.resolve("x.test", 80)
+        assert len(calls) == 2
+        assert not dns.cache
+
+    asyncio.run(test())
+
+
+def test_resolve_ip_address():
+    """an ip address isn't looked up"""
+    lookup, calls = stub({})
+    dns = Resolver(lookup=lookup)
+
+    async def test():
+        assert await dns.resolve("127.0.0.1", 80) == [(V4, ("127.0.0.1", 80))]
+        assert await dns.resolve("::1", 80) == [(V6, ("::1", 80))]
+        assert not calls
+
+    asyncio.run(test())
+
+
+def test_resolve_max_entries():
+    """the least recently used host is dropped"""
+    lookup, _ = stub({host: [(V4, "10.0.0.1")] for host in ("a", "b", "c")})
+    dns = Resolver(max_entries=2, lookup=lookup)
+
+    async def test():
+        for host in ("a", "b", "a", "c"):
+            await dns.resolve(host, 80)
+        assert list(dns.cache) == [("a", 80), ("c", 80)]
+
+    asyncio.run(test())
+
+
+def test_interleave():
+    """address families alternate"""
+    addresses = [(V6, 1), (V6, 2), (V6, 3), (V4, 4), (V4, 5)]
+    assert resolver.interleave(addresses) == [
+        (V6, 1),
+        (V4, 4),
+        (V6, 2),
+        (V4, 5),
+        (V6, 3),
+    ]
+
+
+@pytest.mark.parametrize("delay", (None, 0.25))
+def test_connect_next_address(delay):
+    """if an address refuses the connection, the next one is tried"""
+    refused, port = free_port(), free_port()
+    dns = Resolver(happy_eyeballs_delay=delay)
+
+    async def test():
+        listener = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", port)
+        dns.cache[("a.test", port)] = (
+            float("inf"),
+            [(V4, ("127.0.0.1", refused)), (V4, ("127.0.0.1", port))],
+        )
+        async with listener:
+            sock = await asyncio.wait_for(dns.connect("a.test", port), 0.2)
+            assert sock.getpeername() == ("127.0.0.1", port)
+            sock.close()
+
+    asyncio.run(test())
+
+
+def test_connect_staggered(monkeypatch):
+    """with happy eyeballs, a slow address doesn't hold up a fast one"""
+    connect_address = resolver.connect_address
+    started = []
+
+    async def slow_first(address):
+        started.append(address)
+        if address[1][0] == "10.0.0.1":
+            await asyncio.sleep(10)
+        return await connect_address(address)
+
+    monkeypatch.setattr(resolver, "connect_address", slow_first)
+    port = free_port()
+    dns = Resolver(happy_eyeballs_delay=0.05)
+
+    async def test():
+        listener = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", port)
+        dns.cache[("a.test", port)] = (
+            float("inf"),
+            [(V4, ("10.0.0.1", port)), (V4, ("127.0.0.1", port))],
+        )
+        async with listener:
+            sock = await asyncio.wait_for(dns.connect("a.test", port), 1)
+            assert sock.getpeername() == ("127.0.0.1", port)
+            assert len(started) == 2
+            sock.close()
+
+    asyncio.run(test())
+
+
+def test_connect_failed_forgets():
+    """if no address connects, the cached addresses are forgotten"""
+    port = free_port()
+    dns = Resolver()
+
+    async def test():
+        dns.cache[("a.test", port)] = (float("inf"), [(V4, ("127.0.0.1", port))])
+        with pytest.raises(ConnectionRefusedError):
+            await dns.connect("a.test", port)
+        assert not dns.cache
+
+    asyncio.run(test())
+
+
+def test_client_uses_resolver():
+    """a client connects to the addresses from its resolver"""
+    port = free_port()
+    lookup, calls = stub({"service.test": [(V4, "127.0.0.1")]})
+    dns = Resolver(lookup=lookup)
+
+    async def handle(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+        writer.close()
+
+    async def test():
+        listener = await asyncio.start_server(handle, "127.0.0.1", port)
+        async with listener:
+            for _ in range(2):
+                client = Client(resolver=dns)
+                await client.open("service.test", port)
+                client.write(close=True)
+                response = await client.read()
+                assert response.http_content == b"ok"
+                await client.close()
+        assert calls == ["service.test"]
+
+    asyncio.run(test())
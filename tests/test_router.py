@@ -4,7 +4,7 @@ import io
 
 import pytest
 
-from meander import router
+from meander import ConstantResponse, router
 from tests import after as test_after
 from tests import before as test_before
 
@@ -188,9 +188,253 @@ def test_after_directive():
     assert endpoint.after == [test_after.mock_after]
 
 
+def test_stream_directive():
+    """test STREAM directive marks the route's endpoint"""
+    rtr = router.load(io.StringIO("""
+            ROUTE /upload
+            METHOD POST
+            STREAM
+            HANDLER pong
+            METHOD PUT
+            HANDLER pong
+        """))
+    assert rtr("/upload", "POST").stream is True
+    assert rtr("/upload", "PUT").stream is False
+
+
+def test_constant_handler():
+    """a simple string handler, without hooks, is a constant response"""
+    rtr = router.load(io.StringIO("""
+            ROUTE /ping
+            HANDLER pong
+            ROUTE /hooked
+            AFTER tests.after.mock_after
+            HANDLER pong
+        """))
+    constant = rtr("/ping", "GET").constant
+    assert isinstance(constant, ConstantResponse)
+    assert constant.content == b"pong"
+    assert rtr("/hooked", "GET").constant is None
+
+
+def test_constant_response_handler():
+    """a ConstantResponse handler is declared constant, and is callable"""
+    health = ConstantResponse({"status": "ok"})
+    route = router.Route(health, "/health", "GET")
+    endpoint = route.match("/health", "GET")
+    assert endpoint.constant is health
+    assert endpoint.handler() is health
+
+
+def test_stream_directive_duplicate():
+    with pytest.raises(router.DuplicateDirectiveError):
+        router.load(io.StringIO("""
+            ROUTE /upload
+            STREAM
+            STREAM
+        """))
+
+
 def test_unexpected_directive():
     with pytest.raises(router.UnexpectedDirectiveError):
         router.load(io.StringIO("""
             ROUTE /ping
             FOO
         """))
+
+
+@pytest.mark.parametrize(
+    "pattern, segments, is_exact",
+    (
+        ("/ping", ["ping"], True),
+        ("/", [""], True),
+        ("/a/b/", ["a", "b", ""], True),
+        ("/favicon\\.ico", ["favicon.ico"], True),
+        ("/favicon.ico", [], False),
+        ("/user/(\\d+)", ["user"], False),
+        ("/user/(\\d+)/name", ["user"], False),
+        ("/a/?", [], False),
+        ("/a/b/?", ["a"], False),
+        ("/a|/b", [], False),
+        ("ping", [], False),
+        ("/(.*)", [], False),
+    ),
+)
+def test_literal_prefix(pattern, segments, is_exact):
+    assert router.literal_prefix(pattern) == (segments, is_exact)
+
+
+@pytest.mark.parametrize("mode", router.MATCHERS)
+def test_first_match_wins(mode):
+    """earlier regex route beats a later literal route"""
+    rtr = router.Router(mode)
+    rtr.add(router.Route("first", "/item/(.*)", "GET"))
+    rtr.add(router.Route("second", "/item/special", "GET"))
+    rtr.add(router.Route("third", "/(.*)", "GET"))
+    assert rtr("/item/special", "GET").handler() == "first"
+    assert rtr("/item/special", "GET").args == ("special",)
+    assert rtr("/other", "GET").handler() == "third"
+
+
+@pytest.mark.parametrize("mode", router.MATCHERS)
+def test_literal_before_regex(mode):
+    """earlier literal route beats a later regex route"""
+    rtr = router.Router(mode)
+    rtr.add(router.Route("literal", "/item/special", "GET"))
+    rtr.add(router.Route("regex", "/item/(.*)", "GET"))
+    assert rtr("/item/special", "GET").handler() == "literal"
+    assert rtr("/item/other", "GET").handler() == "regex"
+    assert rtr("/item/special/more", "GET").handler() == "regex"
+    assert rtr("/item", "GET") is None
+
+
+@pytest.mark.parametrize("mode", router.MATCHERS)
+def test_optional_trailing_slash(mode):
+    rtr = router.Router(mode)
+    rtr.add(router.Route("pong", "/ping/?", "GET"))
+    assert rtr("/ping", "GET")
+    assert rtr("/ping/", "GET")
+    assert rtr("/pingx", "GET") is None
+
+
+@pytest.mark.parametrize("mode", router.MATCHERS)
+def test_add_after_call(mode):
+    """routes added after the first lookup are found"""
+    rtr = router.Router(mode)
+    rtr.add(router.Route("a", "/a", "GET"))
+    assert rtr("/b", "GET") is None
+    rtr.add(router.Route("b", "/b", "GET"))
+    assert rtr("/b", "GET").handler() == "b"
+
+
+def test_method_tables():
+    """routes are only matched against the requested method"""
+    rtr = router.load(io.StringIO("""
+        ROUTE /item/(\\d+)
+        METHOD GET
+        HANDLER get
+        METHOD PUT
+        HANDLER put
+        ROUTE /item/(.*)
+        METHOD POST
+        HANDLER post
+    """))
+    assert rtr("/item/1", "PUT").handler() == "put"
+    assert set(rtr.tables) == {"GET", "PUT", "POST"}
+    assert rtr("/item/1", "POST").handler() == "post"
+    assert rtr("/item/1", "DELETE") is None
+
+
+@pytest.mark.parametrize(
+    "resource, allowed",
+    (
+        ("/item/1", ["GET", "PUT", "POST"]),
+        ("/item/abc", ["POST", "GET"]),
+        ("/ping", ["GET"]),
+        ("/nothing", []),
+    ),
+)
+def test_allowed(resource, allowed):
+    rtr = router.load(io.StringIO("""
+        ROUTE /item/(\\d+)
+        METHOD GET
+        HANDLER get
+        METHOD PUT
+        HANDLER put
+        ROUTE /item/(.*)
+        METHOD POST
+        HANDLER post
+        METHOD GET
+        HANDLER get-any
+        ROUTE /ping
+        HANDLER pong
+    """))
+    assert rtr.allowed(resource) == allowed
+
+
+@pytest.mark.parametrize("mode", router.MATCHERS)
+def test_uncombinable_routes(mode):
+    """routes with named groups, backreferences or flags keep their order"""
+    rtr = router.Router(mode)
+    rtr.add(router.Route("a", "/a/(\\d+)", "GET"))
+    rtr.add(router.Route("named", "/n/(?P<name>\\w+)", "GET"))
+    rtr.add(router.Route("twice", "/t/(\\w)\\1", "GET"))
+    rtr.add(router.Route("flag", "(?i)/f", "GET"))
+    rtr.add(router.Route("b", "/b/(\\w+)/(\\d+)", "GET"))
+    rtr.add(router.Route("any", "/(.*)", "GET"))
+    assert rtr("/a/1", "GET").args == ("1",)
+    assert rtr("/n/x", "GET").handler() == "named"
+    assert rtr("/t/xx", "GET").handler() == "twice"
+    assert rtr("/t/xy", "GET").handler() == "any"
+    assert rtr("/F", "GET").handler() == "flag"
+    assert rtr("/b/x/2", "GET").args == ("x", "2")
+    assert rtr("/b/x/y", "GET").args == ("b/x/y",)
+    assert rtr("/b/x/2", "POST") is None
+
+
+def test_regex_chunks():
+    """uncombinable routes split the combined patterns"""
+    table = router.RouteRegex(
+        [
+            router.Route("a", "/a", "GET"),
+            router.Route("b", "/b/(\\d+)", "GET"),
+            router.Route("named", "/n/(?P<name>\\w+)", "GET"),
+            router.Route("c", "/c", "GET"),
+        ]
+    )
+    assert len(table.chunks) == 3
+    assert table.match("/b/12", "GET").args == ("12",)
+    assert table.match("/c", "GET").handler() == "c"
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        router.Router("bogus")
+
+
+def test_cache_hits_and_misses():
+    """matches and misses are cached"""
+    rtr = router.Router(cache_size=10)
+    rtr.add(router.Route("pong", "/ping", "GET"))
+    assert rtr("/ping", "GET").handler() == "pong"
+    assert rtr("/ping", "GET").handler() == "pong"
+    assert rtr("/pong", "GET") is None
+    assert rtr("/pong", "GET") is None
+    assert rtr.cache.hits == 2
+    assert rtr.cache.misses == 2
+    assert len(rtr.cache) == 2
+
+
+def test_cache_cleared_on_add():
+    rtr = router.Router(cache_size=10)
+    rtr.add(router.Route("pong", "/ping", "GET"))
+    assert rtr("/pong", "GET") is None
+    rtr.add(router.Route("ping", "/pong", "GET"))
+    assert len(rtr.cache) == 0
+    assert rtr("/pong", "GET").handler() == "ping"
+
+
+@pytest.mark.parametrize(
+    "policy, kept",
+    (
+        ("lru", {("/a", "GET"), ("/c", "GET")}),
+        ("fifo", {("/b", "GET"), ("/c", "GET")}),
+    ),
+)
+def test_cache_eviction(policy, kept):
+    rtr = router.Router(cache_size=2, cache_policy=policy)
+    rtr("/a", "GET")
+    rtr("/b", "GET")
+    rtr("/a", "GET")
+    rtr("/c", "GET")
+    assert set(rtr.cache.entries) == kept
+
+
+def test_no_cache():
+    rtr = router.Router()
+    assert rtr.cache is None
+
+
+def test_invalid_cache_policy():
+    with pytest.raises(ValueError):
+        router.Router(cache_size=2, cache_policy="bogus")
@@ -0,0 +1,101 @@
+"""tests for the runner"""
+
+import asyncio
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from meander import runner
+
+
+def test_run(monkeypatch):
+    """tasks run in this process"""
+    done = []
+
+    async def task():
+        done.append(runner.reuse_port)
+
+    monkeypatch.setattr(runner, "tasks", [task, task])
+    runner.run()
+    assert done == [False, False]
+
+
+def test_get_loop_factory(monkeypatch, caplog):
+    """loop names select an event loop factory, falling back to asyncio"""
+    assert runner.get_loop_factory("asyncio") is None
+    with pytest.raises(ValueError):
+        runner.get_loop_factory("bogus")
+    if runner.uvloop is not None:
+        assert runner.get_loop_factory("auto") is runner.uvloop.new_event_loop
+        assert runner.get_loop_factory("uvloop") is runner.uvloop.new_event_loop
+    monkeypatch.setattr(runner, "uvloop", None)
+    assert runner.get_loop_factory("auto") is None
+    assert not caplog.records
+    assert runner.get_loop_factory("uvloop") is None
+    assert "uvloop is not installed" in caplog.text
+
+
+@pytest.mark.skipif(runner.uvloop is None, reason="uvloop not installed")
+def test_run_uvloop(monkeypatch):
+    """tasks run in a uvloop event loop"""
+    loops = []
+
+    async def task():
+        loops.append(asyncio.get_running_loop())
+
+    monkeypatch.setattr(runner, "tasks", [task])
+    runner.run(loop="uvloop")
+    assert isinstance(loops[0], runner.uvloop.Loop)
+
+
+def test_run_sigterm(monkeypatch):
+    """SIGTERM cancels the tasks, and run returns"""
+    cancelled = []
+
+    async def task():
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    monkeypatch.setattr(runner, "tasks", [task])
+    threading.Timer(0.1, os.kill, (os.getpid(), signal.SIGTERM)).start()
+    runner.run()
+    assert cancelled == [True]
+
+
+def test_run_workers(tmp_path, monkeypatch):
+    """workers are forked, restarted when they exit, and stopped by SIGTERM"""
+    monkeypatch.setattr(runner, "tasks", [])
+    monkeypatch.setattr(runner, "RESTART_DELAY", 0.01)
+    started = tmp_path / "started"
+
+    async def task():
+        with open(started, "a", encoding="utf-8") as output:
+            output.write(f"{os.getpid()} {runner.reuse_port}\n")
+        if len(started.read_text(encoding="utf-8").splitlines()) > 3:
+            await asyncio.sleep(60)  # the first workers exit, and are restarted
+
+    def stop():
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            if started.exists() and len(started.read_text().splitlines()) >= 5:
+                break
+            time.sleep(0.01)
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    runner.add_task(task)
+    stopper = threading.Thread(target=stop)
+    stopper.start()
+    runner.run(workers=2)
+    stopper.join()
+
+    lines = started.read_text(encoding="utf-8").splitlines()
+    assert len(lines) >= 5
+    assert len({line.split()[0] for line in lines}) == len(lines)
+    assert {line.split()[1] for line in lines} == {"True"}
+    assert signal.getsignal(signal.SIGTERM) == signal.SIG_DFL
@@ -1,11 +1,15 @@
 """tests for server configuration and routing setup"""
 
+import asyncio
 import io
+import logging
+import socket
 
 import pytest
 
-from meander.server import Server, add_server
-from meander import runner
+from meander.limit import Limit
+from meander.server import TRANSPORTS, Server, add_server
+from meander import Request, runner
 
 
 def test_server_creates_empty_router():
@@ -212,3 +216,315 @@ def test_add_server_creates_and_registers():
         assert len(runner.tasks) == 1
     finally:
         runner.tasks[:] = original_tasks
+
+
+def test_server_route_cache_size():
+    """test server passes route_cache_size to its router"""
+    server = Server(port=8080, route_cache_size=5)
+    server.add_route("/ping", "pong")
+    assert server.router("/ping", "GET") is not None
+    assert server.router.cache.size == 5
+    assert len(server.router.cache) == 1
+
+
+def test_server_parser_backend_invalid():
+    """test server rejects an unknown parser backend"""
+    with pytest.raises(AttributeError, match="parser backend not available"):
+        Server(port=8080, parser_backend="bogus")
+
+
+def test_server_write_water_invalid():
+    """test server rejects a low watermark above the high watermark"""
+    with pytest.raises(AttributeError, match="write_low_water exceeds"):
+        Server(port=8080, write_high_water=10, write_low_water=20)
+
+
+def test_server_write_backpressure():
+    """a slow reader doesn't make the server buffer responses without bound"""
+    high_water = 64 * 1024
+    response = "x" * (1024 * 1024)
+    buffered = []  # transport buffer size before each response is written
+    writers = []
+
+    def handler():
+        buffered.append(writers[0].transport.get_write_buffer_size())
+        return response
+
+    server = Server(port=0, write_high_water=high_water)
+    server.add_route("/big", handler)
+
+    async def on_connection(reader, writer):
+        writers.append(writer)
+        await server(reader, writer)
+
+    async def test():
+        listener = await asyncio.start_server(on_connection, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            try:
+                count = 20
+                writer.write(b"GET /big HTTP/1.1\r\n\r\n" * count)
+                await asyncio.sleep(0.2)  # a slow reader: nothing read yet
+                assert len(buffered) < count
+                assert max(buffered) <= high_water
+                received = 0
+                while received < count * len(response):
+                    data = await asyncio.wait_for(reader.read(1024 * 1024), 5)
+                    received += len(data)
+                assert len(buffered) == count
+                assert max(buffered) <= high_water
+            finally:
+                writer.close()
+
+    asyncio.run(test())
+
+
+def free_port():
+    """return a port that is (probably) free"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.parametrize("transport", TRANSPORTS)
+def test_server_shutdown(transport, caplog):
+    """on cancel, idle connections close now, and busy ones finish first"""
+
+    async def slow():
+        await asyncio.sleep(0.2)
+        return "done"
+
+    server = Server(port=free_port(), transport=transport)
+    server.add_route("/slow", slow)
+    server.add_route("/fast", "fast")
+
+    async def test():
+        task = asyncio.create_task(server.start())
+        await asyncio.sleep(0.05)
+        idle_reader, idle_writer = await asyncio.open_connection(port=server.port)
+        idle_writer.write(b"GET /fast HTTP/1.1\r\n\r\n")
+        assert (await idle_reader.readuntil(b"fast")).endswith(b"fast")
+        busy_reader, busy_writer = await asyncio.open_connection(port=server.port)
+        busy_writer.write(b"GET /slow HTTP/1.1\r\n\r\n")
+        await asyncio.sleep(0.05)
+        assert len(server.connections) == 2
+
+        task.cancel()
+        assert await asyncio.wait_for(idle_reader.read(), 0.1) == b""
+        response = await asyncio.wait_for(busy_reader.read(), 1)
+        assert response.startswith(b"HTTP/1.1 200 OK")
+        assert b"\r\nConnection: close\r\n" in response
+        assert response.endswith(b"done")
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert not server.connections
+        with pytest.raises(OSError):
+            await asyncio.open_connection(port=server.port)
+        idle_writer.close()
+        busy_writer.close()
+
+    asyncio.run(test())
+    assert not [r for r in caplog.records if r.levelno >= logging.ERROR]
+
+
+def test_server_shutdown_timeout(caplog):
+    """connections still busy after shutdown_timeout are cancelled"""
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    server = Server(port=free_port(), shutdown_timeout=0.05)
+    server.add_route("/slow", slow)
+
+    async def test():
+        task = asyncio.create_task(server.start())
+        await asyncio.sleep(0.05)
+        reader, writer = await asyncio.open_connection(port=server.port)
+        writer.write(b"GET /slow HTTP/1.1\r\n\r\n")
+        await asyncio.sleep(0.05)
+        task.cancel()
+        assert await asyncio.wait_for(reader.read(), 1) == b""
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(task, 1)
+        writer.close()
+
+    asyncio.run(test())
+    assert not [r for r in caplog.records if r.levelno >= logging.ERROR]
+
+
+def test_server_connection_policy_invalid():
+    """test server rejects an unknown connection policy"""
+    with pytest.raises(AttributeError, match="invalid connection policy"):
+        Server(port=8080, connection_policy="bogus")
+
+
+async def get(port, resource, reader_writer=None):
+    """send a GET on a (new) connection, returning the response and connection"""
+    if reader_writer is None:
+        reader_writer = await asyncio.open_connection(port=port)
+    reader, writer = reader_writer
+    writer.write(f"GET {resource} HTTP/1.1\r\n\r\n".encode())
+    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 1)
+    length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+    return head + await reader.readexactly(length), reader_writer
+
+
+@pytest.mark.parametrize("transport", TRANSPORTS)
+@pytest.mark.parametrize("policy", ("reject", "wait"))
+def test_server_max_connections(policy, transport):
+    """past max_connections, a connection is rejected, or waits"""
+    server = Server(
+        port=free_port(),
+        max_connections=1,
+        connection_policy=policy,
+        transport=transport,
+    )
+    server.add_route("/ping", "pong")
+
+    async def test():
+        task = asyncio.create_task(server.start())
+        await asyncio.sleep(0.05)
+        response, first = await get(server.port, "/ping")
+        assert response.endswith(b"pong")
+        assert server.open_connections.current == 1
+
+        second = asyncio.create_task(get(server.port, "/ping"))
+        await asyncio.sleep(0.05)
+        if policy == "reject":
+            response, _ = await second
+            assert response.startswith(b"HTTP/1.1 503 Service Unavailable")
+            assert server.rejected == 1
+        else:
+            assert not second.done()
+            first[1].close()
+            response, _ = await second
+            assert response.endswith(b"pong")
+            assert server.rejected == 0
+        assert server.open_connections.peak == 1
+        task.cancel()
+
+    asyncio.run(test())
+
+
+def test_server_all_connections_wait(monkeypatch):
+    """a connection waiting for a full server doesn't hold a global slot"""
+    monkeypatch.setattr("meander.server.all_connections", Limit(2))
+    full = Server(port=free_port(), max_connections=1, connection_policy="wait")
+    other = Server(port=free_port(), connection_policy="wait")
+    for server in (full, other):
+        server.add_route("/ping", "pong")
+
+    async def test():
+        tasks = [asyncio.create_task(server.start()) for server in (full, other)]
+        await asyncio.sleep(0.05)
+        _, first = await get(full.port, "/ping")
+        waiting = asyncio.create_task(get(full.port, "/ping"))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        response, _ = await get(other.port, "/ping")
+        assert response.endswith(b"pong")
+        first[1].close()
+        response, _ = await waiting
+        assert response.endswith(b"pong")
+        for task in tasks:
+            task.cancel()
+
+    asyncio.run(test())
+
+
+@pytest.mark.parametrize("transport", TRANSPORTS)
+def test_server_max_in_flight(transport):
+    """max_in_flight limits the handlers running at once"""
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    server = Server(port=free_port(), max_in_flight=1, transport=transport)
+    server.add_route("/slow", slow)
+
+    async def test():
+        task = asyncio.create_task(server.start())
+        await asyncio.sleep(0.05)
+        responses = await asyncio.gather(*(get(server.port, "/slow") for _ in range(3)))
+        assert all(response.endswith(b"done") for response, _ in responses)
+        assert server.open_connections.peak == 3
+        assert server.in_flight.peak == 1
+        assert server.in_flight.current == 0
+        task.cancel()
+
+    asyncio.run(test())
+
+
+def test_server_transport_invalid():
+    """test server rejects an unknown transport"""
+    with pytest.raises(AttributeError, match="invalid transport"):
+        Server(port=8080, transport="bogus")
+
+
+@pytest.mark.parametrize("transport", TRANSPORTS)
+def test_server_transport(transport):
+    """both transports handle bodies, keep-alive and pipelined requests"""
+
+    def echo(request: Request):
+        return request.content.decode()
+
+    server = Server(port=free_port(), transport=transport)
+    server.add_route("/ping", "pong")
+    server.add_route("/echo", echo, method="POST")
+
+    async def test():
+        task = asyncio.create_task(server.start())
+        await asyncio.sleep(0.05)
+        response, connection = await get(server.port, "/ping")
+        assert response.endswith(b"pong")
+        response, _ = await get(server.port, "/ping", connection)
+        assert response.endswith(b"pong")
+
+        reader, writer = connection
+        body = b"y" * 200000
+        writer.write(
+            b"POST /echo HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body)
+            + body
+            + b"GET /ping HTTP/1.1\r\n\r\n"
+        )
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 1)
+        assert head.startswith(b"HTTP/1.1 200 OK")
+        assert await reader.readexactly(len(body)) == body
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 1)
+        assert await reader.readexactly(4) == b"pong"
+        writer.close()
+        task.cancel()
+
+    asyncio.run(test())
+
+
+def test_server_protocol_backpressure():
+    """with the protocol transport, a slow reader pauses the writer"""
+    response = "x" * (1024 * 1024)
+    count = 20
+    server = Server(port=free_port(), transport="protocol", write_high_water=65536)
+    server.add_route("/big", response)
+
+    async def test():
+        task = asyncio.create_task(server.start())
+        await asyncio.sleep(0.05)
+        reader, writer = await asyncio.open_connection(port=server.port)
+        try:
+            writer.write(b"GET /big HTTP/1.1\r\n\r\n" * count)
+            await asyncio.sleep(0.2)  # a slow reader: nothing read yet
+            (connection,) = server.connections
+            assert connection.writer.transport.get_write_buffer_size() <= 2 * len(
+                response
+            )
+            received = 0
+            while received < count * len(response):
+                data = await asyncio.wait_for(reader.read(1024 * 1024), 5)
+                assert data
+                received += len(data)
+        finally:
+            writer.close()
+            task.cancel()
+
+    asyncio.run(test())
@@ -0,0 +1,255 @@
+"""tests for the keep-alive client session"""
+
+import asyncio
+import contextlib
+
+import pytest
+
+from meander.call import call
+from meander.server import Server
+from meander.session import Session
+
+from tests.test_server import free_port
+
+
+def serve(test):
+    """run test(port) against a server with /ping and /slow routes"""
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    server = Server(port=free_port())
+    server.add_route("/ping", "pong")
+    server.add_route("/slow", slow)
+    server.add_route("/big", "x" * 100000)
+
+    async def run():
+        task = asyncio.create_task(server.start())
+        await asyncio.sleep(0.05)
+        try:
+            await test(server.port)
+        finally:
+            task.cancel()
+
+    asyncio.run(run())
+
+
+def test_session_reuse():
+    """a keep-alive connection is reused"""
+
+    async def test(port):
+        async with Session() as session:
+            for _ in range(3):
+                response = await call(f"http://127.0.0.1:{port}/ping", session=session)
+                assert response.http_status_code == 200
+                assert response.content == "pong"
+            assert session.opened == 1
+            assert session.reused == 2
+            assert session.idle_count == 1
+        assert session.idle_count == 0
+
+    serve(test)
+
+
+def test_session_per_host_limit():
+    """concurrent calls beyond max_per_host wait for a connection"""
+
+    async def test(port):
+        async with Session(max_per_host=2) as session:
+            url = f"http://127.0.0.1:{port}/slow"
+            responses = await asyncio.gather(
+                *(call(url, session=session) for _ in range(5))
+            )
+            assert all(response.content == "done" for response in responses)
+            assert session.in_use.peak == 2
+            assert session.opened == 2
+            assert session.reused == 3
+
+    serve(test)
+
+
+def test_gather_shares_connections():
+    """call.gather shares a session's connections across its calls"""
+
+    async def test(port):
+        url = f"http://127.0.0.1:{port}/slow"
+        async with Session(max_per_host=2) as session:
+            responses = await call.gather([url] * 6, session=session)
+            assert [response.content for response in responses] == ["done"] * 6
+            assert session.opened == 2
+            assert session.reused == 4
+
+    serve(test)
+
+
+def test_stream():
+    """a streamed response body is read as it arrives"""
+
+    async def test(port):
+        url = f"http://127.0.0.1:{port}/big"
+        response = await call(url, stream=True, max_read_size=10000)
+        assert response.http_status_code == 200
+        assert response.http_content_length == 100000
+        pieces = [piece async for piece in response.content]
+        assert len(pieces) > 1
+        assert b"".join(pieces) == b"x" * 100000
+        assert response.content.client.writer.is_closing()
+
+    serve(test)
+
+
+def test_stream_session():
+    """a streamed connection returns to the session once the body is read"""
+
+    async def test(port):
+        url = f"http://127.0.0.1:{port}/big"
+        async with Session(max_per_host=1) as session:
+            response = await call(url, session=session, stream=True)
+            assert session.in_use.current == 1
+            assert await response.content.read() == b"x" * 100000
+            assert session.in_use.current == 0
+            response = await call(url, session=session, stream=True)
+            await response.content.close()  # before reading the body
+            response = await call(url, session=session, stream=True)
+            async with response.content as body:
+                await body.read()
+            response = await call(f"http://127.0.0.1:{port}/ping", session=session)
+            assert response.content == "pong"
+            assert session.opened == 2
+            assert session.reused == 2
+
+    serve(test)
+
+
+def test_session_global_limit():
+    """past max_connections, the longest idle connection is closed"""
+
+    async def test(port):
+        async with Session(max_connections=1) as session:
+            await call(f"http://127.0.0.1:{port}/ping", session=session)
+            await call(f"http://localhost:{port}/ping", session=session)
+            assert session.opened == 2
+            assert session.idle_count == 1
+            assert list(session.idle[("localhost", port, False)])
+
+    serve(test)
+
+
+def test_session_idle_timeout():
+    """a connection idle for longer than idle_timeout isn't reused"""
+
+    async def test(port):
+        async with Session(idle_timeout=0) as session:
+            for _ in range(2):
+                await call(f"http://127.0.0.1:{port}/ping", session=session)
+                await asyncio.sleep(0.01)
+            assert session.opened == 2
+            assert session.reused == 0
+
+    serve(test)
+
+
+def test_session_idle_timeout_sweep():
+    """older idle connections expire while a newer one is being reused"""
+
+    async def test(port):
+        url = f"http://127.0.0.1:{port}"
+        async with Session(idle_timeout=0.1) as session:
+            await call.gather([f"{url}/slow", f"{url}/slow"], session=session)
+            assert session.idle_count == 2
+            for _ in range(5):
+                await call(f"{url}/ping", session=session)
+                await asyncio.sleep(0.04)
+            assert session.opened == 2
+            assert session.idle_count == 1
+
+    serve(test)
+
+
+def test_session_idle_timeout_other_host():
+    """an idle connection expires while only another host is in use"""
+
+    async def test(port):
+        async with Session(idle_timeout=0.1) as session:
+            await call(f"http://127.0.0.1:{port}/ping", session=session)
+            for _ in range(5):
+                await call(f"http://localhost:{port}/ping", session=session)
+                await asyncio.sleep(0.04)
+            assert not session.idle[("127.0.0.1", port, False)]
+            assert session.idle_count == 1
+
+    serve(test)
+
+
+def test_session_closed_by_server():
+    """a connection the server closed (while idle) isn't reused"""
+
+    async def handle(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+        writer.close()
+
+    async def test():
+        listener = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener, Session() as session:
+            for _ in range(2):
+                response = await call(f"http://127.0.0.1:{port}/", session=session)
+                assert response.content == b"ok"
+                await asyncio.sleep(0.05)  # the close arrives
+            assert session.opened == 2
+            assert session.reused == 0
+
+    asyncio.run(test())
+
+
+async def one_response_server(requests: list):
+    """a server that answers one request per connection, then hangs up"""
+
+    async def handle(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        requests.append(writer)
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+        with contextlib.suppress(asyncio.IncompleteReadError):
+            await reader.readuntil(b"\r\n\r\n")  # the next request: hang up
+        writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+def test_session_stale_retry():
+    """a request that gets EOF on a reused connection is sent again"""
+    requests = []
+
+    async def test():
+        listener = await one_response_server(requests)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener, Session() as session:
+            for _ in range(3):
+                response = await call(f"http://127.0.0.1:{port}/", session=session)
+                assert response.content == b"ok"
+            assert len(requests) == 3
+            assert session.opened == 3
+            assert session.reused == 2
+
+    asyncio.run(test())
+
+
+def test_session_no_retry_on_new_connection():
+    """EOF on a new connection is an error"""
+
+    async def handle(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        writer.close()
+
+    async def test():
+        listener = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener, Session() as session:
+            with pytest.raises(ConnectionResetError):
+                await call(f"http://127.0.0.1:{port}/", session=session)
+            assert session.opened == 1
+            assert session.idle_count == 0
+
+    asyncio.run(test())
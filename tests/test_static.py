@@ -0,0 +1,234 @@
+"""tests for static file serving"""
+
+import asyncio
+import io
+import os
+import urllib.parse
+
+import pytest
+
+from meander import Request
+from meander.connection import Connection
+from meander.exception import HTTPException
+from meander.response import FileResponse
+from meander import router
+from meander import runner
+from meander.static import StaticFiles
+
+
+@pytest.fixture(name="files")
+def fixture_files(tmp_path):
+    """a directory with a small and a large file"""
+    (tmp_path / "small.txt").write_bytes(b"0123456789")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "large.bin").write_bytes(bytes(range(256)) * 400)
+    return tmp_path
+
+
+def get(static, name, **headers):
+    """call static for name, with headers"""
+    request = Request()
+    request.args = (name,)
+    request.http_headers = headers
+    return static(request)
+
+
+def test_small_file(files):
+    """small files are returned (and cached) in memory"""
+    static = StaticFiles(files)
+    result = get(static, "small.txt")
+    assert result.code == 200
+    assert result.content == b"0123456789"
+    assert result.headers["Content-Type"] == "text/plain"
+    assert result.headers["Content-Length"] == 10
+    assert result.headers["ETag"].startswith('"')
+    assert static.cached_bytes == 10
+
+
+def test_large_file(files):
+    """large files are sent from the file"""
+    static = StaticFiles(files, max_file_size=1000)
+    result = get(static, "sub/large.bin")
+    assert isinstance(result, FileResponse)
+    assert result.path == os.path.join(os.path.realpath(files), "sub", "large.bin")
+    assert (result.offset, result.count) == (0, 102400)
+    assert result.headers["Content-Type"] == "application/octet-stream"
+    assert result.serial().endswith(b"\r\n\r\n")
+    assert static.cached_bytes == 0
+
+
+@pytest.mark.parametrize(
+    "name", ("missing.txt", "sub", "../small.txt", "/etc/passwd", "a\x00b")
+)
+def test_not_found(files, name):
+    """missing or bad names, directories and paths outside the directory are 404"""
+    with pytest.raises(HTTPException) as exc:
+        get(StaticFiles(files / "sub"), name)
+    assert exc.value.code == 404
+
+
+@pytest.mark.parametrize(
+    "name, content_type",
+    (
+        ("data.json", "application/json"),
+        ("form.x-www-form-urlencoded", "application/x-www-form-urlencoded"),
+    ),
+)
+def test_content_untouched(files, name, content_type, monkeypatch):
+    """cached content is sent as is, whatever its type"""
+    monkeypatch.setattr(
+        "mimetypes.guess_type", lambda path: (content_type, None), raising=True
+    )
+    (files / name).write_bytes(b'{"a": 1}')
+    result = get(StaticFiles(files), name)
+    assert result.content == b'{"a": 1}'
+    assert result.headers["Content-Type"] == content_type
+    assert result.serial().endswith(b'\r\n\r\n{"a": 1}')
+
+
+@pytest.mark.parametrize("name", ("my%20file.txt", "caf%C3%A9.txt"))
+def test_quoted_name(files, name):
+    """names are percent-decoded"""
+    (files / urllib.parse.unquote(name)).write_bytes(b"quoted")
+    assert get(StaticFiles(files), name).content == b"quoted"
+
+
+def test_not_modified(files):
+    """matching validators result in a 304"""
+    static = StaticFiles(files)
+    first = get(static, "small.txt")
+    etag, modified = first.headers["ETag"], first.headers["Last-Modified"]
+    result = get(static, "small.txt", **{"if-none-match": etag})
+    assert result.code == 304
+    assert "Content-Length" not in result.headers
+    assert get(static, "small.txt", **{"if-none-match": f"W/{etag}"}).code == 304
+    assert get(static, "small.txt", **{"if-none-match": '"x"'}).code == 200
+    assert get(static, "small.txt", **{"if-modified-since": modified}).code == 304
+    since = "Thu, 01 Jan 1970 00:00:00 GMT"
+    assert get(static, "small.txt", **{"if-modified-since": since}).code == 200
+
+
+@pytest.mark.parametrize(
+    "value, content, content_range",
+    (
+        ("bytes=2-4", b"234", "bytes 2-4/10"),
+        ("bytes=7-", b"789", "bytes 7-9/10"),
+        ("bytes=-2", b"89", "bytes 8-9/10"),
+        ("bytes=5-100", b"56789", "bytes 5-9/10"),
+        ("bytes=1-2,4-5", b"0123456789", None),
+        ("lines=1-2", b"0123456789", None),
+        ("bytes=4-2", b"0123456789", None),
+    ),
+)
+def test_range(files, value, content, content_range):
+    """a single byte range is a 206; anything else is ignored"""
+    result = get(StaticFiles(files), "small.txt", range=value)
+    assert result.content == content
+    assert result.headers["Content-Length"] == len(content)
+    assert result.headers.get("Content-Range") == content_range
+    assert result.code == (206 if content_range else 200)
+
+
+def test_range_file(files):
+    """a range of a large file is sent from the file"""
+    result = get(
+        StaticFiles(files, max_file_size=0), "sub/large.bin", range="bytes=256-"
+    )
+    assert (result.offset, result.count) == (256, 102400 - 256)
+
+
+def test_range_not_satisfiable(files):
+    """a range outside the file is a 416"""
+    with pytest.raises(HTTPException) as exc:
+        get(StaticFiles(files), "small.txt", range="bytes=10-")
+    assert exc.value.code == 416
+    assert exc.value.headers == {"Content-Range": "bytes */10"}
+
+
+def test_if_range(files):
+    """a range is ignored if If-Range doesn't match"""
+    static = StaticFiles(files)
+    etag = get(static, "small.txt").headers["ETag"]
+    assert get(static, "small.txt", range="bytes=1-1", **{"if-range": etag}).code == 206
+    assert (
+        get(static, "small.txt", range="bytes=1-1", **{"if-range": '"x"'}).code == 200
+    )
+
+
+def test_cache_eviction(files):
+    """the cache is bounded by bytes and entries, evicting the oldest"""
+    for name in "abcd":
+        (files / name).write_bytes(b"x" * 4)
+    static = StaticFiles(files, max_bytes=10, max_entries=3)
+    for name in "abc":
+        get(static, name)
+    assert list(static.cache) == ["b", "c"]
+    assert static.cached_bytes == 8
+    get(static, "b")
+    get(static, "sub/large.bin")
+    get(static, "d")
+    assert list(static.cache) == ["b", "sub/large.bin", "d"]
+    assert static.cached_bytes == 8
+
+
+def test_cache_ttl(files):
+    """a changed file is noticed after the ttl"""
+    static = StaticFiles(files, ttl=0)
+    assert get(static, "small.txt").content == b"0123456789"
+    os.utime(files / "small.txt", ns=(0, 0))
+    (files / "small.txt").write_bytes(b"abc")
+    assert get(static, "small.txt").content == b"abc"
+    assert static.cached_bytes == 3
+
+
+def test_static_directive(files):
+    """the STATIC directive adds a GET route for a StaticFiles handler"""
+    rtr = router.load(io.StringIO(f"""
+        ROUTE /static/(.*)
+            STATIC {files}
+    """))
+    endpoint = rtr("/static/small.txt", "GET")
+    assert isinstance(endpoint.handler, StaticFiles)
+    assert endpoint.args == ("small.txt",)
+
+
+@pytest.mark.parametrize("loop", runner.LOOPS[:2])
+def test_sendfile(files, loop):
+    """a large file is sent over a real connection, in full and in part"""
+    if (loop_factory := runner.get_loop_factory(loop)) is None and loop != "asyncio":
+        pytest.skip(f"{loop} not installed")
+    static = StaticFiles(files, max_file_size=0)
+    rtr = router.Router()
+    rtr.add(router.Route(static, "/static/(.*)", "GET"))
+    expected = (files / "sub" / "large.bin").read_bytes()
+
+    async def handle(reader, writer):
+        await Connection(reader, writer, rtr).handle()
+
+    async def fetch(request):
+        reader, writer = await asyncio.open_connection(port=port)
+        writer.write(request)
+        data = await reader.read()
+        writer.close()
+        return data.split(b"\r\n\r\n", 1)
+
+    async def test():
+        nonlocal port
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            head, body = await fetch(
+                b"GET /static/sub/large.bin HTTP/1.1\r\nconnection: close\r\n\r\n"
+            )
+            assert head.startswith(b"HTTP/1.1 200 OK")
+            assert body == expected
+            head, body = await fetch(
+                b"GET /static/sub/large.bin HTTP/1.1\r\nconnection: close\r\n"
+                b"range: bytes=1000-1999\r\n\r\n"
+            )
+            assert head.startswith(b"HTTP/1.1 206 Partial Content")
+            assert body == expected[1000:2000]
+
+    port = None
+    with asyncio.Runner(loop_factory=loop_factory) as asyncio_runner:
+        asyncio_runner.run(test())
@@ -0,0 +1,114 @@
+"""tests for shared ssl contexts and tls session resumption"""
+
+import asyncio
+import shutil
+import ssl
+import subprocess
+
+import pytest
+
+from meander.client import Client
+from meander.server import Server
+from meander import tls
+
+from tests.test_server import free_port
+
+
+@pytest.fixture(name="cert")
+def fixture_cert(tmp_path):
+    """a self-signed certificate (and key) for localhost"""
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl not installed")
+    certfile, keyfile = str(tmp_path / "cert.pem"), str(tmp_path / "key.pem")
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=localhost",
+            "-addext",
+            "subjectAltName=DNS:localhost",
+            "-keyout",
+            keyfile,
+            "-out",
+            certfile,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return certfile, keyfile
+
+
+def test_client_context_cached():
+    """one client context is shared per cafile"""
+    assert tls.client_context() is tls.client_context()
+    assert isinstance(tls.client_context(), tls.ClientContext)
+
+
+def test_client_context_defaults():
+    """the shared client context verifies like ssl.create_default_context"""
+    context, default = tls.client_context(), ssl.create_default_context()
+    assert context.options == default.options
+    assert context.verify_flags == default.verify_flags
+    assert context.verify_mode == ssl.CERT_REQUIRED
+    assert context.check_hostname
+
+
+def test_server_context_cached(cert):
+    """one server context is shared per certificate, with session tickets"""
+    context = tls.server_context(*cert)
+    assert context is tls.server_context(*cert)
+    assert not context.options & tls.ssl.OP_NO_TICKET
+
+
+def test_save_session_limit(monkeypatch):
+    """the least recently saved sessions are dropped"""
+
+    class SSLObject:  # pylint: disable=too-few-public-methods
+        """has a session"""
+
+        session = object()
+
+    monkeypatch.setattr(tls, "MAX_SESSIONS", 2)
+    context = tls.ClientContext(tls.ssl.PROTOCOL_TLS_CLIENT)
+    for host in ("a", "b", "a", "c"):
+        context.save_session(host, SSLObject())
+    assert list(context.sessions) == ["a", "c"]
+    context.save_session("d", None)
+    assert list(context.sessions) == ["a", "c"]
+
+
+@pytest.mark.parametrize("transport", ("stream", "protocol"))
+def test_session_resumption(cert, transport):
+    """a second connection to a host resumes the tls session"""
+    certfile, keyfile = cert
+    server = Server(
+        port=free_port(),
+        ssl_certfile=certfile,
+        ssl_keyfile=keyfile,
+        transport=transport,
+    )
+    server.add_route("/ping", "pong")
+
+    async def test():
+        task = asyncio.create_task(server.start())
+        await asyncio.sleep(0.05)
+        reused = []
+        for _ in range(3):
+            client = Client(cafile=certfile)
+            await client.open("localhost", server.port, is_ssl=True)
+            client.write(path="/ping", close=True)
+            response = await client.read()
+            assert response.http_content == b"pong"
+            reused.append(client.writer.get_extra_info("ssl_object").session_reused)
+            await client.close()
+        assert reused == [False, True, True]
+        task.cancel()
+
+    asyncio.run(test())